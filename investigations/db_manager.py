@@ -4,11 +4,17 @@
 Этот модуль предоставляет собой функции для исследования БД и её содержания
 """
 
+import ast
+import itertools
+import random
 import timeit
 
 import mysql.connector
 from mysql.connector import Error
 
+from lib.randomik import generate_random_string, generate_random_strings, new_random_crops
+from lib.row_codec import decode_row, encode_row
+
 
 def measure_delete_time(delete_func, *args):
     """
@@ -53,6 +59,59 @@ execute_query(query)
     return time_taken
 
 
+def benchmark_row_codec(rows=10000000, sample_size=10000):
+    """
+    Сравнивает скорость разбора строк текстового бэкапа функцией row_codec.decode_row()
+    и ast.literal_eval().
+
+    Parameters:
+    rows : int, optional
+        Количество разбираемых строк. По умолчанию 10 000 000.
+    sample_size : int, optional
+        Количество различных строк (строки таблицы crops с идентификатором), которые
+        разбираются по кругу, чтобы не держать в памяти все rows строк. По умолчанию 10 000.
+
+    Returns:
+    dict
+        Время разбора в секундах по способам разбора.
+    """
+    lines = [encode_row((row_id,) + crop) for row_id, crop in enumerate(new_random_crops(sample_size), 1)]
+    results = {}
+    for name, parse in (('row_codec.decode_row', decode_row), ('ast.literal_eval', ast.literal_eval)):
+        start_time = timeit.default_timer()
+        for line in itertools.islice(itertools.cycle(lines), rows):
+            parse(line)
+        results[name] = timeit.default_timer() - start_time
+        print(f"{name}: {rows} rows in {results[name]:.2f} s ({rows / results[name]:.0f} rows/s)")
+    return results
+
+
+def benchmark_random_strings(count=100000):
+    """
+    Сравнивает скорость генерации случайных строк пакетом (generate_random_strings())
+    и по одной строке посимвольно (generate_random_string()).
+
+    Parameters:
+    count : int, optional
+        Количество генерируемых строк. По умолчанию 100 000.
+
+    Returns:
+    dict
+        Время генерации в секундах по способам генерации.
+    """
+    methods = (
+        ('generate_random_string', lambda: [generate_random_string(random.randint(4, 10)) for _ in range(count)]),
+        ('generate_random_strings', lambda: generate_random_strings(count)),
+    )
+    results = {}
+    for name, generate in methods:
+        start_time = timeit.default_timer()
+        generate()
+        results[name] = timeit.default_timer() - start_time
+        print(f"{name}: {count} strings in {results[name]:.2f} s ({count / results[name]:.0f} strings/s)")
+    return results
+
+
 def show_database_content(host='localhost', user='admin', password='root', database='garden'):
     """
     Выводит содержимое базы данных MySQL.
@@ -12,7 +12,7 @@ from db_manager import measure_query_time, show_database_content, measure_delete
 from lib.db_controller import *
 
 
-def generate_data_for_table(table_name, count):
+def generate_data_for_table(table_name, count, distributions=None):
     """
     Генерирует данные для указанной таблицы.
 
@@ -21,24 +21,19 @@ def generate_data_for_table(table_name, count):
         Название таблицы, в которую будут вставляться данные.
     count : int
         Количество строк данных для вставки.
+    distributions : dict, optional
+        Распределения внешних ключей грядок, например {'gardens': 'zipf:1.2'}
+        (см. lib.distributions.parent_sampler). По умолчанию ключи выбираются равномерно.
     """
-    with create_connection('garden') as conn:
-        if conn:
-            with conn.cursor() as cursor:
-                if table_name == 'gardens':
-                    for name in generator_random_garden(count):
-                        insert_into_gardens('garden', [(name, )])
-                elif table_name == 'crops':
-                    for name, season, watering_frequency, ripening_period in generator_random_crop(count):
-                        cursor.execute(
-                            insert_into_crops('garden', [(name, season, watering_frequency, ripening_period)])
-                        )
-                elif table_name == 'fertilizers':
-                    for name, amount in generator_random_fertilizer(count):
-                        insert_into_fertilizers('garden', [(name, amount)])
-                elif table_name == 'beds':
-                    for garden_id, crop_id, fertilizer_id in generator_random_bed(count):
-                        insert_into_beds('garden', [(garden_id, crop_id, fertilizer_id)])
+    # Генераторы передаются в insert_into_* напрямую и вставляются порциями без промежуточного списка
+    if table_name == 'gardens':
+        insert_into_gardens('garden', generator_random_garden(count))
+    elif table_name == 'crops':
+        insert_into_crops('garden', generator_random_crop(count))
+    elif table_name == 'fertilizers':
+        insert_into_fertilizers('garden', generator_random_fertilizer(count))
+    elif table_name == 'beds':
+        insert_into_beds('garden', generator_random_bed(count, distributions=distributions))
 
 
 def plot_generation_graphics(funcs_to_measure, count_generation, title='График времени генерации данных'):
@@ -159,7 +154,7 @@ def plot_data(x_values, y_values_list, labels, x_label, y_label, title, save_pat
     plt.show()
 
 
-def plot_select_graphics(query_list, title='Построение графиков с запросом SELECT'):
+def plot_select_graphics(query_list, title='Построение графиков с запросом SELECT', distributions=None):
     """
     Функция для построения графиков времени выполнения запросов SELECT.
 
@@ -168,6 +163,8 @@ def plot_select_graphics(query_list, title='Построение графико
         Список запросов SELECT.
     title : str
         Заголовок графика.
+    distributions : dict, optional
+        Распределения внешних ключей грядок (см. generate_data_for_table). По умолчанию равномерные.
 
     Returns:
     None
@@ -181,7 +178,7 @@ def plot_select_graphics(query_list, title='Построение графико
         generate_data_for_table('gardens', count)
         generate_data_for_table('crops', count)
         generate_data_for_table('fertilizers', count)
-        generate_data_for_table('beds', count)
+        generate_data_for_table('beds', count, distributions)
 
         times = []
         for query in query_list:
@@ -313,6 +310,9 @@ if __name__ == '__main__':
     #     "SELECT * FROM beds WHERE garden_id = 1"
     # ]
     # plot_select_graphics(query_list, title='Время выполнения запросов SELECT')
+    # Те же запросы на данных, где несколько больших садов содержат большую часть грядок:
+    # plot_select_graphics(query_list, title='Время выполнения запросов SELECT (Zipf)',
+    #                      distributions={'gardens': 'zipf:1.2'})
 
 
     # insert_funcs = [
@@ -328,6 +328,11 @@ if __name__ == '__main__':
     # count_rows = [50, 100, 150, 200, 250, 300, 350, 400, 450, 500, 550, 600, 650, 700, 750, 800, 900, 1000]
     # plot_insert_graphics(insert_funcs, data_generators, count_rows, title='Время выполнения запросов INSERT')
     #
+    # Вставка грядок с "горячими" садами и фиксированным числом грядок на культуру:
+    # plot_insert_graphics([(insert_into_beds, 'insert_into_beds (zipf)')],
+    #                      [functools.partial(generator_random_bed, distributions={'gardens': 'zipf:1.2', 'crops': 'fanout:5'})],
+    #                      count_rows, title='Время выполнения запросов INSERT (неравномерные ключи)')
+    #
     # show_database_info()
 
     delete_funcs = [
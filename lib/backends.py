@@ -0,0 +1,687 @@
+"""
+Модуль: backends
+
+Этот модуль предоставляет бэкенды хранения для db_controller: сервер MySQL и встроенную базу SQLite.
+"""
+
+import datetime
+import decimal
+import os
+import re
+import sqlite3
+import zlib
+
+import mysql.connector
+
+
+# Ошибки, которые может выбросить любой из бэкендов
+Error = (mysql.connector.Error, sqlite3.Error)
+
+
+class MySQLBackend:
+    name = 'mysql'
+    # Сервер умеет загружать файлы через LOAD DATA LOCAL INFILE
+    supports_load_data = True
+
+    def __init__(self, host='localhost', user='admin', password='root', **connect_kwargs):
+        """
+        Инициализирует бэкенд, подключающийся к серверу MySQL.
+
+        Параметры:
+        -----------
+        host, user, password : str, optional
+            Параметры подключения. По умолчанию 'localhost', 'admin', 'root'.
+        **connect_kwargs
+            Дополнительные параметры mysql.connector.connect().
+        """
+        self.connect_kwargs = dict(host=host, user=user, password=password, **connect_kwargs)
+        self._max_statement_bytes = None
+
+    def connect(self, database=None, **kwargs):
+        """
+        Открывает новое соединение с сервером MySQL.
+
+        Параметры:
+        -----------
+        database : str, optional
+            Имя базы данных. По умолчанию None.
+        **kwargs
+            Параметры, переопределяющие параметры подключения бэкенда.
+
+        Возвращает:
+        --------
+        mysql.connector.connection.MySQLConnection
+            Объект соединения с сервером MySQL.
+        """
+        params = dict(self.connect_kwargs, database=database)
+        params.update(kwargs)
+        conn = mysql.connector.connect(**params)
+        print(f"Successfully connected to the MySQL server{' and database ' + database if database else ''}")
+        return conn
+
+    @staticmethod
+    def is_alive(conn):
+        """
+        Проверяет соединение командой ping без переподключения.
+        """
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    # Экранирование строк совпадает с mysql.connector для режима без NO_BACKSLASH_ESCAPES
+    _ESCAPES = str.maketrans({'\\': '\\\\', '\n': '\\n', '\r': '\\r', "'": "\\'", '"': '\\"',
+                              '\x00': '\\0', '\x1a': '\\Z'})
+
+    def literal(self, value):
+        """
+        Возвращает значение в виде литерала SQL для MySQL.
+        """
+        if isinstance(value, str):
+            return "'" + value.translate(self._ESCAPES) + "'"
+        return _literal(value)
+
+    def max_statement_bytes(self, cursor):
+        """
+        Возвращает максимальный размер запроса (max_allowed_packet) сервера.
+        Значение запрашивается один раз и кэшируется в бэкенде.
+        """
+        if self._max_statement_bytes is None:
+            cursor.execute("SELECT @@max_allowed_packet")
+            self._max_statement_bytes = int(cursor.fetchone()[0])
+        return self._max_statement_bytes
+
+    @staticmethod
+    def first_inserted_id(cursor, count):
+        """
+        Возвращает первый AUTO_INCREMENT идентификатор, выданный последним многострочным INSERT.
+        MySQL сообщает в lastrowid идентификатор первой строки; строки одного простого INSERT
+        получают последовательные идентификаторы при auto_increment_increment = 1.
+        """
+        return cursor.lastrowid
+
+    def begin_bulk_load(self, cursor):
+        """
+        Отключает проверки внешних ключей и уникальности и автоподтверждение для сеанса.
+
+        Возвращает:
+        --------
+        tuple
+            Исходные значения (foreign_key_checks, unique_checks, autocommit).
+        """
+        cursor.execute("SELECT @@SESSION.foreign_key_checks, @@SESSION.unique_checks, @@SESSION.autocommit")
+        saved = tuple(int(value) for value in cursor.fetchone())
+        cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0, autocommit = 0")
+        return saved
+
+    def end_bulk_load(self, cursor, saved):
+        """
+        Восстанавливает значения, сохранённые begin_bulk_load().
+        """
+        cursor.execute("SET SESSION foreign_key_checks = %s, unique_checks = %s, autocommit = %s" % saved)
+
+    def foreign_keys(self, cursor):
+        """
+        Возвращает внешние ключи текущей базы данных.
+
+        Возвращает:
+        --------
+        list of tuples
+            Кортежи (таблица, столбец, родительская таблица, столбец родительской таблицы).
+        """
+        cursor.execute("SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                       "FROM information_schema.KEY_COLUMN_USAGE "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL "
+                       "ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION")
+        return [tuple(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def row_checksum(columns):
+        """
+        Возвращает выражение SQL с контрольной суммой CRC32 значений столбцов строки.
+        """
+        return "CRC32(CONCAT_WS('#', " + ", ".join(f"COALESCE({column}, '\\\\N')" for column in columns) + "))"
+
+    def lock_for_snapshot(self, cursor):
+        """
+        Останавливает запись во все таблицы сервера (FLUSH TABLES WITH READ LOCK), чтобы несколько
+        соединений начали снимки данных в одной точке. Требует привилегии RELOAD.
+        """
+        cursor.execute("FLUSH TABLES WITH READ LOCK")
+
+    def unlock_after_snapshot(self, cursor):
+        """
+        Снимает блокировку, установленную lock_for_snapshot().
+        """
+        cursor.execute("UNLOCK TABLES")
+
+    def start_snapshot(self, cursor):
+        """
+        Начинает транзакцию только для чтения с согласованным снимком данных (InnoDB).
+        """
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+
+    def attach_database(self, cursor, database):
+        """
+        Делает таблицы другой базы данных доступными в запросах соединения. Все базы данных
+        бэкенда находятся на одном сервере, поэтому достаточно указать имя базы перед таблицей.
+
+        Возвращает:
+        --------
+        str
+            Префикс имён таблиц базы данных, например `sandbox`.
+        """
+        return f"`{database}`"
+
+    def detach_database(self, cursor, schema):
+        """
+        Отменяет attach_database(). Для MySQL ничего не делает.
+        """
+
+    def primary_key(self, cursor, table):
+        """
+        Возвращает столбцы первичного ключа таблицы текущей базы данных.
+
+        Возвращает:
+        --------
+        list of str
+            Имена столбцов в порядке ключа; пустой список, если первичного ключа нет.
+        """
+        cursor.execute("SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY' "
+                       "ORDER BY ORDINAL_POSITION", (table,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def secondary_indexes(self, cursor):
+        """
+        Возвращает вторичные индексы текущей базы данных, которые можно временно удалить.
+        Индексы, начинающиеся со столбца внешнего ключа, не возвращаются: без них MySQL
+        не позволит удалить индекс.
+
+        Возвращает:
+        --------
+        list of tuples
+            Кортежи (таблица, имя индекса, запрос удаления, запрос создания).
+        """
+        fk_columns = {(table, column) for table, column, _, _ in self.foreign_keys(cursor)}
+        cursor.execute("SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME, SUB_PART "
+                       "FROM information_schema.STATISTICS "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME <> 'PRIMARY' "
+                       "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX")
+        indexes = {}
+        for table, name, non_unique, column, sub_part in cursor.fetchall():
+            index = indexes.setdefault((table, name), {'unique': not int(non_unique), 'columns': []})
+            index['columns'].append(f"`{column}`" + (f"({sub_part})" if sub_part else ''))
+
+        result = []
+        for (table, name), index in indexes.items():
+            if (table, index['columns'][0].split('`')[1]) in fk_columns:
+                continue
+            kind = 'UNIQUE INDEX' if index['unique'] else 'INDEX'
+            result.append((table, name,
+                           f"ALTER TABLE `{table}` DROP INDEX `{name}`",
+                           f"ALTER TABLE `{table}` ADD {kind} `{name}` ({', '.join(index['columns'])})"))
+        return result
+
+
+class SQLiteBackend:
+    name = 'sqlite'
+    supports_load_data = False
+
+    # Настройки по умолчанию подобраны для скорости: журнал WAL, синхронизация NORMAL,
+    # отображение файла в память и кэш страниц на 64 МБ
+    DEFAULT_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+        'busy_timeout': 30000,
+    }
+
+    # Параметры подключения к серверу, не имеющие смысла для встроенной базы
+    SERVER_OPTIONS = {'host', 'port', 'user', 'password', 'charset', 'collation', 'allow_local_infile'}
+
+    def __init__(self, data_dir='.', pragmas=None):
+        """
+        Инициализирует бэкенд, хранящий каждую базу данных в отдельном файле SQLite.
+
+        Параметры:
+        -----------
+        data_dir : str, optional
+            Каталог с файлами баз данных. По умолчанию текущий каталог.
+        pragmas : dict, optional
+            PRAGMA, переопределяющие DEFAULT_PRAGMAS.
+        """
+        self.data_dir = data_dir
+        self.pragmas = dict(self.DEFAULT_PRAGMAS, **(pragmas or {}))
+        self._max_statement_bytes = None
+
+    def path(self, database):
+        """
+        Возвращает путь к файлу базы данных или ':memory:', если имя базы не указано.
+        """
+        if database is None:
+            return ':memory:'
+        return os.path.join(self.data_dir, f'{database}.sqlite3')
+
+    def connect(self, database=None, **kwargs):
+        """
+        Открывает соединение с файлом базы данных SQLite.
+
+        Параметры:
+        -----------
+        database : str, optional
+            Имя базы данных. По умолчанию None (база в памяти).
+        **kwargs
+            Параметры подключения к серверу MySQL игнорируются.
+
+        Возвращает:
+        --------
+        SQLiteConnection
+            Соединение с интерфейсом, совместимым с mysql.connector.
+        """
+        unknown = set(kwargs) - self.SERVER_OPTIONS
+        if unknown:
+            raise TypeError(f"Unsupported SQLite connection options: {', '.join(sorted(unknown))}")
+
+        path = self.path(database)
+        if database is not None:
+            os.makedirs(self.data_dir, exist_ok=True)
+        raw = sqlite3.connect(path, check_same_thread=False)
+        for pragma, value in self.pragmas.items():
+            raw.execute(f"PRAGMA {pragma} = {value}")
+        raw.create_function('crc32', 1, _crc32, deterministic=True)
+        print(f"Successfully connected to the SQLite database {path}")
+        return SQLiteConnection(raw)
+
+    @staticmethod
+    def is_alive(conn):
+        """
+        Проверяет, что соединение с базой SQLite не закрыто.
+        """
+        return conn.is_connected()
+
+    def literal(self, value):
+        """
+        Возвращает значение в виде литерала SQL для SQLite.
+        """
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        return _literal(value)
+
+    def max_statement_bytes(self, cursor):
+        """
+        Возвращает максимальную длину запроса SQLite (SQLITE_LIMIT_SQL_LENGTH).
+        """
+        if self._max_statement_bytes is None:
+            raw = cursor.raw.connection
+            if hasattr(raw, 'getlimit'):
+                self._max_statement_bytes = raw.getlimit(sqlite3.SQLITE_LIMIT_SQL_LENGTH)
+            else:
+                self._max_statement_bytes = 1000000000
+        return self._max_statement_bytes
+
+    @staticmethod
+    def first_inserted_id(cursor, count):
+        """
+        Возвращает первый идентификатор, выданный последним многострочным INSERT.
+        SQLite сообщает в lastrowid идентификатор последней строки.
+        """
+        return cursor.lastrowid - count + 1
+
+    def begin_bulk_load(self, cursor):
+        """
+        Отключает проверку внешних ключей. Проверки уникальности в SQLite не отключаются,
+        а автоподтверждения нет: транзакция открывается неявно перед первым изменением.
+
+        Возвращает:
+        --------
+        int
+            Исходное значение PRAGMA foreign_keys.
+        """
+        cursor.execute("PRAGMA foreign_keys")
+        saved = int(cursor.fetchone()[0])
+        cursor.execute("PRAGMA foreign_keys = OFF")
+        return saved
+
+    def end_bulk_load(self, cursor, saved):
+        """
+        Восстанавливает значение, сохранённое begin_bulk_load().
+        """
+        cursor.execute(f"PRAGMA foreign_keys = {'ON' if saved else 'OFF'}")
+
+    def foreign_keys(self, cursor):
+        """
+        Возвращает внешние ключи базы данных.
+
+        Возвращает:
+        --------
+        list of tuples
+            Кортежи (таблица, столбец, родительская таблица, столбец родительской таблицы).
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+        tables = [row[0] for row in cursor.fetchall()]
+        result = []
+        for table in tables:
+            cursor.execute(f"SELECT \"from\", \"table\", \"to\" FROM pragma_foreign_key_list('{table}') ORDER BY id, seq")
+            # Ссылка без указания столбца указывает на первичный ключ, то есть на rowid
+            result.extend((table, column, parent, parent_column or 'rowid')
+                          for column, parent, parent_column in cursor.fetchall())
+        return result
+
+    @staticmethod
+    def row_checksum(columns):
+        """
+        Возвращает выражение SQL с контрольной суммой CRC32 значений столбцов строки.
+        Функция crc32() регистрируется в каждом соединении, открытом connect().
+        """
+        return "crc32(" + " || '#' || ".join(f"COALESCE({column}, '\\N')" for column in columns) + ")"
+
+    def lock_for_snapshot(self, cursor):
+        """
+        Захватывает блокировку записи (BEGIN IMMEDIATE): другие соединения могут читать, но не писать,
+        поэтому снимки, начатые до unlock_after_snapshot(), совпадают.
+        """
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def unlock_after_snapshot(self, cursor):
+        """
+        Снимает блокировку, установленную lock_for_snapshot().
+        """
+        cursor.execute("ROLLBACK")
+
+    def start_snapshot(self, cursor):
+        """
+        Начинает транзакцию чтения. Снимок данных фиксируется первым чтением, поэтому оно
+        выполняется сразу.
+        """
+        cursor.execute("BEGIN")
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master")
+        cursor.fetchall()
+
+    def attach_database(self, cursor, database):
+        """
+        Подключает файл другой базы данных к соединению командой ATTACH DATABASE.
+        Команда должна выполняться вне транзакции.
+
+        Возвращает:
+        --------
+        str
+            Префикс имён таблиц подключённой базы данных, например "sandbox".
+        """
+        cursor.execute(f'ATTACH DATABASE %s AS "{database}"', (self.path(database),))
+        return f'"{database}"'
+
+    def detach_database(self, cursor, schema):
+        """
+        Отключает базу данных, подключённую attach_database(). Команда должна выполняться вне транзакции.
+        """
+        cursor.execute(f"DETACH DATABASE {schema}")
+
+    def primary_key(self, cursor, table):
+        """
+        Возвращает столбцы первичного ключа таблицы.
+
+        Возвращает:
+        --------
+        list of str
+            Имена столбцов в порядке ключа; пустой список, если первичного ключа нет.
+        """
+        cursor.execute(f"SELECT name FROM pragma_table_info('{table}') WHERE pk > 0 ORDER BY pk")
+        return [row[0] for row in cursor.fetchall()]
+
+    def secondary_indexes(self, cursor):
+        """
+        Возвращает индексы, созданные запросами CREATE INDEX.
+
+        Возвращает:
+        --------
+        list of tuples
+            Кортежи (таблица, имя индекса, запрос удаления, запрос создания).
+        """
+        cursor.execute("SELECT tbl_name, name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+                       "ORDER BY tbl_name, name")
+        return [(table, name, f'DROP INDEX "{name}"', sql) for table, name, sql in cursor.fetchall()]
+
+
+def _literal(value):
+    # Общая для бэкендов часть перевода значений Python в литералы SQL (кроме строк)
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "X'" + bytes(value).hex() + "'"
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+        return "'" + str(value) + "'"
+    raise TypeError(f"Cannot convert value of type {type(value).__name__} to an SQL literal")
+
+
+def _crc32(value):
+    # Аналог функции CRC32() MySQL для SQLite
+    if value is None:
+        return None
+    if not isinstance(value, bytes):
+        value = str(value).encode('utf-8')
+    return zlib.crc32(value)
+
+
+class SQLiteConnection:
+    def __init__(self, raw):
+        """
+        Инициализирует обёртку над sqlite3.Connection с интерфейсом mysql.connector.
+
+        Параметры:
+        -----------
+        raw : sqlite3.Connection
+            Исходное соединение sqlite3.
+        """
+        self.raw = raw
+        self._closed = False
+
+    def cursor(self, **kwargs):
+        return SQLiteCursor(self.raw.cursor())
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if not self._closed:
+            self.raw.close()
+            self._closed = True
+
+    def is_connected(self):
+        if self._closed:
+            return False
+        try:
+            self.raw.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def ping(self, reconnect=False, **kwargs):
+        if not self.is_connected():
+            raise sqlite3.OperationalError("Connection to SQLite database is closed")
+
+    @property
+    def in_transaction(self):
+        return not self._closed and self.raw.in_transaction
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteCursor:
+    def __init__(self, raw):
+        """
+        Инициализирует обёртку над sqlite3.Cursor, переводящую запросы MySQL в диалект SQLite.
+
+        Параметры:
+        -----------
+        raw : sqlite3.Cursor
+            Исходный курсор sqlite3.
+        """
+        self.raw = raw
+        self._noop = False
+
+    def execute(self, query, params=None):
+        query = translate_query(query, params is not None)
+        self._noop = query is None
+        if self._noop:
+            return
+        self.raw.execute(query, params or ())
+
+    def executemany(self, query, seq_params):
+        query = translate_query(query, True)
+        self._noop = query is None
+        if self._noop:
+            return
+        self.raw.executemany(query, seq_params)
+
+    def fetchone(self):
+        return None if self._noop else self.raw.fetchone()
+
+    def fetchmany(self, size=1):
+        return [] if self._noop else self.raw.fetchmany(size)
+
+    def fetchall(self):
+        return [] if self._noop else self.raw.fetchall()
+
+    @property
+    def description(self):
+        return None if self._noop else self.raw.description
+
+    @property
+    def rowcount(self):
+        return 0 if self._noop else self.raw.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.raw.lastrowid
+
+    def close(self):
+        self.raw.close()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Правила перевода служебных команд MySQL в запросы SQLite
+_COMMAND_RULES = [
+    (re.compile(r"^\s*CREATE\s+DATABASE\b", re.I),
+     lambda m: None),
+    (re.compile(r"^\s*SHOW\s+TABLES\s*;?\s*$", re.I),
+     lambda m: "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"),
+    (re.compile(r"^\s*SHOW\s+CREATE\s+TABLE\s+`?(\w+)`?\s*;?\s*$", re.I),
+     lambda m: f"SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name = '{m.group(1)}'"),
+    (re.compile(r"^\s*(?:DESCRIBE|DESC)\s+`?(\w+)`?\s*;?\s*$", re.I),
+     lambda m: "SELECT name, type, CASE WHEN \"notnull\" THEN 'NO' ELSE 'YES' END, "
+               "CASE WHEN pk THEN 'PRI' ELSE '' END, dflt_value, '' "
+               f"FROM pragma_table_info('{m.group(1)}')"),
+    (re.compile(r"^\s*SET\s+FOREIGN_KEY_CHECKS\s*=\s*([01])\s*;?\s*$", re.I),
+     lambda m: f"PRAGMA foreign_keys = {'ON' if m.group(1) == '1' else 'OFF'}"),
+]
+
+_AUTO_INCREMENT_PK = re.compile(r"\bINT(?:EGER)?\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I)
+_ON_DUPLICATE_NOOP = re.compile(r"^\s*INSERT\s+INTO\b(.*)\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+(\w+)\s*=\s*\2\s*;?\s*$",
+                                re.I | re.S)
+_ON_DUPLICATE_UPDATE = re.compile(r"\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+((?:\w+\s*=\s*VALUES\(\w+\)\s*,?\s*)+);?\s*$", re.I)
+_VALUES_ASSIGNMENT = re.compile(r"(\w+)\s*=\s*VALUES\((\w+)\)", re.I)
+
+# Длина конца запроса, в котором ищется предложение ON DUPLICATE KEY UPDATE col=VALUES(col), ...
+_ON_DUPLICATE_TAIL = 4096
+
+
+def translate_query(query, has_params):
+    """
+    Переводит запрос из диалекта MySQL в диалект SQLite.
+
+    Параметры:
+    -----------
+    query : str
+        Запрос в диалекте MySQL.
+    has_params : bool
+        Передаются ли в запрос параметры. Только в этом случае %s заменяется на ?.
+
+    Возвращает:
+    --------
+    str or None
+        Запрос для SQLite или None, если команда не имеет смысла для SQLite.
+    """
+    head = query[:64].lstrip().upper()
+    if head.startswith(('CREATE', 'SHOW', 'DESC', 'SET')):
+        for pattern, rule in _COMMAND_RULES:
+            match = pattern.match(query)
+            if match:
+                return rule(match)
+        if head.startswith('CREATE'):
+            query = _AUTO_INCREMENT_PK.sub('INTEGER PRIMARY KEY AUTOINCREMENT', query)
+    elif head.startswith('INSERT') and 'VALUES(' in query[-_ON_DUPLICATE_TAIL:].upper():
+        # Обновление существующей строки значениями вставляемой (SQLite 3.35+)
+        match = _ON_DUPLICATE_UPDATE.search(query, max(0, len(query) - _ON_DUPLICATE_TAIL))
+        if match:
+            assignments = _VALUES_ASSIGNMENT.sub(r"\1 = excluded.\2", match.group(1).strip())
+            query = f"{query[:match.start()]} ON CONFLICT DO UPDATE SET {assignments}"
+    elif head.startswith('INSERT') and 'DUPLICATE' in query[-64:].upper():
+        match = _ON_DUPLICATE_NOOP.match(query)
+        if match:
+            query = f"INSERT OR IGNORE INTO{match.group(1)}"
+
+    if has_params:
+        query = query.replace('%s', '?')
+    return query
+
+
+_backend = None
+
+
+def get_backend():
+    """
+    Возвращает текущий бэкенд. При первом обращении он выбирается по переменным окружения
+    GARDEN_DB_BACKEND ('mysql' или 'sqlite') и GARDEN_DB_PATH (каталог файлов SQLite).
+
+    Возвращает:
+    --------
+    MySQLBackend or SQLiteBackend
+        Текущий бэкенд.
+    """
+    global _backend
+    if _backend is None:
+        if os.environ.get('GARDEN_DB_BACKEND', 'mysql').lower() == 'sqlite':
+            _backend = SQLiteBackend(os.environ.get('GARDEN_DB_PATH', '.'))
+        else:
+            _backend = MySQLBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Устанавливает бэкенд, через который работают функции db_controller.
+
+    Параметры:
+    -----------
+    backend : MySQLBackend or SQLiteBackend
+        Новый бэкенд.
+    """
+    global _backend
+    _backend = backend
@@ -0,0 +1,92 @@
+"""
+Модуль: backup_codecs
+
+Этот модуль предоставляет сжатие файлов бэкапа (gzip, lzma, bz2), выбор способа сжатия по имени файла
+и измерение пикового потребления памяти процессом для отчёта о бэкапе.
+"""
+
+import bz2
+import gzip
+import lzma
+import sys
+import zlib
+
+try:
+    import resource
+except ImportError:  # Модуль resource есть только в Unix: без него пиковая память не измеряется
+    resource = None
+
+
+# Способы сжатия: расширение файла бэкапа и функция открытия файла с уровнем сжатия
+BACKUP_CODECS = {
+    'none': ('.sql', lambda path, mode, level: open(path, mode, encoding='utf-8', newline='\n')),
+    'gzip': ('.sql.gz', lambda path, mode, level: gzip.open(path, mode, compresslevel=9 if level is None else level,
+                                                            encoding='utf-8', newline='\n')),
+    'lzma': ('.sql.xz', lambda path, mode, level: lzma.open(path, mode, preset=level, encoding='utf-8', newline='\n')),
+    'bz2': ('.sql.bz2', lambda path, mode, level: bz2.open(path, mode, compresslevel=9 if level is None else level,
+                                                           encoding='utf-8', newline='\n')),
+}
+
+# Способ сжатия бэкапа по умолчанию
+DEFAULT_BACKUP_CODEC = 'gzip'
+
+# Исключения, которыми чтение сообщает о повреждённом или обрезанном файле бэкапа:
+# ошибки распаковки, неожиданный конец сжатого потока и ошибки декодирования utf-8
+BACKUP_READ_ERRORS = (EOFError, OSError, ValueError, zlib.error, lzma.LZMAError)
+
+
+def codec_for_path(path):
+    """
+    Определяет способ сжатия файла бэкапа по расширению.
+
+    Параметры:
+    -----------
+    path : str
+        Путь к файлу бэкапа.
+
+    Возвращает:
+    --------
+    str
+        Имя способа сжатия из BACKUP_CODECS; 'none' для файлов без известного расширения.
+    """
+    for codec, (extension, _) in BACKUP_CODECS.items():
+        if codec != 'none' and path.endswith(extension):
+            return codec
+    return 'none'
+
+
+def open_backup(path, mode='rt', codec=None, level=None):
+    """
+    Открывает файл бэкапа как текстовый поток в кодировке utf-8.
+
+    Параметры:
+    -----------
+    path : str
+        Путь к файлу бэкапа.
+    mode : str, optional
+        Режим 'rt' или 'wt'. По умолчанию 'rt'.
+    codec : str, optional
+        Способ сжатия из BACKUP_CODECS. По умолчанию определяется по расширению файла.
+    level : int, optional
+        Уровень сжатия (1-9, для lzma - preset 0-9). По умолчанию уровень способа сжатия.
+
+    Возвращает:
+    --------
+    текстовый поток
+        Поток, который сжимает записываемые данные или распаковывает читаемые.
+    """
+    codec = codec or codec_for_path(path)
+    if codec not in BACKUP_CODECS:
+        raise ValueError(f"Unknown backup codec '{codec}', expected one of {tuple(BACKUP_CODECS)}")
+    return BACKUP_CODECS[codec][1](path, mode, level)
+
+
+def peak_rss_bytes():
+    """
+    Возвращает пиковый размер резидентной памяти процесса в байтах или None, если он недоступен.
+    """
+    if resource is None:
+        return None
+    # В Linux ru_maxrss указывается в килобайтах, в macOS - в байтах
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
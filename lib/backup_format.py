@@ -0,0 +1,409 @@
+"""
+Модуль: backup_format
+
+Этот модуль предоставляет двоичный формат бэкапа: строки таблиц хранятся блоками с типизированными
+значениями, у каждого блока есть длина и контрольная сумма CRC32, а в конце файла записан индекс
+с положением блоков и диапазоном ключей каждого блока. Индекс позволяет читать из отображённого
+в память файла только нужные таблицы и диапазоны ключей.
+
+Структура файла:
+    BACKUP_MAGIC
+    блоки: BLOCK_HEADER (длина данных, количество строк, CRC32 данных) и данные
+    индекс: JSON в utf-8
+    TRAILER (смещение индекса, длина индекса, CRC32 индекса) и BACKUP_MAGIC
+"""
+
+import bz2
+import datetime
+import decimal
+import gzip
+import json
+import lzma
+import mmap
+import struct
+import zlib
+
+
+# Сигнатура в начале и в конце файла
+BACKUP_MAGIC = b'GRDNBAK1'
+
+# Расширение файлов двоичного бэкапа
+BINARY_BACKUP_EXTENSION = '.gbak'
+
+BLOCK_HEADER = struct.Struct('<III')
+TRAILER = struct.Struct('<QQI')
+
+# Сжатие данных блоков: каждый блок сжимается отдельно, чтобы его можно было прочитать без соседних
+BLOCK_CODECS = {
+    'none': (lambda data, level: data, lambda data: data),
+    'gzip': (lambda data, level: gzip.compress(data, 9 if level is None else level, mtime=0), gzip.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    'bz2': (lambda data, level: bz2.compress(data, 9 if level is None else level), bz2.decompress),
+}
+
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_LENGTH = struct.Struct('<I')
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class BackupFormatError(Exception):
+    """
+    Исключение, возникающее, если файл бэкапа повреждён или не является двоичным бэкапом.
+    """
+
+
+def _append_text(out, tag, text):
+    data = text.encode('utf-8')
+    out += tag
+    out += _LENGTH.pack(len(data))
+    out += data
+
+
+def encode_rows(rows):
+    """
+    Кодирует строки таблицы в данные блока. Перед каждым значением записывается тег типа:
+    N - NULL, I - 64-битное целое, F - double, S - строка, B - двоичные данные,
+    D - десятичное число (и целое вне 64 бит), T - дата или время в текстовом виде.
+
+    Параметры:
+    -----------
+    rows : list of tuples
+        Строки таблицы.
+
+    Возвращает:
+    --------
+    bytes
+        Данные блока.
+    """
+    out = bytearray()
+    for row in rows:
+        for value in row:
+            if value is None:
+                out += b'N'
+            elif isinstance(value, int):
+                if _INT_MIN <= value <= _INT_MAX:
+                    out += b'I'
+                    out += _INT.pack(value)
+                else:
+                    _append_text(out, b'D', str(value))
+            elif isinstance(value, float):
+                out += b'F'
+                out += _FLOAT.pack(value)
+            elif isinstance(value, str):
+                _append_text(out, b'S', value)
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                data = bytes(value)
+                out += b'B'
+                out += _LENGTH.pack(len(data))
+                out += data
+            elif isinstance(value, decimal.Decimal):
+                _append_text(out, b'D', str(value))
+            elif isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+                _append_text(out, b'T', str(value))
+            else:
+                raise TypeError(f"Cannot store value of type {type(value).__name__} in a binary backup")
+    return bytes(out)
+
+
+def decode_rows(data, count, width):
+    """
+    Декодирует данные блока, записанные encode_rows().
+
+    Параметры:
+    -----------
+    data : bytes-like
+        Данные блока.
+    count : int
+        Количество строк.
+    width : int
+        Количество столбцов.
+
+    Возвращает:
+    --------
+    list of tuples
+        Строки таблицы. Даты и время возвращаются строками, десятичные числа - decimal.Decimal.
+    """
+    rows = []
+    position = 0
+    for _ in range(count):
+        row = []
+        for _ in range(width):
+            tag = data[position]
+            position += 1
+            if tag == 0x4E:  # N
+                row.append(None)
+            elif tag == 0x49:  # I
+                row.append(_INT.unpack_from(data, position)[0])
+                position += 8
+            elif tag == 0x46:  # F
+                row.append(_FLOAT.unpack_from(data, position)[0])
+                position += 8
+            else:
+                length = _LENGTH.unpack_from(data, position)[0]
+                position += 4
+                raw = bytes(data[position:position + length])
+                position += length
+                if tag == 0x42:  # B
+                    row.append(raw)
+                elif tag == 0x44:  # D
+                    row.append(decimal.Decimal(raw.decode('utf-8')))
+                elif tag in (0x53, 0x54):  # S, T
+                    row.append(raw.decode('utf-8'))
+                else:
+                    raise BackupFormatError(f"Unknown value tag {tag!r} at offset {position - 5}")
+        rows.append(tuple(row))
+    if position != len(data):
+        raise BackupFormatError(f"Block has {len(data) - position} trailing bytes")
+    return rows
+
+
+class BackupWriter:
+    def __init__(self, stream, codec='none', level=None):
+        """
+        Инициализирует запись двоичного бэкапа.
+
+        Параметры:
+        -----------
+        stream : двоичный поток
+            Поток, открытый на запись, например open(path, 'wb').
+        codec : str, optional
+            Способ сжатия блоков из BLOCK_CODECS. По умолчанию 'none'.
+        level : int, optional
+            Уровень сжатия. По умолчанию уровень способа сжатия.
+        """
+        if codec not in BLOCK_CODECS:
+            raise ValueError(f"Unknown block codec '{codec}', expected one of {tuple(BLOCK_CODECS)}")
+        self.stream = stream
+        self.codec = codec
+        self.level = level
+        self.tables = []
+        self._compress = BLOCK_CODECS[codec][0]
+        self._offset = len(BACKUP_MAGIC)
+        stream.write(BACKUP_MAGIC)
+
+    def begin_table(self, name, columns):
+        """
+        Начинает таблицу; следующие блоки относятся к ней.
+
+        Параметры:
+        -----------
+        name : str
+            Имя таблицы.
+        columns : list of str
+            Имена столбцов. Первый столбец считается ключом для выборки по диапазону.
+        """
+        self.tables.append({'name': name, 'columns': list(columns), 'rows': 0, 'bytes': 0, 'blocks': []})
+
+    def write_block(self, rows):
+        """
+        Записывает блок строк текущей таблицы.
+
+        Параметры:
+        -----------
+        rows : list of tuples
+            Строки таблицы.
+        """
+        if not rows:
+            return
+        table = self.tables[-1]
+        payload = encode_rows(rows)
+        stored = self._compress(payload, self.level)
+        self.stream.write(BLOCK_HEADER.pack(len(stored), len(rows), zlib.crc32(stored)))
+        self.stream.write(stored)
+        keys = [row[0] for row in rows]
+        # Диапазон ключей блока известен только для целочисленного первого столбца
+        key_range = [min(keys), max(keys)] if all(type(key) is int for key in keys) else None
+        table['blocks'].append([self._offset, len(rows), key_range])
+        table['rows'] += len(rows)
+        table['bytes'] += len(payload)
+        self._offset += BLOCK_HEADER.size + len(stored)
+
+    def append_from(self, reader, table):
+        """
+        Копирует блоки таблицы из другого двоичного бэкапа без перекодирования. Если текущая
+        таблица называется так же, блоки дописываются к ней, иначе начинается новая таблица.
+
+        Параметры:
+        -----------
+        reader : BackupReader
+            Бэкап с тем же способом сжатия блоков.
+        table : str
+            Имя таблицы.
+        """
+        if reader.codec != self.codec:
+            raise ValueError(f"Cannot append blocks compressed with '{reader.codec}' to a '{self.codec}' backup")
+        entry = reader.tables[table]
+        if not self.tables or self.tables[-1]['name'] != table:
+            self.begin_table(table, entry['columns'])
+        current = self.tables[-1]
+        for offset, rows, key_range in entry['blocks']:
+            length = BLOCK_HEADER.unpack_from(reader._map, offset)[0] + BLOCK_HEADER.size
+            self.stream.write(reader._map[offset:offset + length])
+            current['blocks'].append([self._offset, rows, key_range])
+            self._offset += length
+        current['rows'] += entry['rows']
+        current['bytes'] += entry['bytes']
+
+    def close(self):
+        """
+        Записывает индекс и завершающую запись. Поток не закрывается.
+        """
+        index = json.dumps({'version': 1, 'codec': self.codec, 'tables': self.tables},
+                           ensure_ascii=False).encode('utf-8')
+        self.stream.write(index)
+        self.stream.write(TRAILER.pack(self._offset, len(index), zlib.crc32(index)))
+        self.stream.write(BACKUP_MAGIC)
+
+
+class BackupReader:
+    def __init__(self, path):
+        """
+        Открывает двоичный бэкап и читает его индекс. Файл отображается в память: блоки
+        читаются с диска только при обращении к ним.
+
+        Параметры:
+        -----------
+        path : str
+            Путь к файлу бэкапа.
+
+        Атрибуты:
+        --------
+        tables : dict
+            Записи индекса по именам таблиц: columns, rows, bytes и blocks
+            (смещение, количество строк, диапазон ключей или None).
+        codec : str
+            Способ сжатия блоков.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            if size < len(BACKUP_MAGIC) * 2 + TRAILER.size:
+                raise BackupFormatError(f"File '{path}' is too small for a binary backup")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            data = self._map
+            if data[:len(BACKUP_MAGIC)] != BACKUP_MAGIC or data[-len(BACKUP_MAGIC):] != BACKUP_MAGIC:
+                raise BackupFormatError(f"File '{path}' is not a binary backup")
+            offset, length, checksum = TRAILER.unpack_from(data, size - len(BACKUP_MAGIC) - TRAILER.size)
+            index = data[offset:offset + length]
+            if zlib.crc32(index) != checksum:
+                raise BackupFormatError(f"Index checksum mismatch in '{path}'")
+            index = json.loads(index.decode('utf-8'))
+        except BaseException:
+            self._map.close()
+            raise
+        self.codec = index['codec']
+        self.tables = {table['name']: table for table in index['tables']}
+        self._decompress = BLOCK_CODECS[self.codec][1]
+
+    def read_block(self, table, offset):
+        """
+        Читает блок таблицы по смещению из индекса и проверяет его контрольную сумму.
+
+        Возвращает:
+        --------
+        list of tuples
+            Строки блока.
+        """
+        count, stored = self._stored_block(table, offset)
+        return decode_rows(self._decompress(stored), count, len(self.tables[table]['columns']))
+
+    def _stored_block(self, table, offset):
+        length, count, checksum = BLOCK_HEADER.unpack_from(self._map, offset)
+        start = offset + BLOCK_HEADER.size
+        stored = self._map[start:start + length]
+        if len(stored) != length or zlib.crc32(stored) != checksum:
+            raise BackupFormatError(f"Checksum mismatch in block at offset {offset} of table '{table}'")
+        return count, stored
+
+    def verify_block(self, table, block, decode=False):
+        """
+        Проверяет блок таблицы без восстановления: контрольную сумму сжатых данных и количество
+        строк в заголовке блока и в индексе.
+
+        Параметры:
+        -----------
+        table : str
+            Имя таблицы.
+        block : list
+            Запись индекса блока (смещение, количество строк, диапазон ключей).
+        decode : bool, optional
+            Также распаковать и разобрать строки блока. По умолчанию False.
+
+        Возвращает:
+        --------
+        int
+            Размер проверенного блока в файле в байтах.
+        """
+        offset, rows, _ = block
+        count, stored = self._stored_block(table, offset)
+        if count != rows:
+            raise BackupFormatError(f"Block at offset {offset} of table '{table}' has {count} rows, index says {rows}")
+        if decode:
+            try:
+                decode_rows(self._decompress(stored), count, len(self.tables[table]['columns']))
+            except BackupFormatError:
+                raise
+            except Exception as e:
+                raise BackupFormatError(f"Block at offset {offset} of table '{table}' cannot be decoded: {e}") from e
+        return BLOCK_HEADER.size + len(stored)
+
+    def blocks(self, table, id_range=None):
+        """
+        Возвращает записи индекса блоков таблицы, которые могут содержать ключи из id_range.
+
+        Параметры:
+        -----------
+        table : str
+            Имя таблицы.
+        id_range : tuple, optional
+            Диапазон ключей (первое значение, последнее значение) включительно. По умолчанию все блоки.
+        """
+        for block in self.tables[table]['blocks']:
+            key_range = block[2]
+            if id_range is None or key_range is None or (key_range[0] <= id_range[1] and key_range[1] >= id_range[0]):
+                yield block
+
+    def read_rows(self, table, id_range=None):
+        """
+        Читает строки таблицы блоками, пропуская блоки вне id_range без чтения с диска.
+
+        Параметры:
+        -----------
+        table : str
+            Имя таблицы.
+        id_range : tuple, optional
+            Диапазон значений первого столбца (первое, последнее) включительно. По умолчанию все строки.
+
+        Возвращает:
+        --------
+        iterator of lists
+            Строки каждого прочитанного блока.
+        """
+        if table not in self.tables:
+            raise KeyError(f"Table '{table}' is not in backup '{self.path}'")
+        for offset, _, _ in self.blocks(table, id_range):
+            rows = self.read_block(table, offset)
+            if id_range is not None:
+                low, high = id_range
+                rows = [row for row in rows if type(row[0]) is int and low <= row[0] <= high]
+            if rows:
+                yield rows
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def is_binary_backup(path):
+    """
+    Проверяет по сигнатуре, что файл является двоичным бэкапом.
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(BACKUP_MAGIC)) == BACKUP_MAGIC
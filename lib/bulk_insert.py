@@ -0,0 +1,153 @@
+"""
+Модуль: bulk_insert
+
+Этот модуль предоставляет пакетную вставку строк многострочными запросами INSERT ... VALUES,
+размер которых подбирается по ограничению сервера на длину запроса (max_allowed_packet).
+"""
+
+from array import array
+
+from lib.backends import get_backend
+
+
+# Максимальное количество строк в одном запросе INSERT по умолчанию
+BULK_MAX_ROWS = 1000
+
+# Запас на заголовок пакета протокола и служебные байты
+PACKET_RESERVE = 1024
+
+
+class BulkInserter:
+    def __init__(self, cursor, table, columns, max_rows=BULK_MAX_ROWS, max_bytes=None, backend=None,
+                 id_ranges=None, ignore_duplicates=False, update_duplicates=False):
+        """
+        Инициализирует пакетную вставку в таблицу.
+
+        Параметры:
+        -----------
+        cursor : курсор базы данных
+            Курсор, через который выполняются запросы.
+        table : str
+            Имя таблицы.
+        columns : list of str
+            Имена заполняемых столбцов.
+        max_rows : int, optional
+            Максимальное количество строк в одном запросе. По умолчанию BULK_MAX_ROWS.
+        max_bytes : int, optional
+            Максимальный размер запроса в байтах. По умолчанию max_allowed_packet сервера.
+        backend : MySQLBackend or SQLiteBackend, optional
+            Бэкенд, задающий экранирование значений. По умолчанию текущий бэкенд.
+        id_ranges : IdRanges, optional
+            Набор, в который добавляются идентификаторы вставленных строк. По умолчанию не ведётся.
+        ignore_duplicates : bool, optional
+            Пропускать строки с уже существующим ключом (ON DUPLICATE KEY UPDATE по первому столбцу),
+            чтобы повторная вставка тех же строк не завершалась ошибкой. По умолчанию False.
+        update_duplicates : bool, optional
+            Заменять значения строк с уже существующим ключом значениями вставляемых
+            (ON DUPLICATE KEY UPDATE col=VALUES(col) по остальным столбцам). По умолчанию False.
+
+        Атрибуты:
+        --------
+        rows_inserted : int
+            Количество строк, вставленных выполненными запросами.
+        statements : int
+            Количество выполненных запросов.
+        """
+        self.cursor = cursor
+        self.backend = backend or get_backend()
+        self.max_rows = max_rows
+        if max_bytes is None:
+            max_bytes = self.backend.max_statement_bytes(cursor)
+        self.header = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        if ignore_duplicates and update_duplicates:
+            raise ValueError("ignore_duplicates and update_duplicates are mutually exclusive")
+        if update_duplicates and len(columns) > 1:
+            self.suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(f"{col}=VALUES({col})" for col in columns[1:])
+        elif ignore_duplicates or update_duplicates:
+            self.suffix = f" ON DUPLICATE KEY UPDATE {columns[0]}={columns[0]}"
+        else:
+            self.suffix = ''
+        self._header_bytes = len(self.header.encode('utf-8')) + len(self.suffix)
+        self.max_bytes = max_bytes - PACKET_RESERVE
+        if self.max_bytes <= self._header_bytes:
+            raise ValueError(f"Statement size limit {max_bytes} is too small for an INSERT into {table}")
+
+        self._literal = self.backend.literal
+        self.id_ranges = id_ranges
+        self._values = []
+        self._bytes = self._header_bytes
+        self.rows_inserted = 0
+        self.statements = 0
+
+    def add(self, row):
+        """
+        Добавляет строку в текущий запрос, выполняя его заранее, если строка не помещается.
+
+        Параметры:
+        -----------
+        row : tuple
+            Значения столбцов строки.
+        """
+        literal = self._literal
+        self._add_values('(' + ', '.join([literal(value) for value in row]) + ')')
+
+    def add_batch(self, batch):
+        """
+        Добавляет пакет строк в столбцовом виде. Значения переводятся в литералы по столбцам.
+
+        Параметры:
+        -----------
+        batch : ColumnBatch
+            Пакет строк (см. columnar.ColumnBatch).
+        """
+        literal = self._literal
+        columns = [list(map(str, buffer)) if isinstance(buffer, array) else list(map(literal, buffer))
+                   for buffer in batch.buffers]
+        add_values = self._add_values
+        for values in map(', '.join, zip(*columns)):
+            add_values('(' + values + ')')
+
+    def _add_values(self, values):
+        # Размер измеряется в байтах закодированного запроса, с учётом разделителя ', '
+        size = len(values.encode('utf-8')) + 2
+
+        if self._values and (self._bytes + size > self.max_bytes or len(self._values) >= self.max_rows):
+            self.flush()
+        if self._header_bytes + size > self.max_bytes:
+            raise ValueError(f"Row of {size} bytes does not fit into a statement of {self.max_bytes} bytes")
+
+        self._values.append(values)
+        self._bytes += size
+
+    def extend(self, rows):
+        """
+        Добавляет несколько строк.
+
+        Параметры:
+        -----------
+        rows : iterable of tuples
+            Строки для вставки.
+        """
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        """
+        Выполняет накопленный запрос.
+
+        Возвращает:
+        --------
+        int
+            Количество строк, вставленных этим запросом.
+        """
+        if not self._values:
+            return 0
+        self.cursor.execute(self.header + ', '.join(self._values) + self.suffix)
+        count = len(self._values)
+        if self.id_ranges is not None:
+            self.id_ranges.add(self.backend.first_inserted_id(self.cursor, count), count)
+        self.rows_inserted += count
+        self.statements += 1
+        self._values = []
+        self._bytes = self._header_bytes
+        return count
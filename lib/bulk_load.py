@@ -0,0 +1,179 @@
+"""
+Модуль: bulk_load
+
+Этот модуль предоставляет запись строк в файл TSV в формате LOAD DATA INFILE
+и построение самого запроса LOAD DATA LOCAL INFILE.
+"""
+
+import os
+import threading
+
+
+# Экранирование для FIELDS TERMINATED BY '\t' ESCAPED BY '\\' LINES TERMINATED BY '\n'
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\x00': '\\0'})
+
+# Количество строк, накапливаемых перед записью в файл
+TSV_WRITE_BATCH = 10000
+
+
+def tsv_field(value):
+    """
+    Переводит значение в поле TSV, понятное LOAD DATA INFILE.
+
+    Параметры:
+    -----------
+    value : object
+        Значение столбца.
+
+    Возвращает:
+    --------
+    str
+        Поле TSV. None записывается как \\N.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(TSV_ESCAPES)
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return str(value).translate(TSV_ESCAPES)
+
+
+def write_tsv(rows, stream):
+    """
+    Записывает строки в текстовый поток в формате TSV.
+
+    Параметры:
+    -----------
+    rows : iterable of tuples, ColumnBatch or ColumnBatches
+        Строки для записи. Значения без кортежа считаются строкой из одного столбца.
+    stream : текстовый поток
+        Поток, открытый в кодировке utf-8 с newline='\\n'.
+
+    Возвращает:
+    --------
+    int
+        Количество записанных строк.
+    """
+    # Пакеты columnar.ColumnBatch и ColumnBatches записываются по столбцам
+    if hasattr(rows, 'write_tsv'):
+        return rows.write_tsv(stream)
+    count = 0
+    lines = []
+    for row in rows:
+        if not isinstance(row, tuple):
+            row = (row,)
+        lines.append('\t'.join([tsv_field(value) for value in row]))
+        if len(lines) >= TSV_WRITE_BATCH:
+            stream.write('\n'.join(lines))
+            stream.write('\n')
+            count += len(lines)
+            lines = []
+    if lines:
+        stream.write('\n'.join(lines))
+        stream.write('\n')
+        count += len(lines)
+    return count
+
+
+def write_tsv_file(path, rows):
+    """
+    Записывает строки в файл TSV в кодировке utf-8.
+
+    Параметры:
+    -----------
+    path : str
+        Путь к файлу или именованному каналу.
+    rows : iterable of tuples
+        Строки для записи.
+
+    Возвращает:
+    --------
+    int
+        Количество записанных строк.
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as stream:
+        return write_tsv(rows, stream)
+
+
+def load_data_query(path, table, columns):
+    """
+    Строит запрос LOAD DATA LOCAL INFILE для файла, записанного write_tsv().
+
+    Параметры:
+    -----------
+    path : str
+        Путь к файлу на стороне клиента.
+    table : str
+        Имя таблицы.
+    columns : list of str
+        Имена заполняемых столбцов.
+
+    Возвращает:
+    --------
+    str
+        Текст запроса.
+    """
+    quoted_path = path.replace('\\', '\\\\').replace("'", "\\'")
+    return (f"LOAD DATA LOCAL INFILE '{quoted_path}' INTO TABLE {table} "
+            f"CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})")
+
+
+class FifoWriter:
+    def __init__(self, path, rows):
+        """
+        Инициализирует запись строк в именованный канал из отдельного потока.
+
+        Параметры:
+        -----------
+        path : str
+            Путь к именованному каналу (создаётся os.mkfifo()).
+        rows : iterable of tuples
+            Строки для записи.
+
+        Атрибуты:
+        --------
+        count : int
+            Количество записанных строк.
+        error : Exception or None
+            Ошибка записи, если она произошла.
+        """
+        self.path = path
+        self.rows = rows
+        self.count = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.count = write_tsv_file(self.path, self.rows)
+        except Exception as e:
+            self.error = e
+
+    def abort(self):
+        """
+        Освобождает поток записи, если читатель так и не открыл канал.
+        """
+        # Открытие канала на чтение разблокирует open() в потоке записи, а закрытие
+        # приводит к BrokenPipeError при следующей записи
+        while self._thread.is_alive():
+            try:
+                fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                fd = None
+            self._thread.join(0.1)
+            if fd is not None:
+                os.close(fd)
+        self._thread.join()
+
+    def join(self):
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.count
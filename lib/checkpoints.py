@@ -0,0 +1,112 @@
+"""
+Модуль: checkpoints
+
+Этот модуль предоставляет файл контрольных точек восстановления бэкапа: после каждой восстановленной
+порции строк таблицы в файл дописывается запись, по которой прерванное восстановление продолжается
+со следующей порции.
+"""
+
+import json
+import os
+
+
+class CheckpointMismatchError(Exception):
+    """
+    Исключение, возникающее, если контрольные точки записаны с другими параметрами восстановления.
+    """
+
+
+class RestoreCheckpoint:
+    def __init__(self, path, params=None):
+        """
+        Инициализирует файл контрольных точек.
+
+        Параметры:
+        -----------
+        path : str
+            Путь к файлу контрольных точек.
+        params : dict, optional
+            Параметры восстановления, от которых зависит деление таблиц на порции (например,
+            размер порции). Продолжить восстановление можно только с теми же параметрами.
+            По умолчанию параметры не проверяются.
+
+        Замечания:
+        --------
+        Файл состоит из строк JSON и только дополняется: каждая запись добавляется одним вызовом
+        os.write() в режиме O_APPEND, поэтому процессы, восстанавливающие разные таблицы, могут
+        писать в один файл. Последняя запись таблицы определяет её состояние.
+        """
+        self.path = path
+        self.params = params
+
+    def load(self):
+        """
+        Читает состояние восстановления.
+
+        Возвращает:
+        --------
+        dict
+            Для каждой таблицы словарь с количеством восстановленных порций (batches) и строк (rows)
+            и признаком завершения (done). Пустой словарь, если файла нет.
+        """
+        state = {}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding='utf-8') as f:
+            for number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Запись, оборванная при аварийном завершении, не учитывается
+                    continue
+                if number == 0 and 'params' in record:
+                    if self.params is not None and record['params'] != json.loads(json.dumps(self.params)):
+                        raise CheckpointMismatchError(f"Checkpoint '{self.path}' was written with parameters "
+                                                      f"{record['params']}, got {self.params}")
+                    continue
+                state[record['table']] = {'batches': record['batches'], 'rows': record['rows'],
+                                          'done': record.get('done', False)}
+        return state
+
+    def start(self):
+        """
+        Создаёт файл с параметрами восстановления, если его ещё нет.
+        """
+        if not os.path.exists(self.path):
+            self._append({'params': self.params or {}})
+
+    def record(self, table, batches, rows, done=False):
+        """
+        Записывает состояние таблицы.
+
+        Параметры:
+        -----------
+        table : str
+            Имя таблицы.
+        batches : int
+            Количество восстановленных порций с начала таблицы.
+        rows : int
+            Количество восстановленных строк с начала таблицы.
+        done : bool, optional
+            Таблица восстановлена полностью. По умолчанию False.
+        """
+        record = {'table': table, 'batches': batches, 'rows': rows}
+        if done:
+            record['done'] = True
+        self._append(record)
+
+    def _append(self, record):
+        data = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def remove(self):
+        """
+        Удаляет файл после успешного восстановления.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,151 @@
+"""
+Модуль: columnar
+
+Этот модуль предоставляет пакеты строк в столбцовом виде: значения каждого столбца хранятся
+в отдельном буфере (array.array для целых чисел, list для строк) вместо кортежа на каждую строку.
+"""
+
+from array import array
+
+from lib.bulk_load import TSV_ESCAPES
+
+
+def int_column(values=()):
+    """
+    Создаёт буфер целочисленного столбца (array.array с 64-битными целыми).
+
+    Параметры:
+    -----------
+    values : iterable of int, optional
+        Начальные значения.
+
+    Возвращает:
+    --------
+    array.array
+        Буфер столбца.
+    """
+    return array('q', values)
+
+
+def tsv_column(column):
+    """
+    Переводит буфер столбца в список полей TSV.
+
+    Параметры:
+    -----------
+    column : array.array or list
+        Буфер столбца.
+
+    Возвращает:
+    --------
+    list of str
+        Поля TSV. None записывается как \\N.
+    """
+    if isinstance(column, array):
+        # Целые числа не требуют экранирования
+        return list(map(str, column))
+    return ['\\N' if value is None else str(value).translate(TSV_ESCAPES) for value in column]
+
+
+class ColumnBatch:
+    def __init__(self, columns, buffers):
+        """
+        Инициализирует пакет строк в столбцовом виде.
+
+        Параметры:
+        -----------
+        columns : list of str
+            Имена столбцов.
+        buffers : list of array.array or list
+            Значения столбцов, по одному буферу одинаковой длины на столбец.
+        """
+        if len(columns) != len(buffers):
+            raise ValueError(f"Got {len(buffers)} buffers for {len(columns)} columns")
+        lengths = {len(buffer) for buffer in buffers}
+        if len(lengths) > 1:
+            raise ValueError(f"Column buffers have different lengths: {sorted(lengths)}")
+        self.columns = list(columns)
+        self.buffers = list(buffers)
+
+    def __len__(self):
+        return len(self.buffers[0]) if self.buffers else 0
+
+    def column(self, name):
+        """
+        Возвращает буфер столбца по имени.
+        """
+        return self.buffers[self.columns.index(name)]
+
+    def batches(self):
+        """
+        Возвращает итератор из одного пакета (тот же интерфейс, что у ColumnBatches).
+        """
+        return iter((self,))
+
+    def rows(self):
+        """
+        Возвращает итератор кортежей строк, например для executemany().
+        """
+        return zip(*self.buffers)
+
+    def write_tsv(self, stream):
+        """
+        Записывает пакет в текстовый поток в формате TSV (см. bulk_load.write_tsv).
+        Поля формируются по столбцам, без промежуточных кортежей значений.
+
+        Параметры:
+        -----------
+        stream : текстовый поток
+            Поток, открытый в кодировке utf-8 с newline='\\n'.
+
+        Возвращает:
+        --------
+        int
+            Количество записанных строк.
+        """
+        if not len(self):
+            return 0
+        fields = [tsv_column(buffer) for buffer in self.buffers]
+        if len(fields) == 1:
+            stream.write('\n'.join(fields[0]))
+        else:
+            stream.write('\n'.join(map('\t'.join, zip(*fields))))
+        stream.write('\n')
+        return len(self)
+
+
+class ColumnBatches:
+    def __init__(self, batches):
+        """
+        Инициализирует поток пакетов ColumnBatch, например генератор пакетов таблицы.
+
+        Параметры:
+        -----------
+        batches : iterable of ColumnBatch
+            Пакеты строк. Поток читается один раз.
+        """
+        self._batches = iter(batches)
+
+    def batches(self):
+        """
+        Возвращает итератор пакетов.
+        """
+        return self._batches
+
+    def rows(self):
+        """
+        Возвращает итератор кортежей строк всех пакетов.
+        """
+        for batch in self._batches:
+            yield from batch.rows()
+
+    def write_tsv(self, stream):
+        """
+        Записывает все пакеты в текстовый поток в формате TSV.
+
+        Возвращает:
+        --------
+        int
+            Количество записанных строк.
+        """
+        return sum(batch.write_tsv(stream) for batch in self._batches)
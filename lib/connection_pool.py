@@ -0,0 +1,280 @@
+"""
+Модуль: connection_pool
+
+Этот модуль предоставляет ограниченный потокобезопасный пул соединений с базой данных.
+"""
+
+import collections
+import threading
+import time
+
+
+class PoolTimeoutError(Exception):
+    """
+    Исключение, возникающее, если свободное соединение не удалось получить за отведённое время.
+    """
+
+
+class ConnectionPool:
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300.0, ping_interval=30.0,
+                 is_alive=None, checkout_timeout=None):
+        """
+        Инициализирует пул соединений.
+
+        Параметры:
+        -----------
+        connect : callable
+            Функция без аргументов, открывающая новое соединение.
+        min_size : int, optional
+            Минимальное количество соединений, которое пул держит открытыми. По умолчанию 1.
+        max_size : int, optional
+            Максимальное количество одновременно открытых соединений. По умолчанию 10.
+        idle_timeout : float, optional
+            Время простоя в секундах, после которого лишнее соединение закрывается. По умолчанию 300.
+        ping_interval : float, optional
+            Соединение, простоявшее дольше этого времени, проверяется перед выдачей. По умолчанию 30.
+        is_alive : callable, optional
+            Функция проверки соединения, возвращающая True для живого соединения.
+            По умолчанию соединения не проверяются.
+        checkout_timeout : float or None, optional
+            Максимальное время ожидания свободного соединения. По умолчанию None (ждать без ограничения).
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self._connect = connect
+        self._is_alive = is_alive
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.checkout_timeout = checkout_timeout
+
+        # Свободные соединения хранятся вместе с моментом возврата: слева самые старые, справа самые свежие
+        self._idle = collections.deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = collections.Counter()
+
+    def warm_up(self):
+        """
+        Открывает соединения до минимального размера пула.
+        """
+        created = []
+        with self._cond:
+            missing = max(0, self.min_size - self._size)
+            self._size += missing
+        try:
+            for _ in range(missing):
+                created.append(self._create())
+        finally:
+            with self._cond:
+                self._size -= missing - len(created)
+                now = time.monotonic()
+                self._idle.extend((conn, now) for conn in created)
+                self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        """
+        Выдаёт соединение из пула, при необходимости открывая новое или ожидая освобождения.
+
+        Параметры:
+        -----------
+        timeout : float or None, optional
+            Время ожидания свободного соединения. По умолчанию используется checkout_timeout пула.
+
+        Возвращает:
+        --------
+        object
+            Открытое соединение.
+        """
+        if timeout is None:
+            timeout = self.checkout_timeout
+
+        with self._cond:
+            expired = self._take_expired()
+            started = time.monotonic()
+            waited = False
+
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+
+                if not waited:
+                    waited = True
+                    self._stats['waits'] += 1
+                remaining = None if timeout is None else timeout - (time.monotonic() - started)
+                if remaining is not None and remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(f"No free connection in the pool after {timeout} seconds")
+                self._cond.wait(remaining)
+
+            if waited:
+                self._stats['wait_time'] += time.monotonic() - started
+            self._stats['checkouts'] += 1
+
+        self._close_all(expired)
+
+        if conn is not None and time.monotonic() - last_used > self.ping_interval and not self._check(conn):
+            with self._cond:
+                self._stats['discarded'] += 1
+            self._close_all([conn])
+            conn = None
+
+        if conn is None:
+            try:
+                conn = self._create()
+            except BaseException:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Возвращает соединение в пул.
+
+        Параметры:
+        -----------
+        conn : object
+            Соединение, ранее полученное через acquire().
+        discard : bool, optional
+            Закрыть соединение вместо возврата в пул. По умолчанию False.
+        """
+        if not discard:
+            try:
+                # Незавершённая транзакция не должна перейти к следующему владельцу соединения
+                if getattr(conn, 'in_transaction', False):
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                if discard:
+                    self._stats['discarded'] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_all([conn])
+
+    def close(self):
+        """
+        Закрывает все свободные соединения и запрещает дальнейшую выдачу.
+        Соединения, находящиеся в использовании, закрываются при возврате.
+        """
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        self._close_all(idle)
+
+    @property
+    def stats(self):
+        """
+        Возвращает статистику пула.
+
+        Возвращает:
+        --------
+        dict
+            Счётчики creations, checkouts, waits, wait_time, timeouts, discarded, expired
+            и текущие размеры size, idle, in_use.
+        """
+        with self._cond:
+            stats = {key: self._stats[key] for key in
+                     ('creations', 'checkouts', 'waits', 'wait_time', 'timeouts', 'discarded', 'expired')}
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+        return stats
+
+    def _create(self):
+        conn = self._connect()
+        if conn is None:
+            raise ConnectionError("Failed to open a new connection")
+        with self._cond:
+            self._stats['creations'] += 1
+        return conn
+
+    def _check(self, conn):
+        if self._is_alive is None:
+            return True
+        try:
+            return bool(self._is_alive(conn))
+        except Exception:
+            return False
+
+    def _take_expired(self):
+        # Вызывается под блокировкой: забирает простаивающие соединения сверх min_size
+        expired = []
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        self._stats['expired'] += len(expired)
+        return expired
+
+    @staticmethod
+    def _close_all(connections):
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class PooledConnectionManager:
+    def __init__(self, pool):
+        """
+        Инициализирует контекстный менеджер, выдающий соединение из пула.
+
+        Параметры:
+        -----------
+        pool : ConnectionPool
+            Пул, из которого берётся соединение.
+        """
+        self.pool = pool
+        self.conn = None
+
+    def __enter__(self):
+        """
+        Берёт соединение из пула.
+
+        Возвращает:
+        --------
+        object or None
+            Соединение или None, если получить его не удалось.
+        """
+        try:
+            self.conn = self.pool.acquire()
+            return self.conn
+        except Exception as e:
+            print(f"Error: '{e}'")
+            return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Возвращает соединение в пул.
+
+        Замечания:
+        --------
+        Метод автоматически вызывается в конце блока контекстного управления.
+        """
+        if self.conn is not None:
+            self.pool.release(self.conn)
+            self.conn = None
@@ -4,14 +4,128 @@
 Этот модуль предоставляет функции для работы с базой данной, изменение данных в ней.
 '''
 
-import mysql.connector
 import datetime
+import json
 import os
-
-from mysql.connector import Error
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+
+from lib.backends import Error, get_backend, set_backend
+from lib.backup_codecs import BACKUP_CODECS, BACKUP_READ_ERRORS, DEFAULT_BACKUP_CODEC, open_backup, peak_rss_bytes
+from lib.backup_format import BINARY_BACKUP_EXTENSION, BackupFormatError, BackupReader, BackupWriter, is_binary_backup
+from lib.bulk_insert import BulkInserter, BULK_MAX_ROWS
+from lib.checkpoints import RestoreCheckpoint
+from lib.bulk_load import FifoWriter, load_data_query, write_tsv_file
+from lib.columnar import ColumnBatch, ColumnBatches, int_column
+from lib.connection_pool import ConnectionPool, PooledConnectionManager
+from lib.distributions import parent_sampler
+from lib.id_ranges import IdRanges
+from lib.parent_keys import parent_keys
+from lib.row_codec import decode_row, encode_row
+from lib.seeding import GenerationContext
 from lib.randomik import *
 
 
+# Параметры пулов соединений, создаваемых create_connection()
+POOL_SETTINGS = {
+    'min_size': 1,
+    'max_size': 10,
+    'idle_timeout': 300.0,
+    'ping_interval': 30.0,
+    'checkout_timeout': None,
+}
+
+# Количество строк, после которого insert_into_*() подтверждает транзакцию
+INSERT_CHUNK_SIZE = 10000
+
+# Заполняемые столбцы таблиц garden (без автоинкрементного id)
+TABLE_COLUMNS = {
+    'fertilizers': ['name', 'amount'],
+    'crops': ['name', 'season', 'watering_frequency', 'ripening_period'],
+    'employees': ['fullname', 'post'],
+    'gardens': ['name'],
+    'actions': ['name'],
+    'beds': ['garden_id', 'crop_id', 'fertilizer_id'],
+    'garden_employees': ['garden_id', 'employee_id'],
+}
+
+# Этапы параллельного заполнения: таблицы следующего этапа ссылаются на таблицы предыдущего
+GARDEN_POPULATE_STAGES = (
+    ('fertilizers', 'crops', 'employees', 'gardens', 'actions'),
+    ('beds', 'garden_employees'),
+)
+
+# Количество строк в блоке, генерируемом собственным потоком случайных чисел при заполнении с зерном
+GENERATION_BLOCK_ROWS = 10000
+
+# Количество строк, читаемых из исходной таблицы за один fetchmany() при копировании данных
+COPY_FETCH_SIZE = 10000
+
+# Минимальная длина диапазона первичного ключа, начиная с которой таблица копируется параллельно частями
+COPY_SPLIT_ROWS = 100000
+
+# Длина диапазона первичного ключа, копируемого одним запросом INSERT ... SELECT на сервере
+SERVER_COPY_ROWS = 100000
+
+# Способы копирования данных: INSERT ... SELECT на сервере, потоком строк через Python
+# или только строк, добавленных после предыдущей синхронизации
+COPY_METHODS = ('server', 'stream', 'incremental')
+
+# Таблица целевой базы данных с отметками синхронизации (максимальный скопированный ключ) по таблицам
+SYNC_TABLE = '_sync_watermarks'
+
+# Длина диапазона первичного ключа, контрольная сумма которого сверяется при синхронизации
+SYNC_CHECK_ROWS = 10000
+
+# Таблицы garden в порядке внешних ключей, сохраняемые create_backup()
+BACKUP_TABLES = ['fertilizers', 'crops', 'employees', 'gardens', 'actions', 'beds', 'garden_employees']
+
+# Количество строк, читаемых за один fetchmany() и записываемых одним блоком при создании бэкапа
+BACKUP_FETCH_SIZE = 10000
+
+# Количество строк в порции восстановления: порция вставляется и подтверждается целиком,
+# после неё записывается контрольная точка
+RESTORE_BATCH_ROWS = 10000
+
+# Форматы бэкапа: текстовый файл со строками таблиц или двоичный файл с индексом блоков (см. backup_format)
+BACKUP_FORMATS = ('text', 'binary')
+
+# Длина диапазона первичного ключа, для которого в манифест бэкапа записывается контрольная сумма:
+# инкрементальный бэкап сохраняет только диапазоны, сумма которых изменилась
+BACKUP_CHUNK_ROWS = 10000
+
+# Режимы заполнения таблиц: пакетные INSERT, LOAD DATA из временного файла или из именованного канала
+POPULATE_MODES = ('insert', 'load', 'load_fifo')
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def connect(database=None, **kwargs):
+    """
+    Открывает новое соединение через текущий бэкенд (MySQL или SQLite).
+
+    Параметры:
+    -----------
+    database : str, optional
+        Имя базы данных. По умолчанию None.
+    **kwargs
+        Параметры, переопределяющие параметры подключения бэкенда (host, user, password и т.д.).
+
+    Возвращает:
+    --------
+    mysql.connector.connection.MySQLConnection or SQLiteConnection
+        Объект соединения с базой данных.
+    """
+    return get_backend().connect(database, **kwargs)
+
+
 class MySQLConnectionManager:
     def __init__(self, database=None):
         """
@@ -42,14 +156,8 @@ class MySQLConnectionManager:
             Объект соединения с сервером MySQL или None, если соединение не удалось установить.
         """
         try:
-            self.conn = mysql.connector.connect(
-                host='localhost',
-                user='admin',
-                password='root',
-                database=self.database
-            )
+            self.conn = connect(self.database)
             if self.conn.is_connected():
-                print(f"Successfully connected to the MySQL server{' and database ' + self.database if self.database else ''}")
                 return self.conn
         except Error as e:
             print(f"Error: '{e}'")
@@ -127,15 +235,86 @@ class MySQLCursorManager:
         """
         if self.cursor:
             self.cursor.close()
-        if exc_type is None:
+
+        # Внутри сеанса массовой загрузки транзакция завершается только при выходе из сеанса
+        session = _session_for_connection(self.conn)
+        if session is not None:
+            if exc_type is not None:
+                session.failed = True
+        elif exc_type is None:
             self.conn.commit()
         else:
             self.conn.rollback()
 
 
+def get_pool(database=None):
+    """
+    Возвращает пул соединений для указанной базы данных, создавая его при первом обращении.
+
+    Параметры:
+    -----------
+    database : str, optional
+        Имя базы данных. По умолчанию None.
+
+    Возвращает:
+    --------
+    ConnectionPool
+        Пул соединений с параметрами из POOL_SETTINGS.
+    """
+    backend = get_backend()
+    with _pools_lock:
+        pool = _pools.get((backend, database))
+        if pool is None:
+            pool = ConnectionPool(lambda: backend.connect(database), is_alive=backend.is_alive, **POOL_SETTINGS)
+            _pools[backend, database] = pool
+        return pool
+
+
+def close_pools():
+    """
+    Закрывает все пулы соединений, созданные create_connection().
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """
+    Возвращает статистику всех пулов соединений.
+
+    Возвращает:
+    --------
+    dict
+        Словарь {имя базы данных: статистика пула} для текущего бэкенда.
+    """
+    backend = get_backend()
+    with _pools_lock:
+        pools = dict(_pools)
+    return {database: pool.stats for (owner, database), pool in pools.items() if owner is backend}
+
+
+def _forget_pools_after_fork():
+    # Дочерний процесс не должен пользоваться сокетами родителя и не должен их закрывать:
+    # пулы просто отбрасываются, а ссылки на них сохраняются до завершения процесса
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    _inherited_pools.extend(_pools.values())
+    _pools.clear()
+
+
+_inherited_pools = []
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools_after_fork)
+
+
 def create_connection(database=None):
     """
     Создаёт и возвращает менеджер соединения с сервером MySQL или указанной базой данных.
+    Соединение берётся из пула и возвращается в него при выходе из блока with.
+    Внутри bulk_load_session() для той же базы данных выдаётся соединение сеанса.
 
     Параметры:
     -----------
@@ -144,10 +323,227 @@ def create_connection(database=None):
 
     Возвращает:
     --------
-    MySQLConnectionManager
-        Объект MySQLConnectionManager для управления соединением с сервером MySQL.
+    PooledConnectionManager
+        Контекстный менеджер, выдающий соединение из пула.
+    """
+    session = _session_for_database(database)
+    if session is not None:
+        return nullcontext(session.conn)
+    return PooledConnectionManager(get_pool(database))
+
+
+class BulkLoadError(Exception):
+    """
+    Исключение, возникающее, если транзакция сеанса массовой загрузки откачена.
+    """
+
+
+class BulkLoadIntegrityError(BulkLoadError):
+    """
+    Исключение, возникающее, если после массовой загрузки нарушены внешние ключи.
+    """
+
+
+_bulk_sessions = threading.local()
+
+
+def _active_sessions():
+    if not hasattr(_bulk_sessions, 'active'):
+        _bulk_sessions.active = []
+    return _bulk_sessions.active
+
+
+def _session_for_database(database):
+    for session in _active_sessions():
+        if session.database == database:
+            return session
+    return None
+
+
+def _session_for_connection(conn):
+    for session in _active_sessions():
+        if session.conn is conn:
+            return session
+    return None
+
+
+def commit_connection(conn):
+    """
+    Подтверждает транзакцию соединения, если оно не принадлежит сеансу массовой загрузки.
+
+    Параметры:
+    -----------
+    conn : соединение с базой данных
+        Соединение, транзакцию которого нужно подтвердить.
+    """
+    if _session_for_connection(conn) is None:
+        conn.commit()
+
+
+class BulkLoadSession:
+    def __init__(self, database, drop_indexes=False):
+        """
+        Инициализирует сеанс массовой загрузки данных.
+
+        На время сеанса отключаются проверки внешних ключей и уникальности и автоподтверждение,
+        а при drop_indexes=True удаляются вторичные индексы. Функции db_controller, вызванные внутри
+        сеанса для той же базы данных, работают через соединение сеанса и не подтверждают транзакцию.
+        При выходе внешние ключи проверяются одним запросом на каждую связь, транзакция подтверждается
+        или откатывается, индексы создаются заново, а исходные настройки восстанавливаются,
+        в том числе при исключении.
+
+        Параметры:
+        -----------
+        database : str
+            Имя базы данных.
+        drop_indexes : bool, optional
+            Удалить вторичные индексы на время загрузки. По умолчанию False.
+
+        Атрибуты:
+        --------
+        conn : соединение с базой данных or None
+            Соединение сеанса.
+        failed : bool
+            Признак ошибки внутри сеанса; при выходе транзакция будет откачена с BulkLoadError.
+        violations : dict
+            Количество строк, нарушающих каждый внешний ключ, по результатам проверки.
+        """
+        self.database = database
+        self.drop_indexes = drop_indexes
+        self.conn = None
+        self.failed = False
+        self.violations = {}
+        self._saved = None
+        self._dropped_indexes = []
+
+    def __enter__(self):
+        """
+        Открывает соединение сеанса и отключает проверки.
+
+        Возвращает:
+        --------
+        BulkLoadSession
+            Объект сеанса.
+        """
+        backend = get_backend()
+        # Отдельное соединение с разрешённым LOAD DATA LOCAL, чтобы load_rows() тоже работал внутри сеанса
+        self.conn = connect(self.database, allow_local_infile=True)
+        try:
+            cursor = self.conn.cursor()
+            try:
+                self._saved = backend.begin_bulk_load(cursor)
+                if self.drop_indexes:
+                    for table, name, drop_query, create_query in backend.secondary_indexes(cursor):
+                        cursor.execute(drop_query)
+                        self._dropped_indexes.append((table, name, create_query))
+                        print(f"Index '{name}' on table '{table}' dropped for bulk load")
+            finally:
+                cursor.close()
+        except BaseException:
+            self._restore()
+            raise
+        _active_sessions().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Проверяет внешние ключи, завершает транзакцию и восстанавливает настройки.
+
+        Замечания:
+        --------
+        Метод автоматически вызывается в конце блока контекстного управления.
+        Если проверка нашла нарушения, транзакция откатывается и выбрасывается BulkLoadIntegrityError.
+        Если внутри сеанса завершился ошибкой запрос, исключение которого не дошло до блока with,
+        транзакция откатывается и выбрасывается BulkLoadError.
+        """
+        _active_sessions().remove(self)
+        try:
+            if exc_type is None and not self.failed:
+                self.violations = check_foreign_keys(self.conn)
+                broken = {key: count for key, count in self.violations.items() if count}
+                if broken:
+                    self.conn.rollback()
+                    raise BulkLoadIntegrityError(f"Foreign key violations after bulk load: {broken}")
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+                print(f"Bulk load into '{self.database}' rolled back")
+                if exc_type is None:
+                    # Ошибку запроса перехватила и вывела функция внутри сеанса, поэтому сообщаем об откате явно
+                    raise BulkLoadError(f"Bulk load into '{self.database}' rolled back after a failed query")
+        finally:
+            self._restore()
+
+    def _restore(self):
+        backend = get_backend()
+        try:
+            cursor = self.conn.cursor()
+            try:
+                for table, name, create_query in reversed(self._dropped_indexes):
+                    try:
+                        cursor.execute(create_query)
+                        print(f"Index '{name}' on table '{table}' recreated")
+                    except Error as e:
+                        print(f"Error recreating index '{name}' on table '{table}': {e}")
+                self._dropped_indexes = []
+                if self._saved is not None:
+                    backend.end_bulk_load(cursor, self._saved)
+                    self._saved = None
+            finally:
+                cursor.close()
+        finally:
+            self.conn.close()
+
+
+def bulk_load_session(database, drop_indexes=False):
+    """
+    Создаёт сеанс массовой загрузки данных (см. BulkLoadSession).
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных.
+    drop_indexes : bool, optional
+        Удалить вторичные индексы на время загрузки. По умолчанию False.
+
+    Возвращает:
+    --------
+    BulkLoadSession
+        Контекстный менеджер сеанса.
+
+    Пример:
+    --------
+    with bulk_load_session('garden'):
+        populate_garden_db('garden', 1000000)
+    """
+    return BulkLoadSession(database, drop_indexes)
+
+
+def check_foreign_keys(conn):
+    """
+    Проверяет ссылочную целостность всех внешних ключей базы данных.
+    Каждая связь проверяется одним запросом LEFT JOIN, а не построчно.
+
+    Параметры:
+    -----------
+    conn : соединение с базой данных
+        Соединение, в транзакции которого выполняется проверка.
+
+    Возвращает:
+    --------
+    dict
+        Словарь {(таблица, столбец, родительская таблица, столбец родителя): количество нарушений}.
     """
-    return MySQLConnectionManager(database)
+    cursor = conn.cursor()
+    try:
+        violations = {}
+        for table, column, parent, parent_column in get_backend().foreign_keys(cursor):
+            cursor.execute(f"SELECT COUNT(*) FROM {table} c LEFT JOIN {parent} p ON c.{column} = p.{parent_column} "
+                           f"WHERE c.{column} IS NOT NULL AND p.{parent_column} IS NULL")
+            violations[table, column, parent, parent_column] = cursor.fetchone()[0]
+        return violations
+    finally:
+        cursor.close()
 
 
 def create_database(db_name):
@@ -311,7 +707,7 @@ def create_beds_table(db_name='garden'):
                                     FOREIGN KEY (fertilizer_id) REFERENCES fertilizers(id)
                                     )''')
                     print(f"Table 'beds' in database '{db_name}' created successfully")
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error creating table 'beds' in database '{db_name}': {e}")
 
 
@@ -336,7 +732,7 @@ def create_garden_employee_table(db_name='garden'):
                                     FOREIGN KEY (employee_id) REFERENCES employees(id)
                                     )''')
                     print(f"Table 'garden_employee' in database '{db_name}' created successfully")
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error creating table 'garden_employee' in database '{db_name}': {e}")
 
 def create_garden_db(dbname='garden'):
@@ -371,8 +767,9 @@ def clear_tables():
                     for table in tables:
                         cursor.execute(f"DELETE FROM {table}")
                         print(f"Table {table} cleared successfully.")
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error clearing table {table}: {e}")
+    parent_keys.invalidate('garden')
 
 
 def copy_tables(source_db, target_db):
@@ -405,9 +802,164 @@ def copy_tables(source_db, target_db):
                 print(f"Error: '{e}'")
 
 
-def copy_data(source_db, target_db):
+def dependency_stages(tables, foreign_keys):
+    '''
+    Упорядочивает таблицы по внешним ключам: каждая таблица попадает в этап после всех таблиц,
+    на которые она ссылается.
+
+    Параметры:
+    -----------
+    tables : list of str
+        Имена таблиц.
+    foreign_keys : list of tuples
+        Внешние ключи (таблица, столбец, родительская таблица, столбец родителя), см. backend.foreign_keys().
+
+    Возвращает:
+    --------
+    list of tuples
+        Этапы с именами таблиц. Таблицы одного этапа не ссылаются друг на друга.
+
+    Замечания:
+    --------
+    Ссылки таблицы на саму себя и на таблицы не из tables не учитываются. Таблицы, образующие
+    цикл ссылок, помещаются в последний этап.
+    '''
+    parents = {table: set() for table in tables}
+    for table, _, parent, _ in foreign_keys:
+        if table in parents and parent in parents and parent != table:
+            parents[table].add(parent)
+
+    stages = []
+    done = set()
+    remaining = sorted(parents)
+    while remaining:
+        stage = tuple(table for table in remaining if parents[table] <= done)
+        if not stage:
+            stage = tuple(remaining)
+        stages.append(stage)
+        done.update(stage)
+        remaining = [table for table in remaining if table not in done]
+    return stages
+
+
+def copy_table(source_conn, target_conn, table, fetch_size=COPY_FETCH_SIZE, max_rows=BULK_MAX_ROWS, key_range=None):
+    '''
+    Потоково копирует строки таблицы между соединениями: строки читаются небуферизованным курсором
+    порциями по fetch_size и вставляются многострочными запросами INSERT, после каждой порции
+    транзакция целевого соединения подтверждается.
+
+    Параметры:
+    -----------
+    source_conn : соединение с базой данных
+        Соединение с исходной базой данных.
+    target_conn : соединение с базой данных
+        Соединение с целевой базой данных.
+    table : str
+        Имя таблицы.
+    fetch_size : int, optional
+        Количество строк в одной порции. По умолчанию COPY_FETCH_SIZE.
+    max_rows : int, optional
+        Максимальное количество строк в одном запросе INSERT. По умолчанию BULK_MAX_ROWS.
+    key_range : tuple, optional
+        Часть таблицы (столбец ключа, первое значение, последнее значение). По умолчанию вся таблица.
+
+    Возвращает:
+    --------
+    int
+        Количество скопированных строк.
+    '''
+    started = time.perf_counter()
+    query = f"SELECT * FROM {table}"
+    if key_range is not None:
+        key, low, high = key_range
+        query += f" WHERE {key} BETWEEN {int(low)} AND {int(high)}"
+        table_label = f"{table} [{key} {low}..{high}]"
+    else:
+        table_label = table
+    copied = 0
+    # Небуферизованный курсор MySQL получает строки с сервера по мере чтения, а не все сразу
+    source_cur = source_conn.cursor(buffered=False)
+    try:
+        source_cur.execute(query)
+        columns = [col[0] for col in source_cur.description]
+        with MySQLCursorManager(target_conn) as target_cur:
+            inserter = BulkInserter(target_cur, table, columns, max_rows=max_rows)
+            while True:
+                rows = source_cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    inserter.add(row)
+                inserter.flush()
+                commit_connection(target_conn)
+                copied += len(rows)
+                elapsed = time.perf_counter() - started
+                print(f"Table {table_label}: {copied} rows copied ({copied / elapsed if elapsed else 0:.0f} rows/s)")
+    finally:
+        source_cur.close()
+    elapsed = time.perf_counter() - started
+    print(f"Table {table_label} copied: {copied} rows in {elapsed:.2f} s ({copied / elapsed if elapsed else 0:.0f} rows/s)")
+    return copied
+
+
+def copy_table_on_server(conn, table, target_schema, key_range=None, chunk_rows=SERVER_COPY_ROWS):
+    '''
+    Копирует таблицу в другую базу данных того же сервера запросами INSERT ... SELECT: строки
+    не передаются клиенту. Таблица с целочисленным первичным ключом копируется частями по
+    chunk_rows значений ключа, после каждой части транзакция подтверждается.
+
+    Параметры:
+    -----------
+    conn : соединение с базой данных
+        Соединение с исходной базой данных, к которому подключена целевая (см. backend.attach_database).
+    table : str
+        Имя таблицы.
+    target_schema : str
+        Префикс имён таблиц целевой базы данных, который вернул attach_database().
+    key_range : tuple, optional
+        Часть таблицы (см. table_key_ranges). По умолчанию вся таблица.
+    chunk_rows : int, optional
+        Длина диапазона ключа, копируемого одним запросом. По умолчанию SERVER_COPY_ROWS.
+
+    Возвращает:
+    --------
+    int
+        Количество скопированных строк.
+    '''
+    started = time.perf_counter()
+    copied = 0
+    with MySQLCursorManager(conn) as cursor:
+        cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+        columns = ", ".join(col[0] for col in cursor.description)
+        cursor.fetchall()
+        if key_range is None:
+            chunks = table_key_ranges(cursor, table, 1, 0, chunk_rows)
+        else:
+            key, low, high = key_range
+            chunks = [(key, start, min(start + chunk_rows - 1, high)) for start in range(low, high + 1, chunk_rows)]
+
+        for chunk in chunks:
+            query = f"INSERT INTO {target_schema}.{table} ({columns}) SELECT {columns} FROM {table}"
+            if chunk is not None:
+                key, low, high = chunk
+                query += f" WHERE {key} BETWEEN {int(low)} AND {int(high)}"
+            cursor.execute(query)
+            copied += max(cursor.rowcount, 0)
+            commit_connection(conn)
+            elapsed = time.perf_counter() - started
+            print(f"Table {table}: {copied} rows copied on server ({copied / elapsed if elapsed else 0:.0f} rows/s)")
+    return copied
+
+
+def copy_data(source_db, target_db, fetch_size=COPY_FETCH_SIZE, max_rows=BULK_MAX_ROWS, workers=None,
+              method='server', verify=False):
     '''
-    Копирует данные из таблиц source_db в соответствующие таблицы target_db
+    Копирует данные из таблиц source_db в соответствующие таблицы target_db.
+    Таблицы копируются в порядке внешних ключей (см. dependency_stages). Базы данных одного бэкенда
+    находятся на одном сервере (для SQLite - в одном каталоге), поэтому по умолчанию данные
+    копируются запросами INSERT ... SELECT без передачи строк клиенту (см. copy_table_on_server).
+    В режиме 'stream' строки читаются и вставляются потоково через Python (см. copy_table),
+    в режиме 'incremental' копируются только новые строки (см. sync_data).
 
     Параметры:
     -----------
@@ -415,178 +967,805 @@ def copy_data(source_db, target_db):
         Имя исходной базы данных, откуда копируются данные.
     target_db : str
         Имя целевой базы данных, куда копируются данные.
+    fetch_size : int, optional
+        Количество строк, читаемых за один раз. По умолчанию COPY_FETCH_SIZE.
+    max_rows : int, optional
+        Максимальное количество строк в одном запросе INSERT. По умолчанию BULK_MAX_ROWS.
+    workers : int, optional
+        Количество рабочих процессов для параллельного копирования (см. copy_parallel).
+        По умолчанию None - таблицы копируются по очереди.
+    method : str, optional
+        Способ копирования из COPY_METHODS: 'server', 'stream' или 'incremental'. По умолчанию 'server'.
+    verify : bool, optional
+        Для 'incremental': сверить контрольные суммы уже скопированных строк (см. sync_data).
+        По умолчанию False.
+
+    Возвращает:
+    --------
+    dict
+        Количество скопированных строк по таблицам.
     '''
+    if method not in COPY_METHODS:
+        raise ValueError(f"Unknown copy method '{method}', expected one of {COPY_METHODS}")
+    if method == 'incremental':
+        if workers is not None:
+            raise ValueError("Incremental copy does not support workers")
+        return sync_data(source_db, target_db, verify)
+    if workers is not None:
+        return copy_parallel(source_db, target_db, workers, fetch_size, max_rows, method=method)
+    if method == 'server':
+        return copy_data_on_server(source_db, target_db)
+    copied = {}
     with create_connection(source_db) as source_conn, create_connection(target_db) as target_conn:
         if source_conn and target_conn:
             try:
-                with MySQLCursorManager(source_conn) as source_cur, MySQLCursorManager(target_conn) as target_cur:
+                with MySQLCursorManager(source_conn) as source_cur:
                     source_cur.execute("SHOW TABLES")
-                    tables = source_cur.fetchall()
-
-                    for table in tables:
-                        table_name = table[0]
-                        source_cur.execute(f"SELECT * FROM {table_name}")
-                        rows = source_cur.fetchall()
-                        columns = [col[0] for col in source_cur.description]
-                        columns_str = ", ".join(columns)
-                        placeholders = ", ".join(['%s'] * len(columns))
+                    tables = [table[0] for table in source_cur.fetchall()]
+                    foreign_keys = get_backend().foreign_keys(source_cur)
 
-                        for row in rows:
-                            target_cur.execute(f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})", row)
+                for stage in dependency_stages(tables, foreign_keys):
+                    for table in stage:
+                        copied[table] = copy_table(source_conn, target_conn, table, fetch_size, max_rows)
 
-                    print(f"Data copied from '{source_db}' to '{target_db}' successfully")
+                print(f"Data copied from '{source_db}' to '{target_db}' successfully")
             except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(target_db)
+    return copied
 
 
-def create_sandbox(source_db, sandbox_db):
+def copy_data_on_server(source_db, target_db, chunk_rows=SERVER_COPY_ROWS):
     '''
-    Создаёт песочницу для указанной базы данных
+    Копирует данные всех таблиц source_db в target_db на сервере (см. copy_table_on_server)
+    в порядке внешних ключей.
 
     Параметры:
     -----------
     source_db : str
-        Имя исходной базы данных, из которой будут скопированы таблицы.
-    sandbox_db : str
-        Имя новой базы данных (песочницы), в которую будут скопированы таблицы.
-    '''
-    create_database(sandbox_db)
-    copy_tables(source_db, sandbox_db)
-
-
-def insert_into_fertilizers(database, fertilizers):
-    '''
-    Вставляет данные в таблицу fertilizers
+        Имя исходной базы данных.
+    target_db : str
+        Имя целевой базы данных.
+    chunk_rows : int, optional
+        Длина диапазона ключа, копируемого одним запросом. По умолчанию SERVER_COPY_ROWS.
 
-    Параметры:
-    -----------
-    database : str
-        Имя базы данных, в которую происходит вставка данных.
-    fertilizers : list of tuples
-        Список кортежей с данными для вставки в формате (name, amount).
+    Возвращает:
+    --------
+    dict
+        Количество скопированных строк по таблицам.
     '''
-    with create_connection(database) as conn:
+    backend = get_backend()
+    copied = {}
+    with create_connection(source_db) as conn:
         if conn:
             try:
                 with MySQLCursorManager(conn) as cursor:
-                    insert_query = "INSERT INTO fertilizers (name, amount) VALUES (%s, %s)"
-                    cursor.executemany(insert_query, fertilizers)
-                    print(f"{cursor.rowcount} rows inserted into fertilizers")
+                    target_schema = backend.attach_database(cursor, target_db)
+                    try:
+                        cursor.execute("SHOW TABLES")
+                        tables = [table[0] for table in cursor.fetchall()]
+                        stages = dependency_stages(tables, backend.foreign_keys(cursor))
+                        for stage in stages:
+                            for table in stage:
+                                copied[table] = copy_table_on_server(conn, table, target_schema, chunk_rows=chunk_rows)
+                    finally:
+                        backend.detach_database(cursor, target_schema)
+                print(f"Data copied from '{source_db}' to '{target_db}' on server successfully")
             except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(target_db)
+    return copied
 
 
-def insert_into_crops(database, crops):
+def sync_table(conn, table, target_schema, verify=False, check_rows=SYNC_CHECK_ROWS):
     '''
-    Вставляет данные в таблицу crops
+    Дополняет таблицу целевой базы данных строками исходной, ключ которых больше отметки
+    синхронизации, и переносит отметку на максимальный ключ исходной таблицы.
 
     Параметры:
     -----------
-    database : str
-        Имя базы данных, в которую происходит вставка данных.
-    crops : list of tuples
-        Список кортежей с данными для вставки в формате (name, season, watering_frequency, ripening_period).
-    '''
-    with create_connection(database) as conn:
-        if conn:
-            try:
-                with MySQLCursorManager(conn) as cursor:
-                    insert_query = "INSERT INTO crops (name, season, watering_frequency, ripening_period) VALUES (%s, %s, %s, %s)"
-                    cursor.executemany(insert_query, crops)
-                    print(f"{cursor.rowcount} rows inserted into crops")
-            except Error as e:
-                print(f"Error: '{e}'")
+    conn : соединение с базой данных
+        Соединение с исходной базой данных, к которому подключена целевая (см. backend.attach_database).
+    table : str
+        Имя таблицы с целочисленным первичным ключом.
+    target_schema : str
+        Префикс имён таблиц целевой базы данных.
+    verify : bool, optional
+        Сверить строки до отметки по диапазонам ключа длиной check_rows: диапазон, у которого
+        различаются количество строк или сумма CRC32 строк, копируется заново. Так находятся
+        изменённые и удалённые строки. По умолчанию False.
+    check_rows : int, optional
+        Длина сверяемого диапазона ключа. По умолчанию SYNC_CHECK_ROWS.
 
+    Возвращает:
+    --------
+    int
+        Количество скопированных строк, включая скопированные заново.
 
-def insert_into_employees(database, employees):
+    Замечания:
+    --------
+    Если отметки нет, ею считается максимальный ключ целевой таблицы, например скопированной
+    create_sandbox(copy_rows=True).
     '''
-    Вставляет данные в таблицу employees
+    backend = get_backend()
+    copied = 0
+    with MySQLCursorManager(conn) as cursor:
+        key = backend.primary_key(cursor, table)
+        cursor.execute(f"SELECT MIN({key[0]}), MAX({key[0]}) FROM {table}" if len(key) == 1 else "SELECT NULL, NULL")
+        low, high = cursor.fetchone()
+        if len(key) != 1 or not isinstance(high, (int, type(None))):
+            print(f"Table {table} skipped: incremental sync needs a single integer primary key")
+            return 0
+        key = key[0]
+        cursor.execute(f"SELECT last_id FROM {target_schema}.{SYNC_TABLE} WHERE table_name = %s", (table,))
+        row = cursor.fetchone()
+        cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {target_schema}.{table}")
+        target_low, target_high = cursor.fetchone()
+        mark = row[0] if row is not None else target_high
+
+        if high is not None and (mark is None or high > mark):
+            first = low if mark is None else max(low, mark + 1)
+            copied += copy_table_on_server(conn, table, target_schema, (key, first, high))
+
+        if verify and mark is not None:
+            cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+            columns = [col[0] for col in cursor.description]
+            cursor.fetchall()
+            checksum = f"COUNT(*), SUM({backend.row_checksum(columns)})"
+            column_list = ", ".join(columns)
+            start = min(value for value in (low, target_low) if value is not None)
+            for first in range(start, mark + 1, check_rows):
+                where = f"WHERE {key} BETWEEN {first} AND {min(first + check_rows - 1, mark)}"
+                cursor.execute(f"SELECT {checksum} FROM {table} {where}")
+                source_sum = cursor.fetchone()
+                cursor.execute(f"SELECT {checksum} FROM {target_schema}.{table} {where}")
+                if cursor.fetchone() == source_sum:
+                    continue
+                cursor.execute(f"DELETE FROM {target_schema}.{table} {where}")
+                cursor.execute(f"INSERT INTO {target_schema}.{table} ({column_list}) "
+                               f"SELECT {column_list} FROM {table} {where}")
+                copied += max(cursor.rowcount, 0)
+                commit_connection(conn)
+                print(f"Table {table}: range {where[6:]} differed and was copied again")
+
+        new_mark = max(value for value in (mark, high, 0) if value is not None)
+        cursor.execute(f"DELETE FROM {target_schema}.{SYNC_TABLE} WHERE table_name = %s", (table,))
+        cursor.execute(f"INSERT INTO {target_schema}.{SYNC_TABLE} (table_name, last_id) VALUES (%s, %s)",
+                       (table, new_mark))
+        commit_connection(conn)
+    print(f"Table {table} synced: {copied} rows copied, watermark {new_mark}")
+    return copied
+
+
+def sync_data(source_db, target_db, verify=False, check_rows=SYNC_CHECK_ROWS):
+    '''
+    Синхронизирует данные target_db с source_db на сервере: в каждую таблицу копируются строки,
+    добавленные после предыдущей синхронизации (см. sync_table). Отметки хранятся в таблице
+    SYNC_TABLE целевой базы данных. Таблицы обрабатываются в порядке внешних ключей, проверки
+    внешних ключей на время синхронизации отключаются.
 
     Параметры:
     -----------
-    database : str
-        Имя базы данных, в которую происходит вставка данных.
-    employees : list of tuples
-        Список кортежей с данными для вставки в формате (fullname, post).
+    source_db : str
+        Имя исходной базы данных.
+    target_db : str
+        Имя целевой базы данных с теми же таблицами (см. create_sandbox).
+    verify : bool, optional
+        Сверить контрольные суммы уже скопированных строк по диапазонам ключа. По умолчанию False.
+    check_rows : int, optional
+        Длина сверяемого диапазона ключа. По умолчанию SYNC_CHECK_ROWS.
+
+    Возвращает:
+    --------
+    dict
+        Количество скопированных строк по таблицам.
     '''
-    with create_connection(database) as conn:
+    backend = get_backend()
+    synced = {}
+    with create_connection(source_db) as conn:
         if conn:
             try:
                 with MySQLCursorManager(conn) as cursor:
-                    insert_query = "INSERT INTO employees (fullname, post) VALUES (%s, %s)"
-                    cursor.executemany(insert_query, employees)
-                    print(f"{cursor.rowcount} rows inserted into employees")
+                    target_schema = backend.attach_database(cursor, target_db)
+                    saved = backend.begin_bulk_load(cursor)
+                    try:
+                        cursor.execute(f"CREATE TABLE IF NOT EXISTS {target_schema}.{SYNC_TABLE} ("
+                                       "table_name VARCHAR(64) PRIMARY KEY, last_id BIGINT NOT NULL)")
+                        cursor.execute("SHOW TABLES")
+                        tables = [table[0] for table in cursor.fetchall() if table[0] != SYNC_TABLE]
+                        for stage in dependency_stages(tables, backend.foreign_keys(cursor)):
+                            for table in stage:
+                                synced[table] = sync_table(conn, table, target_schema, verify, check_rows)
+                    finally:
+                        # sync_table() подтверждает свою работу; откатывается только прерванная часть,
+                        # чтобы настройки и DETACH выполнялись вне транзакции
+                        conn.rollback()
+                        backend.end_bulk_load(cursor, saved)
+                        backend.detach_database(cursor, target_schema)
+                print(f"Data synced from '{source_db}' to '{target_db}' successfully")
             except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(target_db)
+    return synced
 
 
-def insert_into_gardens(database, gardens):
+def table_key_ranges(cursor, table, parts, split_rows=COPY_SPLIT_ROWS, chunk_rows=None):
     '''
-    Вставляет данные в таблицу gardens
+    Делит таблицу на части по диапазонам целочисленного первичного ключа.
 
     Параметры:
     -----------
-    database : str
-        Имя базы данных, в которую происходит вставка данных.
-    gardens : list of str
-        Список строк с именами садов для вставки.
-    '''
-    gardens = [(name,) for name in gardens]  # Преобразуем список строк в список кортежей
-    with create_connection(database) as conn:
-        if conn:
-            try:
-                with MySQLCursorManager(conn) as cursor:
-                    insert_query = "INSERT INTO gardens (name) VALUES (%s)"
-                    cursor.executemany(insert_query, gardens)
-                    print(f"{cursor.rowcount} rows inserted into gardens")
-            except Error as e:
-                print(f"Error: '{e}'")
+    cursor : курсор базы данных
+        Курсор исходной базы данных.
+    table : str
+        Имя таблицы.
+    parts : int
+        Максимальное количество частей.
+    split_rows : int, optional
+        Минимальная длина диапазона ключа, начиная с которой таблица делится. По умолчанию COPY_SPLIT_ROWS.
+    chunk_rows : int, optional
+        Максимальная длина диапазона одной части; при необходимости частей становится больше parts.
+        По умолчанию не ограничена.
 
-def insert_into_actions(database, actions):
+    Возвращает:
+    --------
+    list
+        Части (столбец ключа, первое значение, последнее значение) или [None], если таблица
+        копируется целиком: ключ составной или не целочисленный, либо таблица мала.
     '''
-    Вставляет данные в таблицу actions
+    key = get_backend().primary_key(cursor, table)
+    if len(key) != 1:
+        return [None]
+    key = key[0]
+    cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}")
+    low, high = cursor.fetchone()
+    if not isinstance(low, int) or not isinstance(high, int):
+        return [None]
+    span = high - low + 1
+    if chunk_rows:
+        parts = max(parts, -(-span // chunk_rows))
+    if parts < 2 or span < split_rows:
+        return [None]
+    ranges = []
+    for size in split_count(span, parts):
+        ranges.append((key, low, low + size - 1))
+        low += size
+    return ranges
+
+
+def copy_shard(source_db, target_db, table, key_range=None, fetch_size=COPY_FETCH_SIZE, max_rows=BULK_MAX_ROWS,
+               method='stream'):
+    '''
+    Копирует таблицу или её часть через собственную пару соединений.
+    Вызывается в рабочих процессах copy_parallel().
 
     Параметры:
     -----------
-    database : str
-        Имя базы данных, в которую происходит вставка данных.
-    actions : list of str
-        Список строк с названиями действий для вставки.
+    source_db : str
+        Имя исходной базы данных.
+    target_db : str
+        Имя целевой базы данных.
+    table : str
+        Имя таблицы.
+    key_range : tuple, optional
+        Часть таблицы (см. table_key_ranges). По умолчанию вся таблица.
+    fetch_size : int, optional
+        Количество строк, читаемых за один раз. По умолчанию COPY_FETCH_SIZE.
+    max_rows : int, optional
+        Максимальное количество строк в одном запросе INSERT. По умолчанию BULK_MAX_ROWS.
+    method : str, optional
+        Способ копирования из COPY_METHODS. По умолчанию 'stream'.
+
+    Возвращает:
+    --------
+    int
+        Количество скопированных строк.
     '''
-    actions = [(name,) for name in actions]  # Преобразуем список строк в список кортежей
-    with create_connection(database) as conn:
-        if conn:
+    if method == 'server':
+        backend = get_backend()
+        with create_connection(source_db) as conn:
+            if conn:
+                try:
+                    with MySQLCursorManager(conn) as cursor:
+                        target_schema = backend.attach_database(cursor, target_db)
+                        try:
+                            return copy_table_on_server(conn, table, target_schema, key_range)
+                        finally:
+                            backend.detach_database(cursor, target_schema)
+                except Error as e:
+                    print(f"Error: '{e}'")
+        return 0
+    with create_connection(source_db) as source_conn, create_connection(target_db) as target_conn:
+        if source_conn and target_conn:
             try:
-                with MySQLCursorManager(conn) as cursor:
-                    insert_query = "INSERT INTO actions (name) VALUES (%s)"
-                    cursor.executemany(insert_query, actions)
-                    print(f"{cursor.rowcount} rows inserted into actions")
+                return copy_table(source_conn, target_conn, table, fetch_size, max_rows, key_range)
             except Error as e:
                 print(f"Error: '{e}'")
+    return 0
 
-def insert_into_beds(database, beds):
+
+def copy_parallel(source_db, target_db, workers=None, fetch_size=COPY_FETCH_SIZE, max_rows=BULK_MAX_ROWS,
+                  split_rows=COPY_SPLIT_ROWS, method='server'):
     '''
-    Вставляет данные в таблицу beds
+    Копирует данные параллельно пулом процессов. Таблицы копируются по этапам dependency_stages():
+    таблицы одного этапа не ссылаются друг на друга и копируются одновременно, каждая через свои
+    соединения, а следующий этап начинается после завершения предыдущего. Таблицы с целочисленным
+    первичным ключом и диапазоном ключа не меньше split_rows делятся между процессами по диапазонам ключа.
 
     Параметры:
     -----------
-    database : str
-        Имя базы данных, в которую происходит вставка данных.
-    beds : list of tuples
-        Список кортежей с данными для вставки в формате (garden_id, crop_id, fertilizer_id).
+    source_db : str
+        Имя исходной базы данных, откуда копируются данные.
+    target_db : str
+        Имя целевой базы данных, куда копируются данные.
+    workers : int, optional
+        Количество рабочих процессов. По умолчанию os.cpu_count().
+    fetch_size : int, optional
+        Количество строк, читаемых за один раз. По умолчанию COPY_FETCH_SIZE.
+    max_rows : int, optional
+        Максимальное количество строк в одном запросе INSERT. По умолчанию BULK_MAX_ROWS.
+    split_rows : int, optional
+        Минимальная длина диапазона ключа для деления таблицы на части. По умолчанию COPY_SPLIT_ROWS.
+    method : str, optional
+        Способ копирования из COPY_METHODS (см. copy_data). По умолчанию 'server'.
+
+    Возвращает:
+    --------
+    dict
+        Количество скопированных строк по таблицам.
+    '''
+    workers = workers or os.cpu_count() or 1
+    shards = {}
+    with create_connection(source_db) as source_conn:
+        if source_conn:
+            try:
+                with MySQLCursorManager(source_conn) as source_cur:
+                    source_cur.execute("SHOW TABLES")
+                    tables = [table[0] for table in source_cur.fetchall()]
+                    stages = dependency_stages(tables, get_backend().foreign_keys(source_cur))
+                    for table in tables:
+                        shards[table] = table_key_ranges(source_cur, table, workers, split_rows)
+            except Error as e:
+                print(f"Error: '{e}'")
+    if not shards:
+        return {}
+
+    started = time.perf_counter()
+    copied = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_populate_worker,
+                             initargs=(get_backend(),)) as executor:
+        for stage in stages:
+            futures = [(table, executor.submit(copy_shard, source_db, target_db, table, key_range,
+                                               fetch_size, max_rows, method))
+                       for table in stage for key_range in shards[table]]
+            # Этап завершается, когда скопированы все его части
+            for table, future in futures:
+                copied[table] = copied.get(table, 0) + future.result()
+    elapsed = time.perf_counter() - started
+    total = sum(copied.values())
+    print(f"Data copied from '{source_db}' to '{target_db}' by {workers} workers: {total} rows in {elapsed:.2f} s "
+          f"({total / elapsed if elapsed else 0:.0f} rows/s)")
+    parent_keys.invalidate(target_db)
+    return copied
+
+
+def create_sandbox(source_db, sandbox_db, copy_rows=False, workers=None):
+    '''
+    Создаёт песочницу для указанной базы данных
+
+    Параметры:
+    -----------
+    source_db : str
+        Имя исходной базы данных, из которой будут скопированы таблицы.
+    sandbox_db : str
+        Имя новой базы данных (песочницы), в которую будут скопированы таблицы.
+    copy_rows : bool, optional
+        Скопировать также данные таблиц (см. copy_data). По умолчанию False - только схемы.
+    workers : int, optional
+        Количество рабочих процессов для копирования данных. По умолчанию None - по очереди.
+    '''
+    create_database(sandbox_db)
+    copy_tables(source_db, sandbox_db)
+    if copy_rows:
+        copy_data(source_db, sandbox_db, workers=workers)
+
+
+def insert_rows(database, table, columns, rows, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True,
+                max_rows=BULK_MAX_ROWS, id_ranges=None):
+    '''
+    Вставляет строки в таблицу, читая их из итерируемого объекта порциями по chunk_size.
+    Строки отправляются многострочными запросами INSERT ... VALUES, размер которых ограничен
+    max_rows строками и max_allowed_packet сервера, поэтому источником может быть генератор любого размера.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    table : str
+        Имя таблицы.
+    columns : list of str
+        Имена заполняемых столбцов.
+    rows : iterable of tuples, ColumnBatch or ColumnBatches
+        Строки для вставки. Для таблиц с одним столбцом допускаются значения без кортежа.
+        Пакеты в столбцовом виде переводятся в запросы по столбцам, без кортежей строк.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+    max_rows : int, optional
+        Максимальное количество строк в одном запросе INSERT. По умолчанию BULK_MAX_ROWS.
+    id_ranges : IdRanges, optional
+        Набор, в который добавляются AUTO_INCREMENT идентификаторы вставленных строк.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных и подтверждённых строк.
+    '''
+    single_column = len(columns) == 1
+    columnar = isinstance(rows, (ColumnBatch, ColumnBatches))
+    total = committed = 0
+
+    with create_connection(database) as conn:
+        if conn:
+            try:
+                with MySQLCursorManager(conn) as cursor:
+                    inserter = BulkInserter(cursor, table, columns, max_rows=max_rows, id_ranges=id_ranges)
+                    if columnar:
+                        for batch in rows.batches():
+                            inserter.add_batch(batch)
+                            total += len(batch)
+                            # Пакет подтверждается целиком, как только набралась порция
+                            if total - committed >= chunk_size:
+                                inserter.flush()
+                                if commit_every_chunk:
+                                    commit_connection(conn)
+                                    committed = total
+                        rows = ()
+                    for row in rows:
+                        if single_column and not isinstance(row, tuple):
+                            row = (row,)
+                        inserter.add(row)
+                        total += 1
+                        if total % chunk_size == 0:
+                            inserter.flush()
+                            if commit_every_chunk:
+                                commit_connection(conn)
+                                committed = total
+                    inserter.flush()
+                committed = total
+                print(f"{total} rows inserted into {table}")
+            except Error as e:
+                print(f"Error: '{e}'")
+    parent_keys.invalidate(database, table)
+    return committed
+
+
+def insert_into_fertilizers(database, fertilizers, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу fertilizers
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    fertilizers : iterable of tuples
+        Кортежи с данными для вставки в формате (name, amount), например generator_random_fertilizer().
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'fertilizers', TABLE_COLUMNS['fertilizers'], fertilizers, chunk_size, commit_every_chunk)
+
+
+def insert_into_crops(database, crops, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу crops
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    crops : iterable of tuples
+        Кортежи с данными для вставки в формате (name, season, watering_frequency, ripening_period).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'crops', TABLE_COLUMNS['crops'], crops, chunk_size, commit_every_chunk)
+
+
+def insert_into_employees(database, employees, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу employees
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    employees : iterable of tuples
+        Кортежи с данными для вставки в формате (fullname, post).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'employees', TABLE_COLUMNS['employees'], employees, chunk_size, commit_every_chunk)
+
+
+def insert_into_gardens(database, gardens, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу gardens
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    gardens : iterable of str
+        Имена садов для вставки (допускаются и кортежи вида (name,)).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'gardens', TABLE_COLUMNS['gardens'], gardens, chunk_size, commit_every_chunk)
+
+
+def insert_into_actions(database, actions, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу actions
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    actions : iterable of str
+        Названия действий для вставки (допускаются и кортежи вида (name,)).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'actions', TABLE_COLUMNS['actions'], actions, chunk_size, commit_every_chunk)
+
+
+def insert_into_beds(database, beds, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу beds
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    beds : iterable of tuples
+        Кортежи с данными для вставки в формате (garden_id, crop_id, fertilizer_id).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'beds', TABLE_COLUMNS['beds'], beds, chunk_size, commit_every_chunk)
+
+
+def insert_into_garden_employees(database, garden_employees, chunk_size=INSERT_CHUNK_SIZE, commit_every_chunk=True):
+    '''
+    Вставляет данные в таблицу garden_employees
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    garden_employees : iterable of tuples
+        Кортежи с данными для вставки в формате (garden_id, employee_id).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    commit_every_chunk : bool, optional
+        Подтверждать транзакцию после каждой порции. По умолчанию True.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return insert_rows(database, 'garden_employees', TABLE_COLUMNS['garden_employees'], garden_employees,
+                       chunk_size, commit_every_chunk)
+
+
+def fetch_id_range(database, table):
+    '''
+    Возвращает диапазон идентификаторов таблицы по MIN(id) и MAX(id).
+    Оба значения читаются из первичного ключа, таблица не сканируется.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных.
+    table : str
+        Имя таблицы.
+
+    Возвращает:
+    --------
+    IdRanges
+        Отрезок [MIN(id), MAX(id)] или пустой набор для пустой таблицы.
+
+    Замечания:
+    --------
+    Отрезок считается сплошным: идентификаторы удалённых строк из него не исключаются.
     '''
     with create_connection(database) as conn:
         if conn:
             try:
                 with MySQLCursorManager(conn) as cursor:
-                    insert_query = "INSERT INTO beds (garden_id, crop_id, fertilizer_id) VALUES (%s, %s, %s)"
-                    cursor.executemany(insert_query, beds)
-                    print(f"{cursor.rowcount} rows inserted into beds")
+                    cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+                    return IdRanges.from_bounds(*cursor.fetchone())
             except Error as e:
                 print(f"Error: '{e}'")
+    return IdRanges()
+
+
+def max_table_id(database, table):
+    '''
+    Возвращает наибольший идентификатор таблицы или 0 для пустой таблицы.
+    '''
+    ranges = fetch_id_range(database, table).ranges
+    return ranges[-1][1] if ranges else 0
+
+
+def load_rows(database, table, columns, rows, use_fifo=False):
+    '''
+    Загружает строки в таблицу встроенным загрузчиком сервера LOAD DATA LOCAL INFILE.
+    Строки записываются во временный файл TSV (или именованный канал) в кодировке utf-8.
+    Бэкенд без LOAD DATA (SQLite) вставляет строки одним executemany в одной транзакции.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит загрузка данных.
+    table : str
+        Имя таблицы.
+    columns : list of str
+        Имена заполняемых столбцов.
+    rows : iterable of tuples, ColumnBatch or ColumnBatches
+        Строки для загрузки. Для таблиц с одним столбцом допускаются значения без кортежа.
+        Пакеты в столбцовом виде записываются в TSV по столбцам.
+    use_fifo : bool, optional
+        Передавать данные через именованный канал вместо временного файла. По умолчанию False.
+
+    Возвращает:
+    --------
+    int
+        Количество загруженных строк.
+    '''
+    backend = get_backend()
+    # Кэш сбрасывается заранее: загрузка может завершиться ошибкой после вставки части строк
+    parent_keys.invalidate(database, table)
+    columnar = isinstance(rows, (ColumnBatch, ColumnBatches))
+    if len(columns) == 1 and not columnar:
+        rows = (row if isinstance(row, tuple) else (row,) for row in rows)
+
+    if not backend.supports_load_data:
+        if columnar:
+            rows = rows.rows()
+        insert_query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        with create_connection(database) as conn:
+            if conn:
+                try:
+                    with MySQLCursorManager(conn) as cursor:
+                        cursor.executemany(insert_query, rows)
+                        count = cursor.rowcount
+                    print(f"{count} rows loaded into {table}")
+                    return count
+                except Error as e:
+                    print(f"Error: '{e}'")
+        return 0
+
+    tmp_dir = tempfile.mkdtemp(prefix=f'{table}_load_')
+    path = os.path.join(tmp_dir, f'{table}.tsv')
+    writer = None
+    try:
+        if use_fifo:
+            os.mkfifo(path)
+            writer = FifoWriter(path, rows)
+            writer.start()
+        else:
+            write_tsv_file(path, rows)
+
+        # LOAD DATA LOCAL требует соединения с разрешённой передачей локальных файлов;
+        # у сеанса массовой загрузки оно уже есть
+        session = _session_for_database(database)
+        with nullcontext(session.conn) if session else connect(database, allow_local_infile=True) as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute(load_data_query(path, table, columns))
+                count = cursor.rowcount
+        if writer is not None:
+            writer.join()
+            writer = None
+        print(f"{count} rows loaded into {table}")
+        return count
+    except Error as e:
+        print(f"Error: '{e}'")
+        return 0
+    finally:
+        if writer is not None:
+            writer.abort()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def populate_fertilizers_table(database, n):
+def populate_table(database, table, rows, chunk_size=INSERT_CHUNK_SIZE, mode='insert', id_ranges=None, columns=None):
+    '''
+    Заполняет таблицу строками выбранным способом и сообщает скорость загрузки.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    table : str
+        Имя таблицы из TABLE_COLUMNS.
+    rows : iterable of tuples
+        Строки для вставки.
+    chunk_size : int, optional
+        Количество строк в одной порции для режима 'insert'. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        'insert' - пакетные INSERT, 'load' - LOAD DATA из временного файла,
+        'load_fifo' - LOAD DATA из именованного канала. По умолчанию 'insert'.
+    id_ranges : IdRanges, optional
+        Набор, в который добавляются идентификаторы вставленных строк (только в режиме 'insert').
+    columns : list of str, optional
+        Заполняемые столбцы. По умолчанию TABLE_COLUMNS[table].
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    if mode not in POPULATE_MODES:
+        raise ValueError(f"Unknown populate mode '{mode}', expected one of {POPULATE_MODES}")
+
+    started = time.perf_counter()
+    if mode == 'insert':
+        count = insert_rows(database, table, columns or TABLE_COLUMNS[table], rows, chunk_size, id_ranges=id_ranges)
+    else:
+        count = load_rows(database, table, columns or TABLE_COLUMNS[table], rows, use_fifo=mode == 'load_fifo')
+    elapsed = time.perf_counter() - started
+
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    print(f"Table {table}: {count} rows in {elapsed:.3f} s ({rate:.0f} rows/s, mode '{mode}')")
+    return count
+
+
+def populate_fertilizers_table(database, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert'):
     '''
     Заполняет таблицу fertilizers случайными данными
 
@@ -596,12 +1775,21 @@ def populate_fertilizers_table(database, n):
         Имя базы данных, в которую происходит вставка данных.
     n : int
         Количество случайных записей, которые будут добавлены в таблицу.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
     '''
-    fertilizers = [new_random_fertilizer() for _ in range(n)]
-    insert_into_fertilizers(database, fertilizers)
+    fertilizers = (new_random_fertilizer() for _ in range(n))
+    return populate_table(database, 'fertilizers', fertilizers, chunk_size, mode)
 
 
-def populate_crops_table(database, n):
+def populate_crops_table(database, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert'):
     '''
     Заполняет таблицу crops случайными данными
 
@@ -611,12 +1799,21 @@ def populate_crops_table(database, n):
         Имя базы данных, в которую происходит вставка данных.
     n : int
         Количество случайных записей, которые будут добавлены в таблицу.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
     '''
-    crops = [new_random_crop() for _ in range(n)]
-    insert_into_crops(database, crops)
+    crops = (new_random_crop() for _ in range(n))
+    return populate_table(database, 'crops', crops, chunk_size, mode)
 
 
-def populate_employees_table(database, n):
+def populate_employees_table(database, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert'):
     '''
     Заполняет таблицу employees случайными данными
 
@@ -626,12 +1823,21 @@ def populate_employees_table(database, n):
         Имя базы данных, в которую происходит вставка данных.
     n : int
         Количество случайных записей, которые будут добавлены в таблицу.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
     '''
-    employees = [new_random_employee() for _ in range(n)]
-    insert_into_employees(database, employees)
+    employees = (new_random_employee() for _ in range(n))
+    return populate_table(database, 'employees', employees, chunk_size, mode)
 
 
-def populate_gardens_table(database, n):
+def populate_gardens_table(database, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert'):
     '''
     Заполняет таблицу gardens случайными данными
 
@@ -641,12 +1847,21 @@ def populate_gardens_table(database, n):
         Имя базы данных, в которую происходит вставка данных.
     n : int
         Количество случайных записей, которые будут добавлены в таблицу.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
     '''
-    gardens = [(garden,) for garden in new_random_gardens(n)]
-    insert_into_gardens(database, gardens)
+    gardens = (new_random_garden() for _ in range(n))
+    return populate_table(database, 'gardens', gardens, chunk_size, mode)
 
 
-def populate_actions_table(database, n):
+def populate_actions_table(database, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert'):
     '''
     Заполняет таблицу actions случайными данными
 
@@ -656,14 +1871,346 @@ def populate_actions_table(database, n):
         Имя базы данных, в которую происходит вставка данных.
     n : int
         Количество случайных записей, которые будут добавлены в таблицу.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    actions = (new_random_action() for _ in range(n))
+    return populate_table(database, 'actions', actions, chunk_size, mode)
+
+
+def populate_beds_table(database, n, parent_ids=None, chunk_size=INSERT_CHUNK_SIZE, mode='insert',
+                        distributions=None):
+    '''
+    Заполняет таблицу beds случайными данными
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    n : int
+        Количество случайных записей, которые будут добавлены в таблицу.
+    parent_ids : dict, optional
+        Идентификаторы родительских таблиц {'gardens': ..., 'crops': ..., 'fertilizers': ...}.
+        Отсутствующие определяются по MIN(id)/MAX(id) (см. fetch_id_range).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию ключи выбираются равномерно.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
     '''
-    actions = [(action,) for action in new_random_actions(n)]
-    insert_into_actions(database, actions)
+    return populate_shard(database, 'beds', n, chunk_size, mode, parent_ids=parent_ids, distributions=distributions)
 
 
-def populate_garden_db(database, n):
+def populate_garden_employees_table(database, n, parent_ids=None, chunk_size=INSERT_CHUNK_SIZE, mode='insert',
+                                    distributions=None):
     '''
-    Заполняет таблицы в базе данных garden случайными данными
+    Заполняет таблицу garden_employees случайными данными
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    n : int
+        Количество случайных записей, которые будут добавлены в таблицу.
+    parent_ids : dict, optional
+        Идентификаторы родительских таблиц {'gardens': ..., 'employees': ...}.
+        Отсутствующие определяются по MIN(id)/MAX(id) (см. fetch_id_range).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию ключи выбираются равномерно.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    return populate_shard(database, 'garden_employees', n, chunk_size, mode, parent_ids=parent_ids,
+                          distributions=distributions)
+
+
+# Генераторы пакетов случайных строк в столбцовом виде для таблиц, заполняемых populate_garden_db()
+BATCH_FACTORIES = {
+    'fertilizers': fertilizer_batch,
+    'crops': crop_batch,
+    'employees': employee_batch,
+    'gardens': garden_batch,
+    'actions': action_batch,
+    'beds': bed_batch,
+    'garden_employees': garden_employee_batch,
+}
+
+# Родительские таблицы, из идентификаторов которых генерируются строки связующих таблиц
+PARENT_TABLES = {
+    'beds': ('gardens', 'crops', 'fertilizers'),
+    'garden_employees': ('gardens', 'employees'),
+}
+
+
+def split_count(n, parts):
+    '''
+    Делит n строк на parts почти равных частей.
+
+    Параметры:
+    -----------
+    n : int
+        Общее количество строк.
+    parts : int
+        Количество частей.
+
+    Возвращает:
+    --------
+    list of int
+        Размеры частей, отличающиеся не больше чем на единицу.
+    '''
+    return [n // parts + (1 if i < n % parts else 0) for i in range(parts)]
+
+
+def resolve_parent_ids(database, table, parent_ids=None):
+    '''
+    Возвращает идентификаторы родительских таблиц для связующей таблицы.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных.
+    table : str
+        Имя связующей таблицы из PARENT_TABLES.
+    parent_ids : dict, optional
+        Уже известные идентификаторы по таблицам. Непустые значения используются как есть,
+        остальные определяются по MIN(id)/MAX(id).
+
+    Возвращает:
+    --------
+    dict
+        Идентификаторы по родительским таблицам.
+    '''
+    parent_ids = parent_ids or {}
+    resolved = {}
+    for parent in PARENT_TABLES[table]:
+        ids = parent_ids.get(parent)
+        resolved[parent] = ids if ids is not None and len(ids) else fetch_id_range(database, parent)
+    return resolved
+
+
+def generate_batches(table, n, chunk_size=INSERT_CHUNK_SIZE, args=(), seed=None, first_row=0,
+                     block_rows=GENERATION_BLOCK_ROWS, id_base=None):
+    '''
+    Генерирует строки таблицы пакетами в столбцовом виде.
+
+    Параметры:
+    -----------
+    table : str
+        Имя таблицы из BATCH_FACTORIES.
+    n : int
+        Количество строк.
+    chunk_size : int, optional
+        Размер пакета без зерна. По умолчанию INSERT_CHUNK_SIZE.
+    args : tuple, optional
+        Дополнительные аргументы генератора пакетов (идентификаторы родителей).
+    seed : int or str, optional
+        Зерно. Если задано, строки генерируются блоками по block_rows, и блок с номером b таблицы
+        генерируется контекстом GenerationContext(seed).spawn(table, b).
+    first_row : int, optional
+        Номер первой строки в наборе данных таблицы; должен быть кратен block_rows. По умолчанию 0.
+    block_rows : int, optional
+        Размер блока строк с собственным потоком случайных чисел. По умолчанию GENERATION_BLOCK_ROWS.
+    id_base : int, optional
+        Только с seed: добавить первым столбец id со значениями id_base + номер строки + 1.
+        По умолчанию идентификаторы выдаёт AUTO_INCREMENT.
+
+    Возвращает:
+    --------
+    генератор ColumnBatch
+        Пакеты строк.
+
+    Замечания:
+    --------
+    Содержимое блока зависит только от seed, таблицы и номера блока, поэтому набор данных не зависит
+    от того, как строки поделены между рабочими процессами. Идентификаторы AUTO_INCREMENT зависят
+    от порядка, в котором процессы вставляют свои части, поэтому с id_base они задаются явно.
+    '''
+    factory = BATCH_FACTORIES[table]
+    if seed is None:
+        for start in range(0, n, chunk_size):
+            yield factory(min(chunk_size, n - start), *args)
+        return
+    if first_row % block_rows:
+        raise ValueError(f"first_row {first_row} is not aligned to blocks of {block_rows} rows")
+    table_context = GenerationContext(seed).spawn(table)
+    for start in range(0, n, block_rows):
+        block = (first_row + start) // block_rows
+        rows = min(block_rows, n - start)
+        batch = factory(rows, *args, context=table_context.spawn(block))
+        if id_base is not None:
+            first_id = id_base + first_row + start + 1
+            batch = ColumnBatch(['id'] + batch.columns, [int_column(range(first_id, first_id + rows))] + batch.buffers)
+        yield batch
+
+
+def populate_shard(database, table, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert', seed=None, first_row=0,
+                   parent_ids=None, id_ranges=None, block_rows=GENERATION_BLOCK_ROWS, distributions=None,
+                   id_base=None):
+    '''
+    Генерирует и вставляет одну часть строк таблицы через собственное соединение процесса.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    table : str
+        Имя таблицы из BATCH_FACTORIES.
+    n : int
+        Количество строк в части.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки (см. populate_table). По умолчанию 'insert'.
+    seed : int or str, optional
+        Зерно генератора (см. generate_batches).
+    first_row : int, optional
+        Номер первой строки части в наборе данных таблицы. По умолчанию 0.
+    parent_ids : dict, optional
+        Идентификаторы родительских таблиц для связующих таблиц (см. resolve_parent_ids).
+    id_ranges : IdRanges, optional
+        Набор, в который добавляются идентификаторы вставленных строк.
+    block_rows : int, optional
+        Размер блока строк с собственным потоком случайных чисел. По умолчанию GENERATION_BLOCK_ROWS.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию ключи выбираются равномерно.
+    id_base : int, optional
+        Только с seed: строки получают идентификаторы id_base + номер строки + 1 (см. generate_batches).
+        По умолчанию - наибольший идентификатор таблицы перед вставкой.
+
+    Возвращает:
+    --------
+    int
+        Количество вставленных строк.
+    '''
+    args = ()
+    if table in PARENT_TABLES:
+        parent_ids = resolve_parent_ids(database, table, parent_ids)
+        empty = [parent for parent, ids in parent_ids.items() if not len(ids)]
+        if empty:
+            print(f"Table {table} not populated: no rows in {', '.join(empty)}")
+            return 0
+        distributions = distributions or {}
+        # Выбор с распределением 'fanout' продолжает общую последовательность с первой строки части
+        args = tuple(parent_sampler(parent_ids[parent], distributions.get(parent), first_row)
+                     for parent in PARENT_TABLES[table])
+    columns = TABLE_COLUMNS[table]
+    if seed is not None:
+        if id_base is None:
+            id_base = max_table_id(database, table)
+        columns = ['id'] + columns
+    batches = generate_batches(table, n, chunk_size, args, seed, first_row, block_rows, id_base)
+    if seed is None:
+        return populate_table(database, table, ColumnBatches(batches), chunk_size, mode, id_ranges)
+    # Идентификаторы заданы явно, поэтому вставленные строки занимают известный отрезок
+    count = populate_table(database, table, ColumnBatches(batches), chunk_size, mode, columns=columns)
+    if id_ranges is not None:
+        id_ranges.add(id_base + first_row + 1, count)
+    return count
+
+
+def _init_populate_worker(backend):
+    # Рабочий процесс, запущенный без fork, должен работать с тем же бэкендом, что и родитель
+    set_backend(backend)
+
+
+def populate_parallel(database, counts, workers=None, seed=None, chunk_size=INSERT_CHUNK_SIZE, mode='insert',
+                      distributions=None):
+    '''
+    Заполняет таблицы параллельно пулом процессов. Количество строк каждой таблицы делится
+    между рабочими процессами, каждый из которых генерирует и вставляет свою часть через
+    собственное соединение. Таблицы заполняются по этапам GARDEN_POPULATE_STAGES: следующий этап
+    начинается только после завершения предыдущего. Идентификаторы родителей для связующих таблиц
+    определяются один раз по MIN(id)/MAX(id) и передаются всем рабочим процессам.
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных, в которую происходит вставка данных.
+    counts : dict
+        Количество строк по таблицам, например {'fertilizers': 1000, 'crops': 1000}.
+    workers : int, optional
+        Количество рабочих процессов. По умолчанию os.cpu_count().
+    seed : int or str, optional
+        Зерно генератора. При одинаковом seed генерируются одинаковые строки с одинаковыми
+        идентификаторами при любом workers (порядок вставки может различаться).
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки (см. populate_table). По умолчанию 'insert'.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию ключи выбираются равномерно.
+
+    Возвращает:
+    --------
+    dict
+        Количество вставленных строк по таблицам.
+    '''
+    # Без зерна строки делятся между процессами поровну, без выравнивания по блокам
+    block_rows = GENERATION_BLOCK_ROWS if seed is not None else 1
+    unknown = set(counts) - set(BATCH_FACTORIES)
+    if unknown:
+        raise ValueError(f"Tables {sorted(unknown)} cannot be populated in parallel")
+    workers = workers or os.cpu_count() or 1
+
+    inserted = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_populate_worker,
+                             initargs=(get_backend(),)) as executor:
+        for stage in GARDEN_POPULATE_STAGES:
+            futures = []
+            for table in stage:
+                if not counts.get(table):
+                    continue
+                parent_ids = resolve_parent_ids(database, table) if table in PARENT_TABLES else None
+                # Все части таблицы отсчитывают явные идентификаторы от одного начала
+                id_base = max_table_id(database, table) if seed is not None else None
+                # Части делятся по границам блоков, чтобы данные с зерном не зависели от числа процессов
+                blocks = -(-counts[table] // block_rows)
+                first_block = 0
+                for shard_blocks in split_count(blocks, workers):
+                    first_row = first_block * block_rows
+                    shard_count = min(counts[table], (first_block + shard_blocks) * block_rows) - first_row
+                    first_block += shard_blocks
+                    if shard_count > 0:
+                        futures.append((table, executor.submit(populate_shard, database, table, shard_count,
+                                                               chunk_size, mode, seed, first_row, parent_ids,
+                                                               None, block_rows, distributions, id_base)))
+            # Этап завершается, когда все его части вставлены
+            for table, future in futures:
+                inserted[table] = inserted.get(table, 0) + future.result()
+    return inserted
+
+
+def populate_garden_db(database, n, chunk_size=INSERT_CHUNK_SIZE, mode='insert', workers=None, seed=None,
+                       distributions=None):
+    '''
+    Заполняет таблицы в базе данных garden случайными данными, включая грядки и связи "Сад-Сотрудник".
+    Идентификаторы родителей для связующих таблиц берутся из диапазонов AUTO_INCREMENT, выданных
+    при вставке родительских таблиц, а в режимах LOAD DATA и в параллельном режиме - по MIN(id)/MAX(id),
+    поэтому родительские таблицы не перечитываются.
 
     Параметры:
     -----------
@@ -671,12 +2218,37 @@ def populate_garden_db(database, n):
         Имя базы данных, в которую происходит вставка данных.
     n : int
         Количество случайных записей, которые будут добавлены в каждую таблицу.
+    chunk_size : int, optional
+        Количество строк в одной порции. По умолчанию INSERT_CHUNK_SIZE.
+    mode : str, optional
+        Способ загрузки: 'insert', 'load' или 'load_fifo' (см. populate_table). По умолчанию 'insert'.
+    workers : int, optional
+        Количество рабочих процессов. Если указано, таблицы заполняются параллельно (см. populate_parallel).
+        По умолчанию None (в текущем процессе).
+    seed : int or str, optional
+        Зерно генератора для воспроизводимого заполнения. По умолчанию None.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию ключи выбираются равномерно.
+
+    Возвращает:
+    --------
+    dict
+        Количество вставленных строк по таблицам.
     '''
-    populate_fertilizers_table(database, n)
-    populate_crops_table(database, n)
-    populate_employees_table(database, n)
-    populate_gardens_table(database, n)
-    populate_actions_table(database, n)
+    counts = {table: n for table in BATCH_FACTORIES}
+    if workers:
+        return populate_parallel(database, counts, workers, seed, chunk_size, mode, distributions)
+
+    inserted = {}
+    id_ranges = {}
+    for stage in GARDEN_POPULATE_STAGES:
+        for table in stage:
+            id_ranges[table] = IdRanges()
+            inserted[table] = populate_shard(database, table, counts[table], chunk_size, mode, seed,
+                                             parent_ids=id_ranges, id_ranges=id_ranges[table],
+                                             block_rows=GENERATION_BLOCK_ROWS, distributions=distributions)
+    return inserted
 
 
 def show_database_info(database='garden'):
@@ -688,18 +2260,9 @@ def show_database_info(database='garden'):
     database : str, optional
         Имя базы данных. По умолчанию используется база данных 'garden'.
     '''
-    host = 'localhost'
-    user = 'admin'
-    password = 'root'
-
     try:
         # Подключение к базе данных
-        with mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database
-        ) as conn:
+        with connect(database) as conn:
             if conn.is_connected():
                 with conn.cursor() as cursor:
                     # Получение списка таблиц в базе данных
@@ -725,7 +2288,7 @@ def show_database_info(database='garden'):
                             print(row)
                         print("\n")
 
-    except mysql.connector.Error as e:
+    except Error as e:
         print(f"Error: '{e}'")
 
 
@@ -780,20 +2343,372 @@ def drop_tables(db_name='garden'):
                         try:
                             cursor.execute(drop_table_query.format(table))
                             print(f"Table '{table}' dropped successfully")
-                        except mysql.connector.Error as e:
+                        except Error as e:
                             print(f"Error dropping table '{table}': {e}")
 
                     # Включаем проверку внешних ключей обратно
                     cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
 
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(db_name)
+
+
+def backup_query(table, key_ranges=None):
+    """
+    Возвращает запрос, читающий таблицу или её часть для бэкапа.
+
+    Параметры:
+    -----------
+    table : str
+        Имя таблицы.
+    key_ranges : dict, optional
+        Части таблиц (столбец ключа, первое значение, последнее значение) или списки таких частей
+        по именам таблиц. По умолчанию таблица читается целиком.
+    """
+    query = f"SELECT * FROM {table}"
+    ranges = (key_ranges or {}).get(table)
+    if ranges:
+        if isinstance(ranges, tuple):
+            ranges = [ranges]
+        query += " WHERE " + " OR ".join(f"{key} BETWEEN {int(low)} AND {int(high)}" for key, low, high in ranges)
+    return query
+
+
+def write_text_backup(cursor, path, tables, codec=DEFAULT_BACKUP_CODEC, level=None, fetch_size=BACKUP_FETCH_SIZE,
+                      key_ranges=None):
+    """
+    Записывает таблицы в текстовый бэкап: заголовок '-- Table: <имя>' и по строке на каждую строку таблицы
+    (см. row_codec.encode_row).
+
+    Параметры:
+    -----------
+    cursor : курсор базы данных
+        Курсор, через который читаются таблицы.
+    path : str
+        Путь к файлу бэкапа.
+    tables : list of str
+        Имена таблиц.
+    codec : str, optional
+        Способ сжатия из BACKUP_CODECS. По умолчанию DEFAULT_BACKUP_CODEC.
+    level : int, optional
+        Уровень сжатия. По умолчанию уровень способа сжатия.
+    fetch_size : int, optional
+        Количество строк в одной порции. По умолчанию BACKUP_FETCH_SIZE.
+    key_ranges : dict, optional
+        Части таблиц по именам таблиц (см. backup_query). По умолчанию таблицы записываются целиком.
+
+    Возвращает:
+    --------
+    dict
+        Количество строк (rows) и байт несжатых данных (bytes) по таблицам.
+    """
+    written = {}
+    with open_backup(path, 'wt', codec, level) as f:
+        for table in tables:
+            cursor.execute(backup_query(table, key_ranges))
+            header = f"-- Table: {table}\n"
+            f.write(header)
+            rows_count, data_bytes = 0, len(header)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                block = ''.join([encode_row(row) + '\n' for row in rows])
+                f.write(block)
+                rows_count += len(rows)
+                data_bytes += len(block.encode('utf-8'))
+            f.write('\n')
+            written[table] = {'rows': rows_count, 'bytes': data_bytes + 1}
+    return written
+
+
+def write_binary_backup(cursor, path, tables, codec=DEFAULT_BACKUP_CODEC, level=None, fetch_size=BACKUP_FETCH_SIZE,
+                        key_ranges=None):
+    """
+    Записывает таблицы в двоичный бэкап (см. backup_format.BackupWriter): каждая порция
+    из fetch_size строк становится отдельным блоком.
+
+    Параметры и возвращаемое значение совпадают с write_text_backup(); bytes - размер
+    несжатых данных блоков.
+    """
+    with open(path, 'wb') as f:
+        writer = BackupWriter(f, codec, level)
+        for table in tables:
+            cursor.execute(backup_query(table, key_ranges))
+            writer.begin_table(table, [col[0] for col in cursor.description])
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                writer.write_block(rows)
+        writer.close()
+    return {table['name']: {'rows': table['rows'], 'bytes': table['bytes']} for table in writer.tables}
+
+
+def backup_manifest_path(backup_file_path):
+    """
+    Возвращает путь к манифесту бэкапа: <имя бэкапа>.manifest.json.
+    """
+    extensions = [BINARY_BACKUP_EXTENSION] + [extension for extension, _ in BACKUP_CODECS.values()]
+    for extension in sorted(extensions, key=len, reverse=True):
+        if backup_file_path.endswith(extension):
+            return backup_file_path[:-len(extension)] + '.manifest.json'
+    return backup_file_path + '.manifest.json'
 
 
-def create_backup(host='localhost', user='admin', password='root', database='garden', backup_path='./backups'):
+def load_backup_manifest(backup_file_path):
+    """
+    Читает манифест бэкапа.
+
+    Параметры:
+    -----------
+    backup_file_path : str
+        Путь к файлу бэкапа.
+
+    Возвращает:
+    --------
+    dict or None
+        Манифест или None, если бэкап создан без манифеста.
+    """
+    path = backup_manifest_path(backup_file_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def table_chunks(cursor, table, chunk_rows=BACKUP_CHUNK_ROWS):
+    """
+    Считает количество строк и сумму CRC32 строк (см. backend.row_checksum) для каждого диапазона
+    первичного ключа [k * chunk_rows, (k + 1) * chunk_rows - 1] одним запросом с группировкой.
+
+    Параметры:
+    -----------
+    cursor : курсор базы данных
+        Курсор базы данных.
+    table : str
+        Имя таблицы.
+    chunk_rows : int, optional
+        Длина диапазона ключа. По умолчанию BACKUP_CHUNK_ROWS.
+
+    Возвращает:
+    --------
+    dict or None
+        Столбец ключа (key) и список [начало диапазона, количество строк, сумма] (chunks) по непустым
+        диапазонам или None, если первичный ключ таблицы не один целочисленный столбец.
+    """
+    backend = get_backend()
+    key = backend.primary_key(cursor, table)
+    if len(key) != 1:
+        return None
+    key = key[0]
+    cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+    columns = [col[0] for col in cursor.description]
+    cursor.fetchall()
+    cursor.execute(f"SELECT {key} - {key} % {int(chunk_rows)} AS chunk, COUNT(*), SUM({backend.row_checksum(columns)}) "
+                   f"FROM {table} GROUP BY chunk ORDER BY chunk")
+    rows = cursor.fetchall()
+    if rows and not isinstance(rows[0][0], int):
+        return None
+    # В MySQL SUM() возвращает Decimal
+    return {'key': key, 'chunks': [[start, count, int(checksum)] for start, count, checksum in rows]}
+
+
+def plan_backup(cursor, tables, chunk_rows=None, base=None):
+    """
+    Считает контрольные суммы диапазонов ключа таблиц и, если задан базовый бэкап, выбирает
+    диапазоны, которые нужно сохранить в инкрементальном бэкапе.
+
+    Параметры:
+    -----------
+    cursor : курсор базы данных
+        Курсор, читающий снимок базы данных.
+    tables : list of str
+        Имена таблиц.
+    chunk_rows : int, optional
+        Длина диапазона ключа (см. table_chunks). По умолчанию суммы не считаются.
+    base : dict, optional
+        Манифест базового бэкапа с контрольными суммами, записанными с тем же chunk_rows.
+
+    Возвращает:
+    --------
+    tuple
+        - chunks: dict - результат table_chunks() по таблицам или None, если chunk_rows не задан;
+        - key_ranges: dict - сохраняемые части таблиц (см. backup_query), соседние диапазоны объединены;
+          таблицы, которых нет в словаре, сохраняются целиком;
+        - changed: dict or None - начала изменённых диапазонов, включая ставшие пустыми, по таблицам;
+          None для таблицы, сохраняемой целиком. None, если base не задан.
+    """
+    if not chunk_rows:
+        return None, {}, None
+    chunks, key_ranges = {}, {}
+    changed = {} if base is not None else None
+    for table in tables:
+        chunks[table] = info = table_chunks(cursor, table, chunk_rows)
+        if base is None:
+            continue
+        previous = base['chunks'].get(table)
+        if info is None or previous is None or previous['key'] != info['key']:
+            changed[table] = None
+            continue
+        current = {start: (count, checksum) for start, count, checksum in info['chunks']}
+        previous = {start: (count, checksum) for start, count, checksum in previous['chunks']}
+        starts = sorted(start for start in current.keys() | previous.keys() if current.get(start) != previous.get(start))
+        changed[table] = starts
+        ranges = []
+        for start in starts:
+            if start not in current:
+                continue
+            if ranges and ranges[-1][2] == start - 1:
+                ranges[-1] = (info['key'], ranges[-1][1], start + chunk_rows - 1)
+            else:
+                ranges.append((info['key'], start, start + chunk_rows - 1))
+        key_ranges[table] = ranges
+    return chunks, key_ranges, changed
+
+
+def write_snapshot_backup(database, connect_kwargs, path, tables, workers, codec=DEFAULT_BACKUP_CODEC, level=None,
+                          fetch_size=BACKUP_FETCH_SIZE, binary=False, split_rows=COPY_SPLIT_ROWS, chunk_rows=None,
+                          base=None):
+    """
+    Записывает бэкап несколькими соединениями, читающими один согласованный снимок базы данных.
+
+    Управляющее соединение останавливает запись (backend.lock_for_snapshot), каждое из workers
+    читающих соединений начинает транзакцию со снимком данных, после чего запись снова разрешается.
+    Большие таблицы делятся на части по первичному ключу (см. table_key_ranges), каждая часть
+    записывается потоком в отдельный файл, а затем части объединяются в файл бэкапа в порядке tables.
+    Инкрементальный бэкап записывает части из плана plan_backup().
+
+    Параметры:
+    -----------
+    database : str
+        Имя базы данных.
+    connect_kwargs : dict
+        Параметры подключения для connect().
+    path : str
+        Путь к файлу бэкапа.
+    tables : list of str
+        Имена таблиц.
+    workers : int
+        Количество читающих соединений.
+    codec, level, fetch_size
+        См. write_text_backup().
+    binary : bool, optional
+        Записать двоичный бэкап (см. write_binary_backup). По умолчанию False.
+    split_rows : int, optional
+        Минимальная длина диапазона ключа, начиная с которой таблица делится. По умолчанию COPY_SPLIT_ROWS.
+    chunk_rows, base
+        См. plan_backup().
+
+    Возвращает:
+    --------
+    tuple
+        Количество строк (rows) и байт несжатых данных (bytes) по таблицам, контрольные суммы частей
+        и изменённые части таблиц (см. plan_backup).
+
+    Замечания:
+    --------
+    В MySQL остановка записи выполняется командой FLUSH TABLES WITH READ LOCK и требует привилегии
+    RELOAD; снимок согласован только для таблиц InnoDB. Запись останавливается лишь на время,
+    пока читатели начинают транзакции.
+    """
+    backend = get_backend()
+    write_backup = write_binary_backup if binary else write_text_backup
+    extension = BINARY_BACKUP_EXTENSION if binary else BACKUP_CODECS[codec][0]
+    parts_dir = tempfile.mkdtemp(prefix='.parts_', dir=os.path.dirname(path) or '.')
+    readers = queue.Queue()
+    connections = []
+    try:
+        for _ in range(workers):
+            connections.append(connect(database, **connect_kwargs))
+        with connect(database, **connect_kwargs) as control:
+            with control.cursor() as cursor:
+                backend.lock_for_snapshot(cursor)
+                try:
+                    for conn in connections:
+                        with conn.cursor() as reader_cursor:
+                            backend.start_snapshot(reader_cursor)
+                        readers.put(conn)
+                finally:
+                    backend.unlock_after_snapshot(cursor)
+
+        # План и деление таблиц на части считаются по снимку одного из читателей
+        conn = readers.get()
+        try:
+            with conn.cursor() as cursor:
+                chunks, key_ranges, changed = plan_backup(cursor, tables, chunk_rows, base)
+                tasks = []
+                for table in tables:
+                    if table in key_ranges:
+                        tasks.extend((table, key_range) for key_range in key_ranges[table])
+                    else:
+                        tasks.extend((table, key_range)
+                                     for key_range in table_key_ranges(cursor, table, workers, split_rows))
+        finally:
+            readers.put(conn)
+
+        def write_part(number, table, key_range):
+            # Соединение берётся из очереди: потоков столько же, сколько соединений
+            conn = readers.get()
+            try:
+                part_path = os.path.join(parts_dir, f'{number:05d}{extension}')
+                with conn.cursor(buffered=False) as reader_cursor:
+                    written = write_backup(reader_cursor, part_path, [table], codec, level, fetch_size,
+                                           {table: key_range} if key_range else None)
+                return part_path, written[table]
+            finally:
+                readers.put(conn)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(write_part, number, table, key_range)
+                       for number, (table, key_range) in enumerate(tasks)]
+            parts = [(table,) + future.result() for (table, _), future in zip(tasks, futures)]
+
+        written = {}
+        with open(path, 'wb') as f:
+            if binary:
+                writer = BackupWriter(f, codec, level)
+                for table, part_path, _ in parts:
+                    with BackupReader(part_path) as reader:
+                        writer.append_from(reader, table)
+                writer.close()
+                written = {table['name']: {'rows': table['rows'], 'bytes': table['bytes']} for table in writer.tables}
+            else:
+                # Сжатые части склеиваются побайтно: gzip, xz и bz2 читают последовательность потоков,
+                # а повторный заголовок таблицы продолжает её строки (см. iter_backup_batches)
+                for table, part_path, part_info in parts:
+                    with open(part_path, 'rb') as part:
+                        shutil.copyfileobj(part, f)
+                    info = written.setdefault(table, {'rows': 0, 'bytes': 0})
+                    info['rows'] += part_info['rows']
+                    info['bytes'] += part_info['bytes']
+        return written, chunks, changed
+    finally:
+        for conn in connections:
+            conn.close()
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def create_backup(host='localhost', user='admin', password='root', database='garden', backup_path='./backups',
+                  codec=DEFAULT_BACKUP_CODEC, level=None, fetch_size=BACKUP_FETCH_SIZE, backup_format='text',
+                  workers=None, split_rows=COPY_SPLIT_ROWS, base=None, chunk_rows=BACKUP_CHUNK_ROWS):
     """
     Создает бэкап базы данных MySQL.
 
+    Все таблицы читаются в одной транзакции со снимком данных, поэтому бэкап согласован, даже если
+    в базу в это время пишут. Строки читаются небуферизованным курсором порциями по fetch_size и сразу
+    записываются в сжатый файл, поэтому память не зависит от размера таблиц. Рядом с бэкапом
+    сохраняется манифест <имя бэкапа>.manifest.json с количеством строк и размером данных по таблицам,
+    временем создания, скоростью и пиковой памятью процесса.
+
+    В манифест также записываются контрольные суммы диапазонов первичного ключа длиной chunk_rows
+    (см. table_chunks). Если задан base, бэкап инкрементальный: в него попадают только диапазоны,
+    суммы которых отличаются от сумм в манифесте base, включая новые строки после последнего ключа,
+    а в манифесте перечисляются изменённые диапазоны (changed). Если base - полный бэкап, получается
+    дифференциальный бэкап, если предыдущий инкрементальный - цепочка инкрементальных.
+    restore_backup() восстанавливает цепочку целиком.
+
     Параметры:
     -----------
     host : str, optional
@@ -806,48 +2721,390 @@ def create_backup(host='localhost', user='admin', password='root', database='gar
         Имя базы данных для создания бэкапа. По умолчанию 'garden'.
     backup_path : str, optional
         Путь для сохранения бэкапа. По умолчанию './backups'.
+    codec : str, optional
+        Способ сжатия из BACKUP_CODECS: 'none', 'gzip', 'lzma' или 'bz2'. По умолчанию DEFAULT_BACKUP_CODEC.
+    level : int, optional
+        Уровень сжатия. По умолчанию уровень способа сжатия.
+    fetch_size : int, optional
+        Количество строк в одной порции. По умолчанию BACKUP_FETCH_SIZE.
+    backup_format : str, optional
+        Формат из BACKUP_FORMATS. В формате 'binary' каждая порция записывается отдельным блоком,
+        сжатым codec, а в конце файла сохраняется индекс блоков (см. backup_format.BackupWriter).
+        По умолчанию 'text'.
+    workers : int, optional
+        Количество соединений, параллельно читающих общий снимок данных (см. write_snapshot_backup).
+        По умолчанию таблицы читаются одним соединением.
+    split_rows : int, optional
+        При параллельном чтении - минимальная длина диапазона ключа, начиная с которой таблица
+        делится на части. По умолчанию COPY_SPLIT_ROWS.
+    base : str, optional
+        Путь к предыдущему бэкапу, относительно которого создаётся инкрементальный бэкап.
+        По умолчанию создаётся полный бэкап.
+    chunk_rows : int, optional
+        Длина диапазона ключа для контрольных сумм. None - суммы не считаются, такой бэкап нельзя
+        использовать как base. С base используется длина из его манифеста. По умолчанию BACKUP_CHUNK_ROWS.
+
+    Возвращает:
+    --------
+    str or None
+        Путь к файлу бэкапа или None в случае ошибки.
     """
+    if codec not in BACKUP_CODECS:
+        raise ValueError(f"Unknown backup codec '{codec}', expected one of {tuple(BACKUP_CODECS)}")
+    if backup_format not in BACKUP_FORMATS:
+        raise ValueError(f"Unknown backup format '{backup_format}', expected one of {BACKUP_FORMATS}")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    base_manifest = None
+    if base is not None:
+        base_manifest = load_backup_manifest(base)
+        if not base_manifest or not base_manifest.get('chunks'):
+            raise ValueError(f"Backup '{base}' has no chunk checksums and cannot be the base of an incremental backup")
+        chunk_rows = base_manifest['chunk_rows']
+    binary = backup_format == 'binary'
+    connect_kwargs = {
+        'host': host,
+        'user': user,
+        'password': password,
+        'charset': 'utf8mb4',  # Установим кодировку UTF-8
+        'collation': 'utf8mb4_unicode_ci',
+    }
     try:
         # Создаем путь для сохранения бэкапа
         os.makedirs(backup_path, exist_ok=True)
 
         # Генерируем имя файла бэкапа на основе текущей даты и времени
         timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        backup_file = f'{database}_backup_{timestamp}.sql'
-        backup_file_path = os.path.join(backup_path, backup_file)
+        backup_name = f'{database}_backup_{timestamp}' + ('_incremental' if base else '')
+        extension = BINARY_BACKUP_EXTENSION if binary else BACKUP_CODECS[codec][0]
+        # Бэкапы, созданные в одну секунду (например, полный и инкрементальный), получают номер
+        name, number = backup_name, 1
+        while os.path.exists(os.path.join(backup_path, backup_name + extension)):
+            backup_name = f'{name}_{number}'
+            number += 1
+        backup_file_path = os.path.join(backup_path, backup_name + extension)
+        started = time.perf_counter()
+        tables = {}
 
         # Устанавливаем соединение с базой данных
-        with mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database,
-                charset='utf8mb4',  # Установим кодировку UTF-8
-                collation='utf8mb4_unicode_ci'
-        ) as connection:
+        with connect(database, **connect_kwargs) as connection:
             if connection.is_connected():
-                with connection.cursor() as cursor:
-                    # Открываем файл для записи бэкапа
-                    with open(backup_file_path, 'w', encoding='utf-8') as f:
-                        for table in ['fertilizers', 'crops', 'employees', 'gardens', 'actions', 'beds', 'garden_employees']:
-                            # Получаем данные из таблицы и записываем их в файл
-                            cursor.execute(f"SELECT * FROM {table}")
-                            rows = cursor.fetchall()
-                            f.write(f"-- Table: {table}\n")
-                            for row in rows:
-                                f.write(str(row) + '\n')
-                            f.write('\n')
-
-                    print(f'Backup created successfully: {backup_file_path}')
+                if workers:
+                    written, chunks, changed = write_snapshot_backup(
+                        database, connect_kwargs, backup_file_path, BACKUP_TABLES, workers, codec, level, fetch_size,
+                        binary, split_rows, chunk_rows, base_manifest)
+                else:
+                    # Небуферизованный курсор получает строки с сервера по мере чтения
+                    with connection.cursor(buffered=False) as cursor:
+                        get_backend().start_snapshot(cursor)
+                        chunks, key_ranges, changed = plan_backup(cursor, BACKUP_TABLES, chunk_rows, base_manifest)
+                        # Таблицы без изменённых диапазонов в инкрементальный бэкап не записываются
+                        dumped = [table for table in BACKUP_TABLES if key_ranges.get(table, True)]
+                        write_backup = write_binary_backup if binary else write_text_backup
+                        written = write_backup(cursor, backup_file_path, dumped, codec, level, fetch_size, key_ranges)
+                    connection.rollback()
+                tables = {table: written.get(table, {'rows': 0, 'bytes': 0}) for table in BACKUP_TABLES}
+
+                elapsed = time.perf_counter() - started
+                total_rows = sum(info['rows'] for info in tables.values())
+                total_bytes = sum(info['bytes'] for info in tables.values())
+                manifest = {
+                    'database': database,
+                    'created': timestamp,
+                    'file': os.path.basename(backup_file_path),
+                    'format': backup_format,
+                    'codec': codec,
+                    'level': level,
+                    'workers': workers,
+                    'tables': tables,
+                    'rows': total_rows,
+                    'bytes': total_bytes,
+                    'compressed_bytes': os.path.getsize(backup_file_path),
+                    'seconds': round(elapsed, 3),
+                    'peak_rss_bytes': peak_rss_bytes(),
+                    'type': 'incremental' if base else 'full',
+                    # Путь к базовому бэкапу относительно каталога этого бэкапа
+                    'base': os.path.relpath(base, backup_path) if base else None,
+                    'chunk_rows': chunk_rows if chunks is not None else None,
+                    'chunks': chunks,
+                    'changed': changed,
+                }
+                with open(os.path.join(backup_path, backup_name + '.manifest.json'), 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+                rss = manifest['peak_rss_bytes']
+                print(f"{'Incremental backup' if base else 'Backup'} created successfully: {backup_file_path}")
+                print(f"{total_rows} rows, {total_bytes / 2 ** 20:.1f} MB -> {manifest['compressed_bytes'] / 2 ** 20:.1f} MB "
+                      f"in {elapsed:.2f} s ({total_rows / elapsed if elapsed else 0:.0f} rows/s, "
+                      f"{total_bytes / 2 ** 20 / elapsed if elapsed else 0:.1f} MB/s), "
+                      f"peak RSS {'unknown' if rss is None else f'{rss / 2 ** 20:.1f} MB'}")
+                return backup_file_path
 
     except Error as e:
         print(f'Error creating backup: {e}')
+    return None
+
+
+def iter_backup_batches(backup_file_path, table, batch_rows=RESTORE_BATCH_ROWS, id_range=None):
+    '''
+    Потоково читает строки таблицы из бэкапа порциями по batch_rows.
+
+    Параметры:
+    -----------
+    backup_file_path : str
+        Путь к файлу бэкапа.
+    table : str
+        Имя таблицы.
+    batch_rows : int, optional
+        Количество строк в порции. По умолчанию RESTORE_BATCH_ROWS.
+    id_range : tuple, optional
+        Только для двоичного бэкапа: диапазон идентификаторов (первый, последний) включительно.
+        Блоки вне диапазона не читаются (см. backup_format.BackupReader).
+
+    Возвращает:
+    --------
+    iterator of lists
+        Порции строк - кортежей значений.
+    '''
+    batch = []
+    if is_binary_backup(backup_file_path):
+        with BackupReader(backup_file_path) as reader:
+            if table not in reader.tables:
+                return
+            for rows in reader.read_rows(table, id_range):
+                batch.extend(rows)
+                while len(batch) >= batch_rows:
+                    yield batch[:batch_rows]
+                    batch = batch[batch_rows:]
+    else:
+        current = None
+        # Файл читается по строкам и распаковывается по мере чтения
+        with open_backup(backup_file_path) as backup_file:
+            for line in backup_file:
+                if line.startswith('-- Table: '):
+                    name = line[len('-- Table: '):].strip()
+                    # Бэкап, записанный частями, повторяет заголовок таблицы перед каждой частью
+                    if current == table and name != table:
+                        break
+                    current = name
+                elif current == table and line.startswith('('):
+                    batch.append(decode_row(line))
+                    if len(batch) >= batch_rows:
+                        yield batch
+                        batch = []
+    if batch:
+        yield batch
+
+
+def restore_table(backup_file_path, table, target_database, connect_kwargs=None, id_range=None,
+                  batch_rows=RESTORE_BATCH_ROWS, checkpoint=None, done=None):
+    '''
+    Восстанавливает таблицу из бэкапа через собственное соединение. Каждая порция строк
+    вставляется многострочными запросами и подтверждается, после чего в checkpoint
+    записывается количество восстановленных порций.
+
+    Параметры:
+    -----------
+    backup_file_path : str
+        Путь к файлу бэкапа.
+    table : str
+        Имя таблицы.
+    target_database : str
+        Имя целевой базы данных.
+    connect_kwargs : dict, optional
+        Параметры подключения (host, user, password). По умолчанию параметры бэкенда.
+    id_range : tuple, optional
+        Диапазон идентификаторов для двоичного бэкапа (см. iter_backup_batches).
+    batch_rows : int, optional
+        Количество строк в порции. По умолчанию RESTORE_BATCH_ROWS.
+    checkpoint : RestoreCheckpoint, optional
+        Файл контрольных точек. По умолчанию контрольные точки не записываются.
+    done : dict, optional
+        Состояние таблицы из checkpoint.load(): уже восстановленные порции пропускаются.
+
+    Возвращает:
+    --------
+    int
+        Количество строк таблицы, восстановленных с начала, включая восстановленные до прерывания.
+    '''
+    done = done or {'batches': 0, 'rows': 0}
+    batches, total = done['batches'], done['rows']
+    started = time.perf_counter()
+    restored = 0
+    conn = connect(target_database, **(connect_kwargs or {}))
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+            columns = [col[0] for col in cursor.description]
+            cursor.fetchall()
+            # Порция, вставленная до прерывания, но не отмеченная в checkpoint, вставляется повторно без ошибок
+            inserter = BulkInserter(cursor, table, columns, ignore_duplicates=True)
+            for number, batch in enumerate(iter_backup_batches(backup_file_path, table, batch_rows, id_range)):
+                if number < batches:
+                    continue
+                inserter.extend(batch)
+                inserter.flush()
+                conn.commit()
+                batches, total, restored = number + 1, total + len(batch), restored + len(batch)
+                if checkpoint is not None:
+                    checkpoint.record(table, batches, total)
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+    if checkpoint is not None:
+        checkpoint.record(table, batches, total, done=True)
+    elapsed = time.perf_counter() - started
+    print(f"Table {table}: {restored} rows restored in {elapsed:.2f} s "
+          f"({restored / elapsed if elapsed else 0:.0f} rows/s)"
+          + (f", {total - restored} rows restored before" if total > restored else ''))
+    return total
+
+
+def backup_chain(backup_file_path):
+    """
+    Возвращает цепочку бэкапов от полного до указанного по полям base манифестов.
+
+    Параметры:
+    -----------
+    backup_file_path : str
+        Путь к файлу бэкапа.
+
+    Возвращает:
+    --------
+    list of tuple
+        Пары (путь к бэкапу, манифест или None); первый бэкап полный.
+    """
+    chain = []
+    path = backup_file_path
+    while True:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Backup '{path}' not found")
+        if any(os.path.samefile(path, seen) for seen, _ in chain):
+            raise ValueError(f"Backup '{path}' refers to itself through its base backups")
+        manifest = load_backup_manifest(path)
+        chain.append((path, manifest))
+        if manifest is None or not manifest.get('base'):
+            break
+        path = os.path.join(os.path.dirname(path), manifest['base'])
+    chain.reverse()
+    return chain
+
+
+def apply_incremental_backup(backup_file_path, manifest, target_database, connect_kwargs=None, tables=None,
+                             batch_rows=RESTORE_BATCH_ROWS):
+    """
+    Применяет инкрементальный бэкап к базе данных, восстановленной из его базового бэкапа.
+
+    Строки изменённых диапазонов вставляются с заменой существующих (родительские таблицы первыми),
+    затем из этих диапазонов удаляются строки, которых нет в бэкапе (дочерние таблицы первыми),
+    поэтому внешние ключи не нарушаются. Таблицы, сохранённые целиком, очищаются перед вставкой.
+
+    Параметры:
+    -----------
+    backup_file_path : str
+        Путь к файлу инкрементального бэкапа.
+    manifest : dict
+        Манифест бэкапа.
+    target_database : str
+        Имя целевой базы данных.
+    connect_kwargs : dict, optional
+        Параметры подключения (host, user, password). По умолчанию параметры бэкенда.
+    tables : list of str, optional
+        Применяемые таблицы. По умолчанию все таблицы бэкапа.
+    batch_rows : int, optional
+        Количество строк в порции. По умолчанию RESTORE_BATCH_ROWS.
 
+    Возвращает:
+    --------
+    dict
+        Количество записанных строк по таблицам.
 
-def restore_backup(backup_file_path, host='localhost', user='admin', password='root', target_database='garden_backup_test'):
+    Замечания:
+    --------
+    Повторное применение бэкапа даёт тот же результат, поэтому прерванное применение
+    повторяется с начала без контрольных точек.
+    """
+    chunk_rows = manifest['chunk_rows']
+    changed = manifest['changed']
+    started = time.perf_counter()
+    written, deleted = {}, {}
+    conn = connect(target_database, **(connect_kwargs or {}))
+    try:
+        cursor = conn.cursor()
+        try:
+            stages = dependency_stages([table for table in manifest['tables'] if tables is None or table in tables],
+                                       get_backend().foreign_keys(cursor))
+            order = [table for stage in stages for table in stage]
+            for table in reversed(order):
+                if changed.get(table, []) is None:
+                    cursor.execute(f"DELETE FROM {table}")
+            conn.commit()
+
+            kept = {}
+            for table in order:
+                if changed.get(table) == []:
+                    continue
+                cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+                columns = [col[0] for col in cursor.description]
+                cursor.fetchall()
+                key = manifest['chunks'][table]['key'] if changed.get(table) is not None else None
+                position = columns.index(key) if key else None
+                kept[table] = ids = set()
+                inserter = BulkInserter(cursor, table, columns, update_duplicates=True)
+                written[table] = 0
+                for batch in iter_backup_batches(backup_file_path, table, batch_rows):
+                    inserter.extend(batch)
+                    inserter.flush()
+                    conn.commit()
+                    written[table] += len(batch)
+                    if position is not None:
+                        ids.update(row[position] for row in batch)
+
+            for table in reversed(order):
+                if not changed.get(table):
+                    continue
+                key = manifest['chunks'][table]['key']
+                deleted[table] = 0
+                for start in changed[table]:
+                    cursor.execute(f"SELECT {key} FROM {table} WHERE {key} BETWEEN {int(start)} "
+                                   f"AND {int(start) + chunk_rows - 1}")
+                    stale = [row[0] for row in cursor.fetchall() if row[0] not in kept[table]]
+                    for first in range(0, len(stale), BULK_MAX_ROWS):
+                        ids = ', '.join(str(int(value)) for value in stale[first:first + BULK_MAX_ROWS])
+                        cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({ids})")
+                    deleted[table] += len(stale)
+                conn.commit()
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+        # Строки изменённых таблиц могли быть удалены и при прерванном применении
+        for table in manifest['tables']:
+            if tables is None or table in tables:
+                parent_keys.invalidate(target_database, table)
+    elapsed = time.perf_counter() - started
+    print(f"Incremental backup {backup_file_path} applied in {elapsed:.2f} s: {sum(written.values())} rows written, "
+          f"{sum(deleted.values())} rows deleted")
+    return written
+
+
+def restore_backup(backup_file_path, host='localhost', user='admin', password='root', target_database='garden_backup_test',
+                   tables=None, id_range=None, workers=None, batch_rows=RESTORE_BATCH_ROWS, resume=True):
     '''
     Восстанавливает базу данных из указанного файла бэкапа.
 
+    Таблицы восстанавливаются по этапам внешних ключей целевой базы данных (см. dependency_stages):
+    таблицы одного этапа - параллельно, каждая в своём процессе и через своё соединение (см. restore_table).
+    Бэкап читается потоково, строки вставляются порциями по batch_rows. Рядом с бэкапом ведётся
+    файл контрольных точек <бэкап>.<target_database>.checkpoint; если восстановление прервалось,
+    следующий вызов с теми же параметрами продолжает его со следующей порции. После успешного
+    восстановления файл удаляется.
+
+    Для инкрементального бэкапа восстанавливается полный бэкап его цепочки (см. backup_chain),
+    после чего по порядку применяются инкрементальные (см. apply_incremental_backup).
+
     Параметры:
     -----------
     backup_file_path : str
@@ -860,49 +3117,215 @@ def restore_backup(backup_file_path, host='localhost', user='admin', password='r
         Пароль пользователя для подключения к базе данных. По умолчанию 'root'.
     target_database : str, optional
         Имя целевой базы данных для восстановления. По умолчанию 'garden_backup_test'.
+    tables : list of str, optional
+        Восстанавливаемые таблицы. По умолчанию все таблицы целевой базы данных.
+    id_range : tuple, optional
+        Только для двоичного бэкапа: диапазон идентификаторов (первый, последний) включительно.
+        По умолчанию все строки.
+    workers : int, optional
+        Количество рабочих процессов. По умолчанию None - таблицы восстанавливаются по очереди.
+    batch_rows : int, optional
+        Количество строк в порции. По умолчанию RESTORE_BATCH_ROWS.
+    resume : bool, optional
+        Продолжить прерванное восстановление по контрольным точкам. При False контрольные точки
+        сбрасываются. По умолчанию True.
+
+    Возвращает:
+    --------
+    dict
+        Количество восстановленных строк по таблицам.
+
+    Замечания:
+    --------
+    Текстовый бэкап не имеет индекса, поэтому каждая таблица ищется в нём отдельным проходом по файлу.
     '''
+    chain = backup_chain(backup_file_path)
+    if id_range is not None and len(chain) > 1:
+        raise ValueError("id_range is not supported for incremental backups")
+    # Полный бэкап цепочки, с которого начинается восстановление
+    backup_file_path = chain[0][0]
+    binary = is_binary_backup(backup_file_path)
+    if id_range is not None and not binary:
+        raise ValueError("id_range is supported only for binary backups")
+    connect_kwargs = {'host': host, 'user': user, 'password': password}
+    checkpoint = RestoreCheckpoint(f"{backup_file_path}.{target_database}.checkpoint",
+                                   {'batch_rows': batch_rows, 'id_range': id_range})
+    if not resume:
+        checkpoint.remove()
+    state = checkpoint.load()
+    checkpoint.start()
+
+    started = time.perf_counter()
+    restored = {}
     try:
         # Подключение к MySQL
-        connection = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=target_database  # Используем целевую базу данных для восстановления
-        )
-
-        if connection.is_connected():
+        with connect(target_database, **connect_kwargs) as connection:
             cursor = connection.cursor()
+            try:
+                if binary:
+                    with BackupReader(backup_file_path) as reader:
+                        available = list(reader.tables)
+                else:
+                    cursor.execute("SHOW TABLES")
+                    available = [table[0] for table in cursor.fetchall()]
+                stages = dependency_stages([table for table in available if tables is None or table in tables],
+                                           get_backend().foreign_keys(cursor))
+            finally:
+                cursor.close()
+
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_populate_worker,
+                                       initargs=(get_backend(),)) if workers else None
+        try:
+            for stage in stages:
+                tasks = []
+                for table in stage:
+                    done = state.get(table)
+                    if done and done['done']:
+                        restored[table] = done['rows']
+                        print(f"Table {table}: already restored ({done['rows']} rows)")
+                        continue
+                    args = (backup_file_path, table, target_database, connect_kwargs, id_range, batch_rows,
+                            checkpoint, done)
+                    tasks.append((table, executor.submit(restore_table, *args) if executor else args))
+                # Этап завершается, когда восстановлены все его таблицы
+                for table, task in tasks:
+                    restored[table] = task.result() if executor else restore_table(*task)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        checkpoint.remove()
+        for path, manifest in chain[1:]:
+            for table, rows in apply_incremental_backup(path, manifest, target_database, connect_kwargs, tables,
+                                                        batch_rows).items():
+                restored[table] = restored.get(table, 0) + rows
+        elapsed = time.perf_counter() - started
+        total = sum(restored.values())
+        print(f'Backup restored successfully from: {chain[-1][0]} to database: {target_database}')
+        print(f"{total} rows in {elapsed:.2f} s ({total / elapsed if elapsed else 0:.0f} rows/s)")
 
-            # Чтение содержимого бэкапа
-            with open(backup_file_path, 'rb') as backup_file:
-                content = backup_file.read().decode('utf-8', errors='ignore')
+    except Error as e:
+        print(f'Error restoring backup: {e}')
+        print(f"Restore can be resumed from checkpoint '{checkpoint.path}'")
+    # Таблицы восстанавливаются в рабочих процессах, поэтому кэш сбрасывается здесь
+    parent_keys.invalidate(target_database)
+    return restored
 
-                # Разделение содержимого на отдельные блоки таблиц
-                table_blocks = content.split('-- Table: ')
 
-                for block in table_blocks[1:]:  # Начинаем с 1, чтобы пропустить первый пустой элемент
-                    lines = block.strip().splitlines()
+def verify_backup(backup_file_path, database=None, host='localhost', user='admin', password='root', deep=False):
+    """
+    Проверяет файл бэкапа без восстановления.
 
-                    table_name = lines[0].strip()  # Название таблицы
-                    values = [line.strip('()') for line in lines[1:] if line.startswith('(')]
+    Файл читается потоково: у двоичного бэкапа проверяются контрольные суммы блоков и количество строк
+    в блоках, индексе и манифесте без распаковки данных, у текстового - целостность сжатого потока
+    (контрольные суммы gzip, xz и bz2 проверяются при распаковке), формат строк и их количество
+    по таблицам. Память не зависит от размера бэкапа.
 
-                    # Вставка данных в таблицу
-                    if values:
-                        insert_query = f"INSERT INTO {table_name} VALUES ({'), ('.join(values)}) ON DUPLICATE KEY UPDATE id=id;"
-                        try:
-                            cursor.execute(insert_query)
-                        except mysql.connector.Error as e:
-                            print(f"Error executing SQL command: {e}")
+    Параметры:
+    -----------
+    backup_file_path : str
+        Путь к файлу бэкапа.
+    database : str, optional
+        Имя базы данных, с которой сравниваются контрольные суммы диапазонов ключа из манифеста
+        (см. table_chunks). По умолчанию база данных не читается.
+    host : str, optional
+        Хост базы данных. По умолчанию 'localhost'.
+    user : str, optional
+        Имя пользователя для подключения к базе данных. По умолчанию 'admin'.
+    password : str, optional
+        Пароль пользователя для подключения к базе данных. По умолчанию 'root'.
+    deep : bool, optional
+        Также распаковать и разобрать каждую строку (для текстового бэкапа - см. row_codec.decode_row).
+        По умолчанию False.
 
-            # Фиксация изменений и закрытие соединения
-            connection.commit()
-            cursor.close()
-            connection.close()
+    Возвращает:
+    --------
+    dict
+        Отчёт: ok - бэкап цел, errors - список ошибок, rows - количество строк по таблицам,
+        changed_chunks - начала диапазонов ключа, суммы которых в базе данных отличаются от сумм
+        в манифесте, по таблицам (None, если сравнение не выполнялось).
 
-            print(f'Backup restored successfully from: {backup_file_path} to database: {target_database}')
+    Замечания:
+    --------
+    Отличия от базы данных не считаются ошибками бэкапа: они показывают, какие диапазоны изменились
+    после его создания.
+    """
+    started = time.perf_counter()
+    manifest = load_backup_manifest(backup_file_path)
+    errors, rows = [], {}
+    size = os.path.getsize(backup_file_path)
+    if manifest is not None and manifest.get('compressed_bytes') not in (None, size):
+        errors.append(f"File size {size} differs from {manifest['compressed_bytes']} in the manifest")
+
+    # Количество строк сравнивается с манифестом, только если файл прочитан до конца
+    streamed = True
+    try:
+        if is_binary_backup(backup_file_path):
+            with BackupReader(backup_file_path) as reader:
+                for table, entry in reader.tables.items():
+                    rows[table] = 0
+                    for block in entry['blocks']:
+                        reader.verify_block(table, block, deep)
+                        rows[table] += block[1]
+                    if rows[table] != entry['rows']:
+                        errors.append(f"Table {table}: {rows[table]} rows in blocks, index says {entry['rows']}")
+        else:
+            table = None
+            with open_backup(backup_file_path) as backup_file:
+                for number, line in enumerate(backup_file, 1):
+                    if line.startswith('('):
+                        if table is None:
+                            raise BackupFormatError(f"Row before the first table header at line {number}")
+                        if deep:
+                            decode_row(line)
+                        elif not line.rstrip('\n').endswith(')'):
+                            raise BackupFormatError(f"Truncated row at line {number}")
+                        rows[table] += 1
+                    elif line.startswith('-- Table: '):
+                        table = line[len('-- Table: '):].strip()
+                        rows.setdefault(table, 0)
+                    elif line.strip():
+                        raise BackupFormatError(f"Unexpected line {number}: {line[:80]!r}")
+    except (BackupFormatError, *BACKUP_READ_ERRORS) as e:
+        errors.append(f"{type(e).__name__}: {e}")
+        streamed = False
+
+    if manifest is not None and streamed:
+        for table, info in manifest['tables'].items():
+            if rows.get(table, 0) != info['rows']:
+                errors.append(f"Table {table}: {rows.get(table, 0)} rows in the backup, manifest says {info['rows']}")
+
+    changed_chunks = None
+    if database is not None and manifest is not None and manifest.get('chunks'):
+        changed_chunks = {}
+        try:
+            with connect(database, host=host, user=user, password=password) as connection:
+                cursor = connection.cursor()
+                try:
+                    for table, info in manifest['chunks'].items():
+                        if info is None:
+                            continue
+                        live = table_chunks(cursor, table, manifest['chunk_rows']) or {'chunks': []}
+                        recorded = {start: (count, checksum) for start, count, checksum in info['chunks']}
+                        current = {start: (count, checksum) for start, count, checksum in live['chunks']}
+                        changed_chunks[table] = sorted(start for start in recorded.keys() | current.keys()
+                                                       if recorded.get(start) != current.get(start))
+                finally:
+                    cursor.close()
+        except Error as e:
+            print(f"Error: '{e}'")
+            changed_chunks = None
 
-    except mysql.connector.Error as e:
-        print(f'Error restoring backup: {e}')
+    elapsed = time.perf_counter() - started
+    print(f"Backup {backup_file_path}: {'OK' if not errors else f'{len(errors)} error(s)'}, "
+          f"{sum(rows.values())} rows, {size / 2 ** 20:.1f} MB read in {elapsed:.2f} s "
+          f"({size / 2 ** 20 / elapsed if elapsed else 0:.1f} MB/s)")
+    for error in errors:
+        print(f"  {error}")
+    if changed_chunks is not None:
+        differing = {table: starts for table, starts in changed_chunks.items() if starts}
+        print(f"  Chunks changed in database {database} since the backup: {differing or 'none'}")
+    return {'ok': not errors, 'errors': errors, 'rows': rows, 'changed_chunks': changed_chunks}
 
 
 def delete_from_gardens(database):
@@ -921,8 +3344,9 @@ def delete_from_gardens(database):
                     delete_query = "DELETE FROM gardens"
                     cursor.execute(delete_query)
                     print(f"{cursor.rowcount} rows deleted from gardens")
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(database, 'gardens')
 
 def delete_from_crops(database):
     '''
@@ -940,8 +3364,9 @@ def delete_from_crops(database):
                     delete_query = "DELETE FROM crops"
                     cursor.execute(delete_query)
                     print(f"{cursor.rowcount} rows deleted from crops")
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(database, 'crops')
 
 def delete_from_fertilizers(database):
     '''
@@ -959,8 +3384,9 @@ def delete_from_fertilizers(database):
                     delete_query = "DELETE FROM fertilizers"
                     cursor.execute(delete_query)
                     print(f"{cursor.rowcount} rows deleted from fertilizers")
-            except mysql.connector.Error as e:
+            except Error as e:
                 print(f"Error: '{e}'")
+    parent_keys.invalidate(database, 'fertilizers')
 
 
 if __name__ == '__main__':
@@ -974,5 +3400,6 @@ if __name__ == '__main__':
     # drop_tables(test_db_name)
     # create_garden_db(test_db_name)
     # restore_backup(backup_file_path='backups/garden_backup_2024-06-18_16-43-49.sql', target_database=test_db_name)
+    # verify_backup('backups/garden_backup_2024-06-18_16-43-49.sql.gz', database='garden')
     # show_database_info(test_db_name)
     pass
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Модуль: distributions
+
+Этот модуль предоставляет неравномерные распределения внешних ключей для генерации связующих таблиц:
+Zipf, нормальное распределение по номеру родителя и фиксированное количество потомков на родителя.
+Взвешенный выбор выполняется по таблице псевдонимов (метод Vose) за O(1) на значение.
+"""
+
+import math
+import random
+from array import array
+
+from lib.columnar import int_column
+from lib.id_ranges import IdRanges
+from lib.randomik import numpy_generator, python_rng
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него значения разыгрываются по одному
+    np = None
+
+
+# Распределения, которые понимает parent_sampler()
+DISTRIBUTIONS = ('uniform', 'zipf', 'normal', 'fanout')
+
+
+class AliasTable:
+    def __init__(self, weights):
+        """
+        Строит таблицу псевдонимов для выбора номера с заданными весами.
+
+        Параметры:
+        -----------
+        weights : sequence of float
+            Неотрицательные веса номеров 0..len(weights)-1; хотя бы один вес больше нуля.
+
+        Замечания:
+        --------
+        Построение занимает O(n), выбор одного номера - O(1): одно равномерное число выбирает ячейку,
+        второе - номер ячейки или её псевдоним.
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+        scaled = [weight * n / total for weight in weights]
+        self.prob = array('d', [1.0]) * n
+        self.alias = array('q', range(n))
+        small = [i for i, weight in enumerate(scaled) if weight < 1.0]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Остатки из-за погрешности округления получают вероятность 1
+        for i in small + large:
+            self.prob[i] = 1.0
+        if np is not None:
+            self._prob = np.frombuffer(self.prob, dtype=np.float64)
+            self._alias = np.frombuffer(self.alias, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.prob)
+
+    def draw(self, rng=random):
+        """
+        Выбирает один номер.
+
+        Параметры:
+        -----------
+        rng : random.Random, optional
+            Генератор случайных чисел. По умолчанию глобальный модуль random.
+        """
+        cell = rng.randrange(len(self.prob))
+        return cell if rng.random() < self.prob[cell] else self.alias[cell]
+
+    def draw_many(self, count, context=None, offset=0):
+        """
+        Выбирает count номеров.
+
+        Параметры:
+        -----------
+        count : int
+            Количество номеров.
+        context : GenerationContext, optional
+            Контекст генерации. По умолчанию глобальные генераторы.
+        offset : int, optional
+            Число, прибавляемое к каждому номеру. По умолчанию 0.
+
+        Возвращает:
+        --------
+        array.array
+            Номера (см. columnar.int_column).
+        """
+        if np is None:
+            rng = python_rng(context)
+            return int_column(self.draw(rng) + offset for _ in range(count))
+        generator = numpy_generator(context)
+        cells = generator.integers(0, len(self.prob), size=count)
+        chosen = np.where(generator.random(count) < self._prob[cells], cells, self._alias[cells])
+        column = int_column()
+        column.frombytes((chosen + offset).astype(np.int64).tobytes())
+        return column
+
+
+class WeightedSampler:
+    def __init__(self, ids, weights):
+        """
+        Инициализирует выбор идентификаторов родителей с весами.
+
+        Параметры:
+        -----------
+        ids : sequence of int
+            Идентификаторы родителей (например, IdRanges).
+        weights : sequence of float
+            Вес каждого идентификатора в порядке ids.
+        """
+        self.ids = ids
+        self.table = AliasTable(weights)
+
+    def draw(self, rng=random):
+        return self.ids[self.table.draw(rng)]
+
+    def draw_many(self, count, context=None):
+        ids = self.ids
+        if isinstance(ids, IdRanges) and len(ids.ranges) == 1:
+            # Сплошной отрезок: номер переводится в идентификатор сдвигом
+            return self.table.draw_many(count, context, offset=ids[0])
+        return int_column(ids[index] for index in self.table.draw_many(count, context))
+
+
+class FanOutSampler:
+    def __init__(self, ids, fan_out, position=0):
+        """
+        Инициализирует выдачу каждого идентификатора родителя ровно fan_out раз подряд.
+
+        Параметры:
+        -----------
+        ids : sequence of int
+            Идентификаторы родителей.
+        fan_out : int
+            Количество потомков на родителя.
+        position : int, optional
+            Номер первой выдаваемой строки; позволяет частям набора данных продолжать общую
+            последовательность. По умолчанию 0.
+
+        Замечания:
+        --------
+        Строка с номером j получает родителя ids[(j // fan_out) % len(ids)]; после последнего
+        родителя выдача начинается с первого.
+        """
+        if fan_out < 1:
+            raise ValueError(f"fan_out must be positive, got {fan_out}")
+        self.ids = ids
+        self.fan_out = fan_out
+        self.position = position
+
+    def draw(self, rng=None):
+        parent = self.ids[(self.position // self.fan_out) % len(self.ids)]
+        self.position += 1
+        return parent
+
+    def draw_many(self, count, context=None):
+        return int_column(self.draw() for _ in range(count))
+
+
+def zipf_weights(n, exponent=1.1):
+    """
+    Веса Zipf: родитель с рангом r (с единицы) получает вес 1 / r**exponent.
+    Первые идентификаторы становятся самыми "горячими".
+    """
+    return [1.0 / rank ** exponent for rank in range(1, n + 1)]
+
+
+def normal_weights(n, mean=0.5, std=0.15):
+    """
+    Веса нормального распределения по относительному номеру родителя (i + 0.5) / n
+    со средним mean и стандартным отклонением std (в долях количества родителей).
+    """
+    return [math.exp(-0.5 * (((i + 0.5) / n - mean) / std) ** 2) for i in range(n)]
+
+
+def parent_sampler(ids, spec=None, position=0):
+    """
+    Создаёт выбор идентификаторов родителей по описанию распределения.
+
+    Параметры:
+    -----------
+    ids : sequence of int
+        Идентификаторы родителей (например, IdRanges).
+    spec : str, optional
+        Описание распределения: 'uniform', 'zipf[:exponent]', 'normal[:mean[:std]]' или 'fanout:k'.
+        По умолчанию None - равномерный выбор, ids возвращаются без изменений.
+    position : int, optional
+        Номер первой строки для 'fanout' (см. FanOutSampler). По умолчанию 0.
+
+    Возвращает:
+    --------
+    sequence of int, WeightedSampler or FanOutSampler
+        Объект, который принимают new_random_bed(), bed_batch() и другие генераторы связей.
+    """
+    if spec is None:
+        return ids
+    name, *params = spec.split(':')
+    try:
+        params = [float(param) for param in params]
+    except ValueError:
+        raise ValueError(f"Invalid distribution parameters in '{spec}'") from None
+    if name == 'uniform':
+        return ids
+    if name == 'zipf':
+        return WeightedSampler(ids, zipf_weights(len(ids), *params))
+    if name == 'normal':
+        return WeightedSampler(ids, normal_weights(len(ids), *params))
+    if name == 'fanout':
+        if len(params) != 1:
+            raise ValueError(f"Distribution '{spec}' needs a fan-out, e.g. 'fanout:5'")
+        return FanOutSampler(ids, int(params[0]), position)
+    raise ValueError(f"Unknown distribution '{name}', expected one of {DISTRIBUTIONS}")
+
@@ -6,11 +6,19 @@
 
 import random
 
-from mysql.connector import Error
-from lib.db_controller import create_connection
+from lib.backends import Error
+from lib.db_controller import create_connection, execute_query
+from lib.distributions import parent_sampler
+from lib.parent_keys import compact_ids, parent_keys
+from lib.randomik import SEASONS, choose_id, generate_random_strings
+from lib.unique_names import UniqueNameFilter
 
 
-def generate_random_string(length):
+# Количество названий, генерируемых за один вызов generate_random_strings()
+NAME_BATCH = 10000
+
+
+def generate_random_string(length, context=None):
     '''
     Генерирует случайную строку заданной длины из строчных букв русского алфавита.
 
@@ -18,19 +26,56 @@ def generate_random_string(length):
     -----------
     length : int
         Длина строки.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
 
     Возвращает:
     --------
     генератор str
         Генератор случайных строк заданной длины.
     '''
+    rng = random if context is None else context.random
     alphabet = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
     while True:
-        rand_string = ''.join(random.choice(alphabet) for i in range(length))
+        rand_string = ''.join(rng.choice(alphabet) for i in range(length))
         yield rand_string
 
 
-def generator_random_fertilizer(num_instances):
+def generate_random_names(num_instances, batch_size=NAME_BATCH, context=None, unique=None, prefix=''):
+    '''
+    Генерирует num_instances случайных строк длиной от 4 до 10 букв пакетами по batch_size.
+
+    Параметры:
+    -----------
+    num_instances : int
+        Количество строк.
+    batch_size : int, optional
+        Количество строк, генерируемых за один вызов. По умолчанию NAME_BATCH.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    unique : UniqueNameFilter, optional
+        Проверка уникальности (см. unique_names.UniqueNameFilter). Если передана, выдаются только
+        названия, которых в ней ещё нет, и они в неё добавляются. По умолчанию названия не проверяются.
+    prefix : str, optional
+        Префикс, добавляемый к каждой строке (например, 'Сад '). По умолчанию без префикса.
+
+    Возвращает:
+    --------
+    генератор str
+        Генератор случайных строк.
+    '''
+    while num_instances > 0:
+        batch = generate_random_strings(min(num_instances, batch_size), context=context)
+        if prefix:
+            batch = [prefix + name for name in batch]
+        if unique is not None:
+            # Повторы отбрасываются, недостающие строки догенерируются следующим пакетом
+            batch = [name for name, added in zip(batch, unique.add_many(batch)) if added]
+        num_instances -= len(batch)
+        yield from batch
+
+
+def generator_random_fertilizer(num_instances, context=None, unique=None):
     '''
     Генерирует случайные данные для удобрений.
 
@@ -38,22 +83,25 @@ def generator_random_fertilizer(num_instances):
     -----------
     num_instances : int
         Количество экземпляров удобрений для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    unique : UniqueNameFilter, optional
+        Проверка уникальности (см. unique_names.UniqueNameFilter). Если передана, выдаются только
+        названия, которых в ней ещё нет, и они в неё добавляются. По умолчанию названия не проверяются.
 
     Возвращает:
     --------
     генератор tuple
         Кортежи (название удобрения, количество) случайных удобрений.
     '''
+    rng = random if context is None else context.random
     # Генератор случайных названий удобрений
-    new_name_gen = generate_random_string(random.randint(4, 10))
-
-    for _ in range(num_instances):
-        new_name = next(new_name_gen)
-        new_count = random.randint(0, 100)
+    for new_name in generate_random_names(num_instances, context=context, unique=unique):
+        new_count = rng.randint(0, 100)
         yield new_name, new_count
 
 
-def generator_random_crop(num_instances):
+def generator_random_crop(num_instances, context=None, unique=None):
     '''
     Генерирует случайные данные для культур.
 
@@ -61,24 +109,26 @@ def generator_random_crop(num_instances):
     -----------
     num_instances : int
         Количество экземпляров культур для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    unique : UniqueNameFilter, optional
+        Проверка уникальности (см. unique_names.UniqueNameFilter). Если передана, выдаются только
+        названия, которых в ней ещё нет, и они в неё добавляются. По умолчанию названия не проверяются.
 
     Возвращает:
     --------
     генератор tuple
         Кортежи (название культуры, сезон, частота полива, срок созревания) случайных культур.
     '''
-    seasons = ['весна', 'лето', 'осень', 'зима']
-    new_name_gen = generate_random_string(random.randint(4, 10))
-
-    for _ in range(num_instances):
-        new_name = next(new_name_gen)
-        new_season = random.choice(seasons)
-        new_watering_frequency = random.randint(1, 10)
-        new_ripening_period = random.randint(10, 60)
+    rng = random if context is None else context.random
+    for new_name in generate_random_names(num_instances, context=context, unique=unique):
+        new_season = rng.choice(SEASONS)
+        new_watering_frequency = rng.randint(1, 10)
+        new_ripening_period = rng.randint(10, 60)
         yield new_name, new_season, new_watering_frequency, new_ripening_period
 
 
-def generator_random_employee(num_instances):
+def generator_random_employee(num_instances, context=None, unique=None):
     '''
     Генерирует случайные данные для сотрудников.
 
@@ -86,26 +136,31 @@ def generator_random_employee(num_instances):
     -----------
     num_instances : int
         Количество экземпляров сотрудников для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    unique : UniqueNameFilter, optional
+        Проверка уникальности (см. unique_names.UniqueNameFilter). Если передана, выдаются только
+        названия, которых в ней ещё нет, и они в неё добавляются. По умолчанию названия не проверяются.
 
     Возвращает:
     --------
     генератор tuple
         Кортежи (ФИО, должность) случайных сотрудников.
     '''
-    new_name_gen = generate_random_string(random.randint(4, 10))
-    new_surname_gen = generate_random_string(random.randint(4, 10))
-    new_patronymic_gen = generate_random_string(random.randint(4, 10))
-
-    for _ in range(num_instances):
-        new_name = next(new_name_gen)
-        new_surname = next(new_surname_gen)
-        new_patronymic = next(new_patronymic_gen)
-        new_fullname = f"{new_name} {new_surname} {new_patronymic}"
-        new_post = next(generate_random_string(random.randint(4, 10)))
-        yield new_fullname, new_post
-
-
-def generator_random_garden(num_instances):
+    # Уникальность проверяется для ФИО, поэтому слова генерируются пакетами до набора нужного количества
+    while num_instances > 0:
+        count = min(num_instances, NAME_BATCH)
+        words = generate_random_strings(4 * count, context=context)
+        names, surnames, patronymics, posts = (words[i * count:(i + 1) * count] for i in range(4))
+        for new_name, new_surname, new_patronymic, new_post in zip(names, surnames, patronymics, posts):
+            new_fullname = f"{new_name} {new_surname} {new_patronymic}"
+            if unique is not None and not unique.add(new_fullname):
+                continue
+            num_instances -= 1
+            yield new_fullname, new_post
+
+
+def generator_random_garden(num_instances, context=None, unique=None):
     '''
     Генерирует случайные данные для садов.
 
@@ -113,20 +168,21 @@ def generator_random_garden(num_instances):
     -----------
     num_instances : int
         Количество экземпляров садов для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    unique : UniqueNameFilter, optional
+        Проверка уникальности (см. unique_names.UniqueNameFilter). Если передана, выдаются только
+        названия, которых в ней ещё нет, и они в неё добавляются. По умолчанию названия не проверяются.
 
     Возвращает:
     --------
     генератор str
         Строки с названиями случайных садов.
     '''
-    new_name_gen = generate_random_string(random.randint(4, 10))
-
-    for _ in range(num_instances):
-        new_name = f"Сад {next(new_name_gen)}"
-        yield new_name
+    yield from generate_random_names(num_instances, context=context, unique=unique, prefix='Сад ')
 
 
-def generator_random_action(num_instances):
+def generator_random_action(num_instances, context=None, unique=None):
     '''
     Генерирует случайные данные для действий.
 
@@ -134,59 +190,184 @@ def generator_random_action(num_instances):
     -----------
     num_instances : int
         Количество экземпляров действий для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    unique : UniqueNameFilter, optional
+        Проверка уникальности (см. unique_names.UniqueNameFilter). Если передана, выдаются только
+        названия, которых в ней ещё нет, и они в неё добавляются. По умолчанию названия не проверяются.
 
     Возвращает:
     --------
     генератор str
         Строки с названиями случайных действий.
     '''
-    new_name_gen = generate_random_string(random.randint(4, 10))
+    yield from generate_random_names(num_instances, context=context, unique=unique)
 
-    for _ in range(num_instances):
-        new_name = next(new_name_gen)
-        yield new_name
 
+def load_ids(table, database='garden', batch_size=NAME_BATCH):
+    '''
+    Читает идентификаторы всех строк таблицы из базы данных порциями.
+
+    Параметры:
+    -----------
+    table : str
+        Имя таблицы.
+    database : str, optional
+        Имя базы данных. По умолчанию 'garden'.
+    batch_size : int, optional
+        Количество строк в одной порции. По умолчанию NAME_BATCH.
 
-def generator_random_bed(num_instances):
+    Возвращает:
+    --------
+    array.array or None
+        Идентификаторы строк таблицы (см. parent_keys.compact_ids) или None, если их не удалось прочитать.
     '''
-    Генерирует случайные данные для грядок.
+    ids = []
+    with create_connection(database) as connection:
+        if connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT id FROM {table}")
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        ids.extend(row[0] for row in rows)
+            except Error as e:
+                print(f"The error '{e}' occurred")
+                return None
+    return compact_ids(ids)
+
+
+def fetch_ids(table, database='garden', use_cache=True):
+    '''
+    Возвращает идентификаторы всех строк таблицы, используя общий кэш процесса (см. parent_keys).
 
     Параметры:
     -----------
-    num_instances : int
-        Количество экземпляров грядок для генерации.
+    table : str
+        Имя таблицы.
+    database : str, optional
+        Имя базы данных. По умолчанию 'garden'.
+    use_cache : bool, optional
+        Брать идентификаторы из кэша. По умолчанию True; False читает их из базы данных.
 
     Возвращает:
     --------
-    генератор tuple
-        Кортежи с идентификаторами случайного сада, культуры и удобрения.
+    array.array
+        Идентификаторы строк таблицы.
+    '''
+    if not use_cache:
+        return compact_ids(load_ids(table, database) or ())
+    return parent_keys.get(database, table, lambda: load_ids(table, database))
+
+
+def fetch_names(table, column='name', batch_size=NAME_BATCH):
     '''
-    garden_ids, crop_ids, fertilizer_ids = [], [], []
+    Читает значения столбца таблицы из базы данных garden порциями, не загружая всю таблицу в память.
+
+    Параметры:
+    -----------
+    table : str
+        Имя таблицы.
+    column : str, optional
+        Имя столбца. По умолчанию 'name'.
+    batch_size : int, optional
+        Количество строк в одной порции. По умолчанию NAME_BATCH.
 
-    # Получаем ID созданных садов, культур и удобрений из базы данных
+    Возвращает:
+    --------
+    генератор str
+        Значения столбца.
+    '''
     with create_connection('garden') as connection:
         if connection:
             try:
                 with connection.cursor() as cursor:
-                    cursor.execute("SELECT id FROM gardens")
-                    garden_ids = [row[0] for row in cursor.fetchall()]
-
-                    cursor.execute("SELECT id FROM crops")
-                    crop_ids = [row[0] for row in cursor.fetchall()]
-
-                    cursor.execute("SELECT id FROM fertilizers")
-                    fertilizer_ids = [row[0] for row in cursor.fetchall()]
+                    cursor.execute(f"SELECT {column} FROM {table}")
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield row[0]
             except Error as e:
                 print(f"The error '{e}' occurred")
 
+
+def table_name_filter(table, column='name', capacity=None, **kwargs):
+    '''
+    Создаёт проверку уникальности, заполненную названиями, которые уже есть в таблице базы данных garden.
+
+    Параметры:
+    -----------
+    table : str
+        Имя таблицы, например 'crops'.
+    column : str, optional
+        Столбец с названиями. По умолчанию 'name' ('fullname' для employees).
+    capacity : int, optional
+        Ожидаемое количество названий вместе с новыми. По умолчанию удвоенное количество строк таблицы.
+    **kwargs
+        Остальные параметры UniqueNameFilter (error_rate, exact_limit, spill_dir).
+
+    Возвращает:
+    --------
+    UniqueNameFilter
+        Проверка уникальности для параметра unique генераторов.
+    '''
+    if capacity is None:
+        rows = execute_query(f"SELECT COUNT(*) FROM {table}")
+        capacity = 2 * max(rows[0][0] if rows else 0, NAME_BATCH)
+    unique = UniqueNameFilter(capacity, **kwargs)
+    unique.update(fetch_names(table, column))
+    return unique
+
+
+def generator_random_bed(num_instances, garden_ids=None, crop_ids=None, fertilizer_ids=None, context=None,
+                         distributions=None):
+    '''
+    Генерирует случайные данные для грядок.
+
+    Параметры:
+    -----------
+    num_instances : int
+        Количество экземпляров грядок для генерации.
+    garden_ids, crop_ids, fertilizer_ids : sequence of int, optional
+        Идентификаторы садов, культур и удобрений (например, IdRanges).
+        Не переданные идентификаторы читаются из базы данных.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию все ключи выбираются равномерно.
+
+    Возвращает:
+    --------
+    генератор tuple
+        Кортежи с идентификаторами случайного сада, культуры и удобрения.
+    '''
+    rng = random if context is None else context.random
+    # Получаем ID созданных садов, культур и удобрений из базы данных, если они не переданы
+    if garden_ids is None:
+        garden_ids = fetch_ids('gardens')
+    if crop_ids is None:
+        crop_ids = fetch_ids('crops')
+    if fertilizer_ids is None:
+        fertilizer_ids = fetch_ids('fertilizers')
+    distributions = distributions or {}
+    garden_ids = parent_sampler(garden_ids, distributions.get('gardens'))
+    crop_ids = parent_sampler(crop_ids, distributions.get('crops'))
+    fertilizer_ids = parent_sampler(fertilizer_ids, distributions.get('fertilizers'))
+
     for _ in range(num_instances):
-        garden_id = random.choice(garden_ids)
-        crop_id = random.choice(crop_ids)
-        fertilizer_id = random.choice(fertilizer_ids)
+        garden_id = choose_id(garden_ids, rng)
+        crop_id = choose_id(crop_ids, rng)
+        fertilizer_id = choose_id(fertilizer_ids, rng)
         yield garden_id, crop_id, fertilizer_id
 
 
-def generator_random_garden_employee(num_instances):
+def generator_random_garden_employee(num_instances, garden_ids=None, employee_ids=None, context=None,
+                                     distributions=None):
     '''
     Генерирует случайные данные для отношений "Сад-Сотрудник".
 
@@ -194,26 +375,31 @@ def generator_random_garden_employee(num_instances):
     -----------
     num_instances : int
         Количество экземпляров отношений для генерации.
+    garden_ids, employee_ids : sequence of int, optional
+        Идентификаторы садов и сотрудников (например, IdRanges).
+        Не переданные идентификаторы читаются из базы данных.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальный модуль random.
+    distributions : dict, optional
+        Распределения внешних ключей по родительским таблицам, например {'gardens': 'zipf:1.2'}
+        (см. distributions.parent_sampler). По умолчанию все ключи выбираются равномерно.
 
     Возвращает:
     --------
     генератор tuple
         Кортежи с идентификаторами случайного сада и случайного сотрудника.
     '''
-    with create_connection('garden') as connection:
-        if connection:
-            try:
-                with connection.cursor() as cursor:
-                    cursor.execute("SELECT id FROM gardens")
-                    garden_ids = [row[0] for row in cursor.fetchall()]
+    rng = random if context is None else context.random
+    # Идентификаторы читаются заранее, чтобы соединение не удерживалось, пока генератор выдаёт строки
+    if garden_ids is None:
+        garden_ids = fetch_ids('gardens')
+    if employee_ids is None:
+        employee_ids = fetch_ids('employees')
+    distributions = distributions or {}
+    garden_ids = parent_sampler(garden_ids, distributions.get('gardens'))
+    employee_ids = parent_sampler(employee_ids, distributions.get('employees'))
 
-                    cursor.execute("SELECT id FROM employees")
-                    employee_ids = [row[0] for row in cursor.fetchall()]
-
-                    for _ in range(num_instances):
-                        garden_id = random.choice(garden_ids)
-                        employee_id = random.choice(employee_ids)
-                        yield garden_id, employee_id
-
-            except Error as e:
-                print(f"The error '{e}' occurred")
+    for _ in range(num_instances):
+        garden_id = choose_id(garden_ids, rng)
+        employee_id = choose_id(employee_ids, rng)
+        yield garden_id, employee_id
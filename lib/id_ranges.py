@@ -0,0 +1,90 @@
+"""
+Модуль: id_ranges
+
+Этот модуль предоставляет компактное хранение множеств идентификаторов в виде отрезков
+и равномерный выбор случайного идентификатора из них без загрузки всех значений в память.
+"""
+
+import bisect
+
+
+class IdRanges:
+    def __init__(self, ranges=()):
+        """
+        Инициализирует набор отрезков идентификаторов.
+
+        Параметры:
+        -----------
+        ranges : iterable of tuples, optional
+            Отрезки (first, last) включительно.
+
+        Замечания:
+        --------
+        Объект ведёт себя как неизменяемая последовательность идентификаторов: поддерживает len(),
+        индексацию и поэтому random.choice(). Индексация выполняется двоичным поиском по отрезкам.
+        """
+        self._firsts = []
+        self._lasts = []
+        # Количество идентификаторов во всех отрезках до текущего включительно
+        self._ends = []
+        for first, last in ranges:
+            self.add(first, last - first + 1)
+
+    @classmethod
+    def from_bounds(cls, first, last):
+        """
+        Создаёт набор из одного отрезка [first, last]. Пустой, если first или last равен None.
+        """
+        if first is None or last is None or last < first:
+            return cls()
+        return cls([(first, last)])
+
+    def add(self, first, count):
+        """
+        Добавляет count последовательных идентификаторов, начиная с first.
+        Отрезок, продолжающий последний, объединяется с ним.
+
+        Параметры:
+        -----------
+        first : int
+            Первый идентификатор.
+        count : int
+            Количество идентификаторов.
+        """
+        if count <= 0:
+            return
+        last = first + count - 1
+        if self._lasts and self._lasts[-1] + 1 == first:
+            self._lasts[-1] = last
+            self._ends[-1] += count
+            return
+        self._firsts.append(first)
+        self._lasts.append(last)
+        self._ends.append((self._ends[-1] if self._ends else 0) + count)
+
+    @property
+    def ranges(self):
+        """
+        Возвращает список отрезков (first, last).
+        """
+        return list(zip(self._firsts, self._lasts))
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def __getitem__(self, index):
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('IdRanges index out of range')
+        position = bisect.bisect_right(self._ends, index)
+        before = self._ends[position - 1] if position else 0
+        return self._firsts[position] + index - before
+
+    def __iter__(self):
+        for first, last in zip(self._firsts, self._lasts):
+            yield from range(first, last + 1)
+
+    def __repr__(self):
+        return f"IdRanges({self.ranges})"
@@ -0,0 +1,160 @@
+"""
+Модуль: parent_keys
+
+Этот модуль предоставляет общий для процесса кэш идентификаторов родительских таблиц
+для генераторов связей с ограничением по времени жизни и по количеству хранимых идентификаторов.
+"""
+
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+
+
+# Время жизни записи кэша в секундах
+PARENT_KEYS_TTL = 60.0
+
+# Максимальное количество идентификаторов во всех записях кэша
+PARENT_KEYS_MAX_IDS = 10000000
+
+
+def compact_ids(ids):
+    """
+    Упаковывает идентификаторы в array('i'), а если они не помещаются в 32 бита - в array('q').
+
+    Параметры:
+    -----------
+    ids : iterable of int
+        Идентификаторы.
+
+    Возвращает:
+    --------
+    array.array
+        Упакованные идентификаторы.
+    """
+    if isinstance(ids, array) and ids.typecode in ('i', 'q'):
+        return ids
+    ids = list(ids) if not isinstance(ids, (list, tuple, array)) else ids
+    try:
+        return array('i', ids)
+    except OverflowError:
+        return array('q', ids)
+
+
+class ParentKeyCache:
+    def __init__(self, ttl=PARENT_KEYS_TTL, max_ids=PARENT_KEYS_MAX_IDS, clock=time.monotonic):
+        """
+        Инициализирует кэш идентификаторов по ключу (база данных, таблица).
+
+        Параметры:
+        -----------
+        ttl : float, optional
+            Время жизни записи в секундах. По умолчанию PARENT_KEYS_TTL.
+        max_ids : int, optional
+            Максимальное количество идентификаторов во всех записях. При превышении вытесняются
+            давно не использованные записи. По умолчанию PARENT_KEYS_MAX_IDS.
+        clock : callable, optional
+            Источник времени. По умолчанию time.monotonic.
+
+        Замечания:
+        --------
+        Кэш действует в пределах процесса: изменения таблиц, сделанные другими процессами,
+        становятся видны после истечения ttl.
+        """
+        self.ttl = ttl
+        self.max_ids = max_ids
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        # Увеличивается при каждом сбросе; загрузка, начатая до сброса, не попадает в кэш
+        self._generation = 0
+
+    def get(self, database, table, loader):
+        """
+        Возвращает идентификаторы таблицы из кэша или загружает их.
+
+        Параметры:
+        -----------
+        database : str
+            Имя базы данных.
+        table : str
+            Имя таблицы.
+        loader : callable
+            Функция без аргументов, возвращающая идентификаторы таблицы или None, если их не удалось
+            загрузить. Неудачная загрузка не кэшируется: следующий вызов повторяет её.
+
+        Возвращает:
+        --------
+        array.array
+            Идентификаторы таблицы. Массив нельзя изменять: он общий для всех вызывающих.
+        """
+        key = (database, table)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[0]
+            if entry is not None:
+                self._stats['expired'] += 1
+                self._remove(key)
+            self._stats['misses'] += 1
+            generation = self._generation
+
+        # Загрузка выполняется без блокировки, чтобы не задерживать обращения к другим таблицам
+        ids = loader()
+        if ids is None:
+            with self._lock:
+                self._stats['failed'] += 1
+            return compact_ids(())
+        ids = compact_ids(ids)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if generation == self._generation and len(ids) <= self.max_ids:
+                self._entries[key] = (ids, now)
+                self._size += len(ids)
+                while self._size > self.max_ids:
+                    self._remove(next(iter(self._entries)))
+                    self._stats['evicted'] += 1
+        return ids
+
+    def _remove(self, key):
+        ids, _ = self._entries.pop(key)
+        self._size -= len(ids)
+
+    def invalidate(self, database=None, table=None):
+        """
+        Удаляет записи кэша.
+
+        Параметры:
+        -----------
+        database : str, optional
+            Имя базы данных. По умолчанию записи всех баз данных.
+        table : str, optional
+            Имя таблицы. По умолчанию записи всех таблиц базы данных.
+        """
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                if (database is None or key[0] == database) and (table is None or key[1] == table):
+                    self._remove(key)
+                    self._stats['invalidated'] += 1
+
+    @property
+    def stats(self):
+        """
+        Возвращает статистику кэша: hits, misses, failed, expired, evicted, invalidated, entries и ids.
+        """
+        with self._lock:
+            stats = {name: self._stats[name] for name in ('hits', 'misses', 'failed', 'expired', 'evicted', 'invalidated')}
+            stats['entries'] = len(self._entries)
+            stats['ids'] = self._size
+        return stats
+
+
+# Общий кэш процесса, который используют generators.fetch_ids() и сбрасывают функции записи db_controller
+parent_keys = ParentKeyCache()
@@ -4,9 +4,59 @@
 Этот модуль предоставляет функции для генерации случайных данных, которые могут быть использованы для заполнения таблиц в базе данных.
 """
 
+import os
 import random
+from itertools import accumulate
 
-def generate_random_string(length):
+from lib.columnar import ColumnBatch, int_column
+from lib.id_ranges import IdRanges
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется реализация на чистом Python
+    np = None
+
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+SEASONS = ['весна', 'лето', 'осень', 'зима']
+
+if np is not None:
+    _ALPHABET_CODES = np.array([ord(char) for char in ALPHABET], dtype='<u4')
+    _numpy_rng = np.random.default_rng()
+
+
+def seed_random(value=None):
+    """
+    Задаёт зерно генераторам случайных чисел модуля random и NumPy.
+
+    Параметры:
+    -----------
+    value : int or str, optional
+        Зерно. None инициализирует генераторы из источника энтропии системы.
+    """
+    global _numpy_rng
+    random.seed(value)
+    if np is not None:
+        # Зерно NumPy выводится из random, поэтому одно значение определяет оба генератора
+        _numpy_rng = np.random.default_rng(random.getrandbits(128) if value is not None else None)
+
+
+if np is not None and hasattr(os, 'register_at_fork'):
+    # Дочерний процесс после fork не должен повторять последовательность родителя
+    os.register_at_fork(after_in_child=seed_random)
+
+
+def python_rng(context):
+    # Генератор модуля random: глобальный или из контекста генерации
+    return random if context is None else context.random
+
+
+def numpy_generator(context):
+    # Генератор NumPy: глобальный или из контекста генерации
+    return _numpy_rng if context is None else context.numpy
+
+
+def generate_random_string(length, context=None):
     """
     Генерирует случайную строку из строчных букв русского алфавита заданной длины.
 
@@ -14,35 +64,201 @@ def generate_random_string(length):
     -----------
     length : int
         Длина генерируемой строки.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
 
     Возвращает:
     --------
     str
         Случайная строка из строчных букв русского алфавита.
     """
-    alphabet = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
-    rand_string = ''.join(random.choice(alphabet) for _ in range(length))
+    rng = python_rng(context)
+    rand_string = ''.join(rng.choice(ALPHABET) for _ in range(length))
     return rand_string
 
 
-def new_random_fertilizer():
+def generate_random_strings(count, min_length=4, max_length=10, context=None):
+    """
+    Генерирует count случайных строк из строчных букв русского алфавита за один вызов.
+    Длина каждой строки выбирается равномерно из [min_length, max_length].
+
+    С NumPy индексы букв разыгрываются одним массивом (count, max_length), переводятся в коды символов
+    и превращаются в строки одним преобразованием массива; без NumPy буквы разыгрываются одним вызовом
+    random.choices и режутся на строки по накопленным длинам.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    min_length : int, optional
+        Минимальная длина строки. По умолчанию 4.
+    max_length : int, optional
+        Максимальная длина строки. По умолчанию 10.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    list of str
+        Случайные строки.
+    """
+    if count <= 0:
+        return []
+    if np is not None:
+        generator = numpy_generator(context)
+        lengths = generator.integers(min_length, max_length + 1, size=count)
+        indexes = generator.integers(0, len(ALPHABET), size=(count, max_length), dtype=np.uint8)
+        codes = _ALPHABET_CODES[indexes]
+        # Позиции за концом строки заполняются нулями, которые NumPy отбрасывает при переводе в str
+        codes[np.arange(max_length) >= lengths[:, None]] = 0
+        return codes.view(f'<U{max_length}').ravel().tolist()
+
+    rng = python_rng(context)
+    lengths = rng.choices(range(min_length, max_length + 1), k=count)
+    ends = list(accumulate(lengths))
+    chars = ''.join(rng.choices(ALPHABET, k=ends[-1]))
+    return [chars[end - length:end] for end, length in zip(ends, lengths)]
+
+
+def random_integers(count, low, high, context=None):
+    """
+    Генерирует count случайных целых чисел из отрезка [low, high].
+
+    Параметры:
+    -----------
+    count : int
+        Количество чисел.
+    low, high : int
+        Границы отрезка.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    list of int
+        Случайные числа.
+    """
+    if np is not None:
+        return numpy_generator(context).integers(low, high + 1, size=count).tolist()
+    return python_rng(context).choices(range(low, high + 1), k=count)
+
+
+def random_elements(options, count, context=None):
+    """
+    Выбирает count случайных элементов из options.
+
+    Параметры:
+    -----------
+    options : sequence
+        Варианты.
+    count : int
+        Количество элементов.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    list
+        Случайные элементы.
+    """
+    if np is not None:
+        return [options[i] for i in numpy_generator(context).integers(0, len(options), size=count).tolist()]
+    return python_rng(context).choices(options, k=count)
+
+
+def random_int_column(count, low, high, context=None):
+    """
+    Генерирует столбец из count случайных целых чисел из отрезка [low, high].
+
+    Параметры:
+    -----------
+    count : int
+        Количество чисел.
+    low, high : int
+        Границы отрезка.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    array.array
+        Буфер столбца (см. columnar.int_column).
+    """
+    column = int_column()
+    if np is not None:
+        column.frombytes(numpy_generator(context).integers(low, high + 1, size=count, dtype=np.int64).tobytes())
+    else:
+        column.extend(python_rng(context).choices(range(low, high + 1), k=count))
+    return column
+
+
+def choose_id(ids, rng=random):
+    """
+    Выбирает один идентификатор: из выбора с распределением (см. distributions.parent_sampler)
+    или равномерно из последовательности.
+
+    Параметры:
+    -----------
+    ids : sequence of int, WeightedSampler or FanOutSampler
+        Идентификаторы или выбор с распределением.
+    rng : random.Random, optional
+        Генератор случайных чисел. По умолчанию глобальный модуль random.
+    """
+    if hasattr(ids, 'draw'):
+        return ids.draw(rng)
+    return rng.choice(ids)
+
+
+def random_id_column(ids, count, context=None):
+    """
+    Генерирует столбец из count идентификаторов, случайно выбранных из ids.
+
+    Параметры:
+    -----------
+    ids : sequence of int, WeightedSampler or FanOutSampler
+        Идентификаторы (например, IdRanges) или выбор с распределением (см. distributions.parent_sampler).
+    count : int
+        Количество значений.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    array.array
+        Буфер столбца.
+    """
+    if hasattr(ids, 'draw_many'):
+        return ids.draw_many(count, context)
+    if isinstance(ids, IdRanges) and len(ids.ranges) == 1:
+        # Сплошной отрезок: идентификаторы разыгрываются напрямую, без индексации
+        return random_int_column(count, ids[0], ids[-1], context=context)
+    return int_column(ids[index] for index in random_int_column(count, 0, len(ids) - 1, context=context))
+
+
+def new_random_fertilizer(context=None):
     """
     Генерирует случайное удобрение с названием и количеством.
 
+    Параметры:
+    -----------
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
     Возвращает:
     --------
     tuple
         Кортеж с названием и количеством случайного удобрения.
     """
-    new_name_len = random.randint(4, 10)
-    new_name = generate_random_string(new_name_len)
+    rng = python_rng(context)
+    new_name_len = rng.randint(4, 10)
+    new_name = generate_random_string(new_name_len, context=context)
 
-    new_count = random.randint(0, 100)
+    new_count = rng.randint(0, 100)
 
     return new_name, new_count
 
 
-def new_random_fertilizers(count):
+def new_random_fertilizers(count, context=None):
     """
     Генерирует список случайных удобрений.
 
@@ -50,39 +266,48 @@ def new_random_fertilizers(count):
     -----------
     count : int
         Количество случайных удобрений для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
 
     Возвращает:
     --------
     list
         Список кортежей с названием и количеством случайных удобрений.
     """
-    fertilizers_list = [new_random_fertilizer() for _ in range(count)]
+    names = generate_random_strings(count, context=context)
+    amounts = random_integers(count, 0, 100, context=context)
+    fertilizers_list = list(zip(names, amounts))
     return fertilizers_list
 
 
-def new_random_crop():
+def new_random_crop(context=None):
     """
     Генерирует случайную культуру с названием, сезоном, частотой полива и сроком созревания.
 
+    Параметры:
+    -----------
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
     Возвращает:
     --------
     tuple
         Кортеж с названием, сезоном, частотой полива и сроком созревания случайной культуры.
     """
-    new_name_len = random.randint(4, 10)
-    new_name = generate_random_string(new_name_len)
+    rng = python_rng(context)
+    new_name_len = rng.randint(4, 10)
+    new_name = generate_random_string(new_name_len, context=context)
 
-    seasons = ['весна', 'лето', 'осень', 'зима']
-    new_season = random.choice(seasons)
+    new_season = rng.choice(SEASONS)
 
-    new_watering_frequency = random.randint(1, 10)
+    new_watering_frequency = rng.randint(1, 10)
 
-    new_ripening_period = random.randint(10, 60)
+    new_ripening_period = rng.randint(10, 60)
 
     return new_name, new_season, new_watering_frequency, new_ripening_period
 
 
-def new_random_crops(count):
+def new_random_crops(count, context=None):
     """
     Генерирует список случайных культур.
 
@@ -90,43 +315,55 @@ def new_random_crops(count):
     -----------
     count : int
         Количество случайных культур для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
 
     Возвращает:
     --------
     list
         Список кортежей с названием, сезоном, частотой полива и сроком созревания случайных культур.
     """
-    crops_list = [new_random_crop() for _ in range(count)]
+    names = generate_random_strings(count, context=context)
+    seasons = random_elements(SEASONS, count, context=context)
+    watering_frequencies = random_integers(count, 1, 10, context=context)
+    ripening_periods = random_integers(count, 10, 60, context=context)
+    crops_list = list(zip(names, seasons, watering_frequencies, ripening_periods))
     return crops_list
 
 
-def new_random_employee():
+def new_random_employee(context=None):
     """
     Генерирует случайного сотрудника с ФИО и должностью.
 
+    Параметры:
+    -----------
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
     Возвращает:
     --------
     tuple
         Кортеж с ФИО и должностью случайного сотрудника.
     """
-    new_name_len = random.randint(4, 10)
-    new_name = generate_random_string(new_name_len)
+    rng = python_rng(context)
+    new_name_len = rng.randint(4, 10)
+    new_name = generate_random_string(new_name_len, context=context)
 
-    new_surname_len = random.randint(4, 10)
-    new_surname = generate_random_string(new_surname_len)
+    new_surname_len = rng.randint(4, 10)
+    new_surname = generate_random_string(new_surname_len, context=context)
 
-    new_patronymic_len = random.randint(4, 10)
-    new_patronymic = generate_random_string(new_patronymic_len)
+    new_patronymic_len = rng.randint(4, 10)
+    new_patronymic = generate_random_string(new_patronymic_len, context=context)
 
     new_fullname = new_name + ' ' + new_surname + ' ' + new_patronymic
 
-    new_post_len = random.randint(4, 10)
-    new_post= generate_random_string(new_post_len)
+    new_post_len = rng.randint(4, 10)
+    new_post= generate_random_string(new_post_len, context=context)
 
     return new_fullname, new_post
 
 
-def new_random_employees(count):
+def new_random_employees(count, context=None):
     """
     Генерирует список случайных сотрудников.
 
@@ -134,32 +371,43 @@ def new_random_employees(count):
     -----------
     count : int
         Количество случайных сотрудников для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
 
     Возвращает:
     --------
     list
         Список кортежей с ФИО и должностью случайных сотрудников.
     """
-    employees_list = [new_random_employee() for _ in range(count)]
+    words = generate_random_strings(4 * count, context=context)
+    names, surnames, patronymics, posts = (words[i * count:(i + 1) * count] for i in range(4))
+    fullnames = [f"{name} {surname} {patronymic}" for name, surname, patronymic in zip(names, surnames, patronymics)]
+    employees_list = list(zip(fullnames, posts))
     return employees_list
 
 
-def new_random_garden():
+def new_random_garden(context=None):
     """
     Генерирует случайное название сада.
 
+    Параметры:
+    -----------
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
     Возвращает:
     --------
     str
         Случайное название сада.
     """
-    new_name_len = random.randint(4, 10)
-    new_name = 'Сад ' + generate_random_string(new_name_len)
+    rng = python_rng(context)
+    new_name_len = rng.randint(4, 10)
+    new_name = 'Сад ' + generate_random_string(new_name_len, context=context)
 
     return new_name
 
 
-def new_random_gardens(count):
+def new_random_gardens(count, context=None):
     """
     Генерирует список случайных названий садов.
 
@@ -167,32 +415,40 @@ def new_random_gardens(count):
     -----------
     count : int
         Количество случайных названий садов для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
 
     Возвращает:
     --------
     list
         Список строк со случайными названиями садов.
     """
-    gardens_list = [new_random_garden() for _ in range(count)]
+    gardens_list = ['Сад ' + name for name in generate_random_strings(count, context=context)]
     return gardens_list
 
 
-def new_random_action():
+def new_random_action(context=None):
     """
     Генерирует случайное название действия.
 
+    Параметры:
+    -----------
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
     Возвращает:
     --------
     str
         Случайное название действия.
     """
-    new_name_len = random.randint(4, 10)
-    new_name = generate_random_string(new_name_len)
+    rng = python_rng(context)
+    new_name_len = rng.randint(4, 10)
+    new_name = generate_random_string(new_name_len, context=context)
 
     return new_name
 
 
-def new_random_actions(count):
+def new_random_actions(count, context=None):
     """
     Генерирует список случайных названий действий.
 
@@ -200,15 +456,211 @@ def new_random_actions(count):
     -----------
     count : int
         Количество случайных названий действий для генерации.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
 
     Возвращает:
     --------
     list
         Список строк со случайными названиями действий.
     """
-    actions_list = [new_random_action() for _ in range(count)]
+    actions_list = generate_random_strings(count, context=context)
     return actions_list
 
 
+def new_random_bed(garden_ids, crop_ids, fertilizer_ids, context=None):
+    """
+    Генерирует случайную грядку из идентификаторов существующих садов, культур и удобрений.
+
+    Параметры:
+    -----------
+    garden_ids, crop_ids, fertilizer_ids : sequence of int
+        Идентификаторы, из которых выбираются значения (например, IdRanges),
+        или выбор с распределением (см. distributions.parent_sampler).
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    tuple
+        Кортеж с идентификаторами сада, культуры и удобрения.
+    """
+    rng = python_rng(context)
+    return choose_id(garden_ids, rng), choose_id(crop_ids, rng), choose_id(fertilizer_ids, rng)
+
+
+def new_random_garden_employee(garden_ids, employee_ids, context=None):
+    """
+    Генерирует случайную связь "Сад-Сотрудник" из идентификаторов существующих садов и сотрудников.
+
+    Параметры:
+    -----------
+    garden_ids, employee_ids : sequence of int
+        Идентификаторы, из которых выбираются значения (например, IdRanges),
+        или выбор с распределением (см. distributions.parent_sampler).
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    tuple
+        Кортеж с идентификаторами сада и сотрудника.
+    """
+    rng = python_rng(context)
+    return choose_id(garden_ids, rng), choose_id(employee_ids, rng)
+
+
+def fertilizer_batch(count, context=None):
+    """
+    Генерирует пакет случайных удобрений в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбцы name (list of str) и amount (array.array).
+    """
+    return ColumnBatch(['name', 'amount'], [generate_random_strings(count, context=context),
+                                            random_int_column(count, 0, 100, context=context)])
+
+
+def crop_batch(count, context=None):
+    """
+    Генерирует пакет случайных культур в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбцы name, season, watering_frequency и ripening_period.
+    """
+    return ColumnBatch(['name', 'season', 'watering_frequency', 'ripening_period'],
+                       [generate_random_strings(count, context=context),
+                        random_elements(SEASONS, count, context=context),
+                        random_int_column(count, 1, 10, context=context),
+                        random_int_column(count, 10, 60, context=context)])
+
+
+def employee_batch(count, context=None):
+    """
+    Генерирует пакет случайных сотрудников в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбцы fullname и post.
+    """
+    words = generate_random_strings(4 * count, context=context)
+    names, surnames, patronymics, posts = (words[i * count:(i + 1) * count] for i in range(4))
+    fullnames = [f"{name} {surname} {patronymic}" for name, surname, patronymic in zip(names, surnames, patronymics)]
+    return ColumnBatch(['fullname', 'post'], [fullnames, posts])
+
+
+def garden_batch(count, context=None):
+    """
+    Генерирует пакет случайных садов в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбец name.
+    """
+    return ColumnBatch(['name'], [['Сад ' + name for name in generate_random_strings(count, context=context)]])
+
+
+def action_batch(count, context=None):
+    """
+    Генерирует пакет случайных действий в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбец name.
+    """
+    return ColumnBatch(['name'], [generate_random_strings(count, context=context)])
+
+
+def bed_batch(count, garden_ids, crop_ids, fertilizer_ids, context=None):
+    """
+    Генерирует пакет случайных грядок в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    garden_ids, crop_ids, fertilizer_ids : sequence of int
+        Идентификаторы, из которых выбираются значения (например, IdRanges),
+        или выбор с распределением (см. distributions.parent_sampler).
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбцы garden_id, crop_id и fertilizer_id.
+    """
+    return ColumnBatch(['garden_id', 'crop_id', 'fertilizer_id'],
+                       [random_id_column(garden_ids, count, context=context),
+                        random_id_column(crop_ids, count, context=context),
+                        random_id_column(fertilizer_ids, count, context=context)])
+
+
+def garden_employee_batch(count, garden_ids, employee_ids, context=None):
+    """
+    Генерирует пакет случайных связей "Сад-Сотрудник" в столбцовом виде.
+
+    Параметры:
+    -----------
+    count : int
+        Количество строк.
+    garden_ids, employee_ids : sequence of int
+        Идентификаторы, из которых выбираются значения (например, IdRanges),
+        или выбор с распределением (см. distributions.parent_sampler).
+    context : GenerationContext, optional
+        Контекст генерации (см. seeding.GenerationContext). По умолчанию глобальные генераторы.
+
+    Возвращает:
+    --------
+    ColumnBatch
+        Столбцы garden_id и employee_id.
+    """
+    return ColumnBatch(['garden_id', 'employee_id'],
+                       [random_id_column(garden_ids, count, context=context),
+                        random_id_column(employee_ids, count, context=context)])
+
+
 if __name__ == '__main__':
     pass  # Заглушка, чтобы модуль не выполнялся при импорте
@@ -0,0 +1,172 @@
+"""
+Модуль: row_codec
+
+Этот модуль предоставляет запись строк таблиц в текстовый бэкап и их разбор при восстановлении.
+Строка записывается одной строкой текста в виде кортежа литералов Python: (1, 'морковь', None, 2.5).
+Разбор выполняется за один проход регулярным выражением и возвращает кортеж значений, которые
+затем передаются в запрос как значения, а не как текст SQL.
+"""
+
+import datetime
+import decimal
+import re
+
+
+class RowCodecError(ValueError):
+    """
+    Исключение, возникающее, если строку бэкапа не удалось разобрать.
+    """
+
+
+# Конструкторы, которые допускаются в записи значения: Decimal('1.5'), datetime.date(2024, 5, 1) и т. п.
+_CALLS = {
+    'datetime.datetime': datetime.datetime,
+    'datetime.date': datetime.date,
+    'datetime.time': datetime.time,
+    'datetime.timedelta': datetime.timedelta,
+}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<str>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+      | (?P<num>[-+]?(?:\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?|inf|nan))
+      | (?P<bytes>b(?:'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"))
+      | (?P<name>None|True|False)
+      | (?P<call>(?P<func>Decimal|datetime\.(?:datetime|date|time|timedelta))\((?P<args>[^()]*)\))
+    )\s*(?P<sep>,\s*\)|,|\))""", re.X)
+
+_ESCAPE = re.compile(r"\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|[0-7]{1,3}|.)", re.S)
+
+_SIMPLE_ESCAPES = {'\\': '\\', "'": "'", '"': '"', 'n': '\n', 'r': '\r', 't': '\t',
+                   'a': '\a', 'b': '\b', 'f': '\f', 'v': '\v'}
+
+_NAMES = {'None': None, 'True': True, 'False': False}
+
+
+def _replace_escape(match):
+    code = match.group(1)
+    if code[0] in 'xuU' and len(code) > 1:
+        return chr(int(code[1:], 16))
+    if code[0].isdigit():
+        return chr(int(code, 8))
+    # Неизвестная последовательность остаётся как есть, как в литералах Python
+    return _SIMPLE_ESCAPES.get(code, '\\' + code)
+
+
+def _unescape(body):
+    return _ESCAPE.sub(_replace_escape, body) if '\\' in body else body
+
+
+def _call_value(func, args):
+    if func == 'Decimal':
+        text = args.strip()
+        if len(text) < 2 or text[0] not in '\'"' or text[-1] != text[0]:
+            raise RowCodecError(f"Invalid Decimal argument {args!r}")
+        return decimal.Decimal(text[1:-1])
+    positional, keywords = [], {}
+    for arg in filter(None, (part.strip() for part in args.split(','))):
+        name, _, value = arg.rpartition('=')
+        try:
+            value = int(value)
+        except ValueError:
+            raise RowCodecError(f"Unsupported argument {arg!r} in {func}()") from None
+        if name:
+            keywords[name.strip()] = value
+        else:
+            positional.append(value)
+    return _CALLS[func](*positional, **keywords)
+
+
+def encode_value(value):
+    """
+    Записывает значение литералом, который понимает decode_row().
+
+    Параметры:
+    -----------
+    value : None, bool, int, float, str, bytes, Decimal, date, datetime, time or timedelta
+        Значение столбца.
+
+    Возвращает:
+    --------
+    str
+        Литерал значения. Для поддерживаемых типов совпадает с repr().
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes, decimal.Decimal)):
+        return repr(value)
+    if isinstance(value, (bytearray, memoryview)):
+        return repr(bytes(value))
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+        if getattr(value, 'tzinfo', None) is not None:
+            raise TypeError("Cannot encode a datetime with tzinfo")
+        return repr(value)
+    raise TypeError(f"Cannot encode value of type {type(value).__name__} in a backup row")
+
+
+def encode_row(row):
+    """
+    Записывает строку таблицы одной строкой текста без перевода строки.
+
+    Параметры:
+    -----------
+    row : tuple
+        Значения столбцов.
+
+    Возвращает:
+    --------
+    str
+        Кортеж литералов, например "(1, 'морковь', None)".
+    """
+    if len(row) == 1:
+        return '(' + encode_value(row[0]) + ',)'
+    return '(' + ', '.join([encode_value(value) for value in row]) + ')'
+
+
+def decode_row(line):
+    """
+    Разбирает строку, записанную encode_row() или repr() кортежа.
+
+    Параметры:
+    -----------
+    line : str
+        Строка бэкапа.
+
+    Возвращает:
+    --------
+    tuple
+        Значения столбцов: None, bool, int, float, str, bytes, Decimal и значения модуля datetime.
+
+    Замечания:
+    --------
+    Строка разбирается за один проход без выполнения кода: допускаются только литералы
+    и конструкторы Decimal и datetime с целыми аргументами. Ошибка разбора - RowCodecError.
+    """
+    text = line.strip()
+    if not text.startswith('('):
+        raise RowCodecError(f"Backup row must start with '(': {line[:80]!r}")
+    if text[1:].strip() == ')':
+        return ()
+    values = []
+    append = values.append
+    position = 1
+    match_token = _TOKEN.match
+    while True:
+        match = match_token(text, position)
+        if match is None:
+            raise RowCodecError(f"Invalid value at position {position} of backup row {line[:80]!r}")
+        string, number, data, name, call, func, args, sep = match.groups()
+        if string is not None:
+            append(_unescape(string[1:-1]))
+        elif number is not None:
+            append(int(number) if number.lstrip('+-').isdigit() else float(number))
+        elif name is not None:
+            append(_NAMES[name])
+        elif data is not None:
+            append(_unescape(data[2:-1]).encode('latin-1'))
+        else:
+            append(_call_value(func, args))
+        position = match.end()
+        if sep != ',':
+            break
+    if position != len(text):
+        raise RowCodecError(f"Unexpected text after position {position} of backup row {line[:80]!r}")
+    return tuple(values)
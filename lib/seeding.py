@@ -0,0 +1,86 @@
+"""
+Модуль: seeding
+
+Этот модуль предоставляет контекст генерации случайных данных с зерном, из которого порождаются
+независимые дочерние контексты, например для каждой таблицы и каждого блока строк.
+"""
+
+import hashlib
+import os
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется только модуль random
+    np = None
+
+
+def derive_seed(seed, *keys):
+    """
+    Выводит 128-битное зерно из seed и ключей.
+
+    Параметры:
+    -----------
+    seed : int or str
+        Исходное зерно.
+    keys : int or str
+        Ключи дочернего потока, например имя таблицы и номер блока.
+
+    Возвращает:
+    --------
+    int
+        Зерно дочернего потока. Разные ключи дают независимые зёрна.
+    """
+    material = '/'.join([repr(seed)] + [repr(key) for key in keys])
+    return int.from_bytes(hashlib.sha256(material.encode('utf-8')).digest()[:16], 'big')
+
+
+class GenerationContext:
+    def __init__(self, seed=None):
+        """
+        Инициализирует контекст генерации случайных данных.
+
+        Параметры:
+        -----------
+        seed : int or str, optional
+            Зерно. По умолчанию случайное зерно из источника энтропии системы.
+
+        Атрибуты:
+        --------
+        seed : int or str
+            Зерно контекста; по нему контекст можно воссоздать.
+        random : random.Random
+            Генератор случайных чисел модуля random.
+        numpy : numpy.random.Generator or None
+            Генератор NumPy или None, если NumPy не установлен.
+
+        Замечания:
+        --------
+        Контекст не разделяет состояние с глобальным модулем random, поэтому одно зерно даёт
+        одинаковые данные независимо от того, что ещё генерируется в процессе. Данные, полученные
+        с NumPy и без него, различаются.
+        """
+        if seed is None:
+            seed = int.from_bytes(os.urandom(16), 'big')
+        self.seed = seed
+        self.random = random.Random(derive_seed(seed))
+        self.numpy = np.random.default_rng(derive_seed(seed, 'numpy')) if np is not None else None
+
+    def spawn(self, *keys):
+        """
+        Порождает дочерний контекст, независимый от родителя и от контекстов с другими ключами.
+
+        Параметры:
+        -----------
+        keys : int or str
+            Ключи дочернего потока, например spawn('beds', 3).
+
+        Возвращает:
+        --------
+        GenerationContext
+            Дочерний контекст. Одинаковые зерно и ключи всегда дают одинаковый контекст.
+        """
+        return GenerationContext(derive_seed(self.seed, *keys))
+
+    def __repr__(self):
+        return f"GenerationContext(seed={self.seed!r})"
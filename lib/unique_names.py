@@ -0,0 +1,274 @@
+"""
+Модуль: unique_names
+
+Этот модуль предоставляет проверку уникальности генерируемых названий с ограниченным расходом памяти:
+фильтр Блума отсекает заведомо новые названия, а точная проверка выполняется по множеству в памяти
+и по отсортированному файлу SQLite на диске, куда множество выгружается при переполнении.
+"""
+
+import math
+import os
+import sqlite3
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него позиции фильтра вычисляются по одному элементу
+    np = None
+
+
+# Доля ложноположительных ответов фильтра Блума по умолчанию
+BLOOM_ERROR_RATE = 0.01
+
+# Количество названий в памяти, после которого они выгружаются на диск
+EXACT_LIMIT = 1000000
+
+# Количество названий, проверяемых за один вызов add_many() в update()
+UPDATE_BATCH = 10000
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        """
+        Инициализирует фильтр Блума.
+
+        Параметры:
+        -----------
+        capacity : int
+            Ожидаемое количество элементов.
+        error_rate : float, optional
+            Допустимая доля ложноположительных ответов при capacity элементах. По умолчанию BLOOM_ERROR_RATE.
+
+        Замечания:
+        --------
+        Размер фильтра фиксирован: около 9.6 бит на элемент при error_rate=0.01, то есть ~60 МБ
+        на 50 миллионов элементов. При превышении capacity растёт только доля ложных срабатываний.
+        """
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, item):
+        # Двойное хеширование: k позиций из двух 32-битных половин встроенного хеша строки.
+        # Хеш строк случаен для каждого процесса, поэтому фильтр не сохраняется между запусками
+        value = hash(item) & 0xFFFFFFFFFFFFFFFF
+        return value & 0xFFFFFFFF, (value >> 32) | 1
+
+    def add(self, item):
+        """
+        Добавляет элемент.
+
+        Возвращает:
+        --------
+        bool
+            True, если элемент, возможно, уже был добавлен раньше.
+        """
+        first, second = self._hashes(item)
+        bits, size = self._bits, self.size
+        present = True
+        for i in range(self.hash_count):
+            position = (first + i * second) % size
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+    def add_many(self, items):
+        """
+        Добавляет несколько элементов. С NumPy позиции всех элементов вычисляются одним массивом.
+
+        Параметры:
+        -----------
+        items : list of str
+            Элементы.
+
+        Возвращает:
+        --------
+        list of bool
+            Для каждого элемента True, если он, возможно, был добавлен до этого вызова.
+            Повторы внутри items этим методом не отмечаются.
+        """
+        if np is None:
+            present = [item in self for item in items]
+            for item in items:
+                self.add(item)
+            return present
+        hashes = np.array([hash(item) for item in items], dtype=np.int64).view(np.uint64)
+        first = hashes & np.uint64(0xFFFFFFFF)
+        second = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        positions = (first[:, None] + steps * second[:, None]) % np.uint64(self.size)
+        indexes = positions >> np.uint64(3)
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        present = ((bits[indexes] & masks) != 0).all(axis=1)
+        np.bitwise_or.at(bits, indexes.ravel(), masks.ravel())
+        return present.tolist()
+
+    def __contains__(self, item):
+        first, second = self._hashes(item)
+        bits, size = self._bits, self.size
+        for i in range(self.hash_count):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def memory_bytes(self):
+        return len(self._bits)
+
+
+class UniqueNameFilter:
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, exact_limit=EXACT_LIMIT, spill_dir=None):
+        """
+        Инициализирует проверку уникальности названий.
+
+        Параметры:
+        -----------
+        capacity : int
+            Ожидаемое количество названий (вместе с уже существующими).
+        error_rate : float, optional
+            Доля ложноположительных ответов фильтра Блума. По умолчанию BLOOM_ERROR_RATE.
+        exact_limit : int, optional
+            Количество названий в памяти, после которого они выгружаются на диск. По умолчанию EXACT_LIMIT.
+        spill_dir : str, optional
+            Каталог для файла выгрузки. По умолчанию системный временный каталог.
+
+        Замечания:
+        --------
+        Фильтр Блума проверяется первым; точная проверка (множество в памяти, затем файл на диске)
+        выполняется только для названий, которые фильтр считает уже встречавшимися. Файл выгрузки
+        удаляется методом close().
+        """
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.exact_limit = exact_limit
+        self.spill_dir = spill_dir
+        self._recent = set()
+        self._spill = None
+        self._spill_path = None
+        self._count = 0
+
+    def _open_spill(self):
+        fd, self._spill_path = tempfile.mkstemp(prefix='unique_names_', suffix='.sqlite3', dir=self.spill_dir)
+        os.close(fd)
+        self._spill = sqlite3.connect(self._spill_path)
+        self._spill.execute("PRAGMA journal_mode = OFF")
+        self._spill.execute("PRAGMA synchronous = OFF")
+        # Таблица WITHOUT ROWID хранится как B-дерево, отсортированное по названию
+        self._spill.execute("CREATE TABLE names (name TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def _flush(self):
+        if self._spill is None:
+            self._open_spill()
+        with self._spill:
+            self._spill.executemany("INSERT OR IGNORE INTO names (name) VALUES (?)",
+                                    ((name,) for name in sorted(self._recent)))
+        self._recent.clear()
+
+    def _seen(self, name):
+        if name in self._recent:
+            return True
+        if self._spill is None:
+            return False
+        return self._spill.execute("SELECT 1 FROM names WHERE name = ?", (name,)).fetchone() is not None
+
+    def add(self, name):
+        """
+        Добавляет название, если оно ещё не встречалось.
+
+        Параметры:
+        -----------
+        name : str
+            Название.
+
+        Возвращает:
+        --------
+        bool
+            True, если название новое и добавлено; False, если оно уже встречалось.
+        """
+        if self.bloom.add(name) and self._seen(name):
+            return False
+        self._recent.add(name)
+        self._count += 1
+        if len(self._recent) >= self.exact_limit:
+            self._flush()
+        return True
+
+    def add_many(self, names):
+        """
+        Добавляет несколько названий за один проход фильтра Блума.
+
+        Параметры:
+        -----------
+        names : list of str
+            Названия.
+
+        Возвращает:
+        --------
+        list of bool
+            Для каждого названия True, если оно новое и добавлено; False для повторов,
+            в том числе повторов внутри names.
+        """
+        recent = self._recent
+        added = []
+        for name, maybe_seen in zip(names, self.bloom.add_many(names)):
+            # Повтор внутри пакета ещё не выгружен на диск, поэтому находится в recent
+            if name in recent or (maybe_seen and self._seen(name)):
+                added.append(False)
+                continue
+            recent.add(name)
+            added.append(True)
+        self._count += sum(added)
+        if len(recent) >= self.exact_limit:
+            self._flush()
+        return added
+
+    def update(self, names):
+        """
+        Добавляет несколько названий, например уже существующие в таблице.
+
+        Параметры:
+        -----------
+        names : iterable of str
+            Названия.
+
+        Возвращает:
+        --------
+        int
+            Количество новых названий.
+        """
+        count = 0
+        batch = []
+        for name in names:
+            batch.append(name)
+            if len(batch) >= UPDATE_BATCH:
+                count += sum(self.add_many(batch))
+                batch = []
+        if batch:
+            count += sum(self.add_many(batch))
+        return count
+
+    def __contains__(self, name):
+        return name in self.bloom and self._seen(name)
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """
+        Закрывает и удаляет файл выгрузки.
+        """
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            os.remove(self._spill_path)
+        self._recent.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,9 +1,46 @@
+import datetime
+import decimal
+import io
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
+import lib.randomik as randomik
 from lib.randomik import *
 from lib.generators import *
-from lib.db_controller import create_connection
+from lib.db_controller import (create_connection, close_pools, create_garden_db, create_database, copy_tables,
+                              copy_data, execute_query, insert_into_fertilizers, insert_into_crops,
+                              insert_into_gardens, insert_into_beds, insert_rows, populate_garden_db, split_count,
+                              bulk_load_session, BulkLoadError, BulkLoadIntegrityError, check_foreign_keys, MySQLCursorManager,
+                              dependency_stages, TABLE_COLUMNS, copy_parallel, create_sandbox,
+                              table_key_ranges, copy_data_on_server, drop_tables, COPY_METHODS,
+                              sync_data, SYNC_TABLE, create_backup, restore_backup, BACKUP_TABLES,
+                              iter_backup_batches, load_backup_manifest, backup_chain, verify_backup,
+                              apply_incremental_backup)
+from lib.backup_codecs import BACKUP_CODECS, open_backup
+from lib.backup_format import (BINARY_BACKUP_EXTENSION, BLOCK_HEADER, BackupFormatError, BackupReader, decode_rows,
+                               encode_rows)
+from lib.backends import MySQLBackend, SQLiteBackend, get_backend, set_backend, translate_query
+from lib.bulk_insert import BulkInserter, PACKET_RESERVE
+from lib.checkpoints import CheckpointMismatchError, RestoreCheckpoint
+from lib.row_codec import RowCodecError, decode_row, encode_row
+from lib.bulk_load import FifoWriter, load_data_query, write_tsv
+from lib.id_ranges import IdRanges
+from lib.columnar import ColumnBatch, ColumnBatches, int_column
+from lib.seeding import GenerationContext
+from lib.unique_names import BloomFilter, UniqueNameFilter
+import lib.distributions as distributions
+from lib.distributions import AliasTable, parent_sampler
+from lib.parent_keys import ParentKeyCache, parent_keys
+import lib.generators as generators
+import lib.db_controller as db_controller
+from lib.connection_pool import ConnectionPool, PoolTimeoutError
 
 class TestRandomFunctions(unittest.TestCase):
 
@@ -228,5 +265,1004 @@ class TestGenerators(unittest.TestCase):
             self.assertTrue(4 <= len(name) <= 10)
 
 
+
+class TestBatchNames(unittest.TestCase):
+
+    def check_names(self, names, count):
+        self.assertEqual(len(names), count)
+        for name in names:
+            self.assertIsInstance(name, str)
+            self.assertTrue(4 <= len(name) <= 10)
+            self.assertTrue(set(name) <= set(ALPHABET))
+
+    def test_generate_random_strings(self):
+        names = generate_random_strings(1000)
+        self.check_names(names, 1000)
+        # Встречаются все допустимые длины
+        self.assertEqual({len(name) for name in names}, set(range(4, 11)))
+
+    def test_generate_random_strings_without_numpy(self):
+        with patch.object(randomik, 'np', None):
+            names = generate_random_strings(1000)
+            crops_list = new_random_crops(50)
+        self.check_names(names, 1000)
+        self.assertEqual({len(name) for name in names}, set(range(4, 11)))
+        for name, season, watering_frequency, ripening_period in crops_list:
+            self.assertIn(season, SEASONS)
+            self.assertTrue(1 <= watering_frequency <= 10)
+            self.assertTrue(10 <= ripening_period <= 60)
+
+    def test_generate_random_strings_empty(self):
+        self.assertEqual(generate_random_strings(0), [])
+
+    def test_generate_random_names_crosses_batches(self):
+        names = list(generate_random_names(25, batch_size=10))
+        self.check_names(names, 25)
+
+    @unittest.skipIf(randomik.np is None, "NumPy is not installed")
+    def test_batch_covers_alphabet(self):
+        # Скорость пакетной генерации измеряется в investigations/db_manager.py
+        names = generate_random_strings(10000)
+        self.check_names(names, 10000)
+        self.assertEqual(set(''.join(names)), set(ALPHABET))
+        self.assertEqual({len(name) for name in names}, set(range(4, 11)))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def make_pool(self, **kwargs):
+        created = []
+
+        def connect():
+            conn = FakeConnection()
+            created.append(conn)
+            return conn
+
+        pool = ConnectionPool(connect, is_alive=lambda conn: conn.alive, **kwargs)
+        return pool, created
+
+    def test_connection_is_reused(self):
+        pool, created = self.make_pool()
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        pool.release(second)
+        self.assertIs(first, second)  # Соединение берётся повторно, а не открывается заново
+        stats = pool.stats
+        self.assertEqual(stats['creations'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        pool, _ = self.make_pool()
+        conn = pool.acquire()
+        conn.in_transaction = True
+        pool.release(conn)
+        self.assertEqual(conn.rollbacks, 1)
+
+    def test_pool_is_bounded(self):
+        pool, created = self.make_pool(max_size=1)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire(timeout=0.05)
+
+        threading.Timer(0.05, pool.release, args=(conn,)).start()
+        self.assertIs(pool.acquire(timeout=5), conn)  # Дожидаемся освобождения соединения
+        self.assertEqual(len(created), 1)
+        self.assertEqual(pool.stats['waits'], 2)
+
+    def test_dead_connection_is_replaced(self):
+        pool, created = self.make_pool(ping_interval=0)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.alive = False
+        time.sleep(0.01)
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats['discarded'], 1)
+
+    def test_idle_connections_expire_down_to_min_size(self):
+        pool, created = self.make_pool(min_size=1, idle_timeout=0)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        time.sleep(0.01)
+        pool.release(pool.acquire())
+        self.assertEqual(pool.stats['size'], 1)
+        self.assertEqual(pool.stats['expired'], 1)
+        self.assertTrue(first.closed)
+
+
+class SQLiteTestCase(unittest.TestCase):
+    # Базовый класс для тестов, работающих со встроенной базой SQLite во временном каталоге
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        set_backend(SQLiteBackend(self.tmp.name))
+        create_garden_db('garden')
+
+    def tearDown(self):
+        close_pools()
+        parent_keys.invalidate()
+        set_backend(None)
+        self.tmp.cleanup()
+
+
+class TestSQLiteBackend(SQLiteTestCase):
+
+    def test_translate_query(self):
+        self.assertIsNone(translate_query("CREATE DATABASE IF NOT EXISTS garden", False))
+        self.assertIn('INTEGER PRIMARY KEY AUTOINCREMENT',
+                      translate_query("CREATE TABLE t (id INT AUTO_INCREMENT PRIMARY KEY)", False))
+        self.assertEqual(translate_query("INSERT INTO t VALUES (%s, %s)", True), "INSERT INTO t VALUES (?, ?)")
+        self.assertEqual(translate_query("INSERT INTO t VALUES (1, 'x') ON DUPLICATE KEY UPDATE id=id;", False),
+                         "INSERT OR IGNORE INTO t VALUES (1, 'x')")
+        self.assertEqual(translate_query("INSERT INTO t (id, a, b) VALUES (1, 'x', 2) "
+                                         "ON DUPLICATE KEY UPDATE a=VALUES(a), b=VALUES(b)", False),
+                         "INSERT INTO t (id, a, b) VALUES (1, 'x', 2) ON CONFLICT DO UPDATE SET a = excluded.a, "
+                         "b = excluded.b")
+
+    def test_garden_schema_and_inserts(self):
+        tables = [row[0] for row in execute_query("SHOW TABLES")]
+        self.assertEqual(sorted(tables), ['actions', 'beds', 'crops', 'employees', 'fertilizers',
+                                          'garden_employees', 'gardens'])
+
+        insert_into_fertilizers('garden', [('азот', 10), ('калий', 20)])
+        self.assertEqual(execute_query("SELECT name, amount FROM fertilizers ORDER BY id"),
+                         [('азот', 10), ('калий', 20)])
+
+    def test_copy_tables_and_data(self):
+        insert_into_crops('garden', [('морковь', 'лето', 2, 30)])
+        create_database('sandbox')
+        copy_tables('garden', 'sandbox')
+        copy_data('garden', 'sandbox')
+        with create_connection('sandbox') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute("SELECT name, season FROM crops")
+                self.assertEqual(cursor.fetchall(), [('морковь', 'лето')])
+
+    def test_copy_data_streams_tables_in_dependency_order(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        create_database('sandbox')
+        copy_tables('garden', 'sandbox')
+        copied = copy_data('garden', 'sandbox', fetch_size=7, max_rows=4, method='stream')
+        self.assertEqual(copied, {table: 30 for table in TABLE_COLUMNS})
+        self.assertLess(list(copied).index('gardens'), list(copied).index('beds'))
+        with create_connection('sandbox') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute("SELECT id, garden_id, crop_id, fertilizer_id FROM beds ORDER BY id")
+                self.assertEqual(cursor.fetchall(), execute_query("SELECT id, garden_id, crop_id, fertilizer_id "
+                                                                  "FROM beds ORDER BY id"))
+
+    def assert_sandbox_matches_garden(self):
+        with create_connection('sandbox') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                for table in TABLE_COLUMNS:
+                    cursor.execute(f"SELECT * FROM {table} ORDER BY id")
+                    self.assertEqual(cursor.fetchall(), execute_query(f"SELECT * FROM {table} ORDER BY id"))
+
+    def test_copy_data_in_parallel_splits_tables_by_key_range(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        for method in COPY_METHODS:
+            with self.subTest(method=method):
+                drop_tables('sandbox')
+                create_sandbox('garden', 'sandbox')
+                copied = copy_parallel('garden', 'sandbox', workers=3, fetch_size=4, split_rows=10, method=method)
+                self.assertEqual(copied, {table: 30 for table in TABLE_COLUMNS})
+                self.assert_sandbox_matches_garden()
+
+    def test_copy_data_on_server_in_key_range_chunks(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        create_sandbox('garden', 'sandbox')
+        self.assertEqual(copy_data_on_server('garden', 'sandbox', chunk_rows=7), {table: 30 for table in TABLE_COLUMNS})
+        self.assert_sandbox_matches_garden()
+        # База песочницы отключена от соединения после копирования
+        with create_connection('garden') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute("PRAGMA database_list")
+                self.assertEqual([row[1] for row in cursor.fetchall()], ['main'])
+
+    def test_incremental_sync_copies_new_rows_and_changed_ranges(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        create_sandbox('garden', 'sandbox', copy_rows=True)
+        self.assertEqual(copy_data('garden', 'sandbox', method='incremental'), {table: 0 for table in TABLE_COLUMNS})
+
+        insert_into_gardens('garden', ['Новый сад'])
+        execute_query("UPDATE crops SET name = 'репа' WHERE id = 3")
+        execute_query("DELETE FROM actions WHERE id = 25")
+        synced = copy_data('garden', 'sandbox', method='incremental')
+        self.assertEqual(synced['gardens'], 1)
+        self.assertEqual(synced['crops'], 0)
+
+        synced = sync_data('garden', 'sandbox', verify=True, check_rows=8)
+        # Заново копируются только диапазоны ключа с изменёнными строками
+        self.assertEqual(synced['crops'], 8)
+        self.assertEqual(synced['actions'], 5)
+        self.assertEqual(synced['gardens'], 0)
+        self.assert_sandbox_matches_garden()
+        with create_connection('sandbox') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute(f"SELECT last_id FROM {SYNC_TABLE} WHERE table_name = 'gardens'")
+                self.assertEqual(cursor.fetchall(), [(31,)])
+
+    def test_table_key_ranges(self):
+        insert_into_gardens('garden', [f'Сад {i}' for i in range(10)])
+        with create_connection('garden') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                self.assertEqual(table_key_ranges(cursor, 'gardens', 3, split_rows=5),
+                                 [('id', 1, 4), ('id', 5, 7), ('id', 8, 10)])
+                self.assertEqual(table_key_ranges(cursor, 'gardens', 3, split_rows=11), [None])
+                self.assertEqual(table_key_ranges(cursor, 'beds', 3, split_rows=5), [None])
+
+    def test_dependency_stages(self):
+        foreign_keys = [('beds', 'garden_id', 'gardens', 'id'), ('beds', 'crop_id', 'crops', 'id'),
+                        ('crops', 'parent_id', 'crops', 'id'), ('a', 'b_id', 'b', 'id'), ('b', 'a_id', 'a', 'id')]
+        self.assertEqual(dependency_stages(['beds', 'crops', 'gardens', 'a', 'b'], foreign_keys),
+                         [('crops', 'gardens'), ('beds',), ('a', 'b')])
+
+
+class TestStreamingInserts(SQLiteTestCase):
+
+    def test_insert_from_generator_in_chunks(self):
+        inserted = insert_into_fertilizers('garden', generator_random_fertilizer(25), chunk_size=7)
+        self.assertEqual(inserted, 25)
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM fertilizers"), [(25,)])
+
+    def test_single_column_rows_accept_plain_values_and_tuples(self):
+        self.assertEqual(insert_into_gardens('garden', ['Сад один', ('Сад два',)]), 2)
+        self.assertEqual(execute_query("SELECT name FROM gardens ORDER BY id"), [('Сад один',), ('Сад два',)])
+
+    def test_populate_garden_db_returns_row_counts(self):
+        counts = populate_garden_db('garden', 12, chunk_size=5)
+        self.assertEqual(counts, {'fertilizers': 12, 'crops': 12, 'employees': 12, 'gardens': 12, 'actions': 12,
+                                  'beds': 12, 'garden_employees': 12})
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+
+
+class TestBulkInserter(unittest.TestCase):
+
+    def test_statements_respect_row_cap(self):
+        cursor = RecordingCursor()
+        inserter = BulkInserter(cursor, 'fertilizers', ['name', 'amount'], max_rows=3,
+                                max_bytes=10 ** 6, backend=MySQLBackend())
+        inserter.extend(('имя', i) for i in range(7))
+        inserter.flush()
+        self.assertEqual(len(cursor.statements), 3)
+        self.assertEqual(inserter.rows_inserted, 7)
+        self.assertTrue(cursor.statements[0].startswith("INSERT INTO fertilizers (name, amount) VALUES ('имя', 0)"))
+
+    def test_statements_respect_byte_limit(self):
+        cursor = RecordingCursor()
+        limit = PACKET_RESERVE + 200
+        inserter = BulkInserter(cursor, 'gardens', ['name'], max_rows=10 ** 6, max_bytes=limit,
+                                backend=MySQLBackend())
+        inserter.extend(('Сад ' + 'я' * 10,) for _ in range(50))
+        inserter.flush()
+        self.assertGreater(len(cursor.statements), 1)
+        for statement in cursor.statements:
+            self.assertLessEqual(len(statement.encode('utf-8')), limit - PACKET_RESERVE)
+        self.assertEqual(sum(statement.count('Сад') for statement in cursor.statements), 50)
+
+    def test_values_are_escaped(self):
+        cursor = RecordingCursor()
+        inserter = BulkInserter(cursor, 'actions', ['name'], max_bytes=10 ** 6, backend=MySQLBackend())
+        inserter.add(("полить'), ('всё",))
+        inserter.flush()
+        self.assertEqual(cursor.statements, ["INSERT INTO actions (name) VALUES ('полить\\'), (\\'всё')"])
+
+
+class TestBulkLoad(SQLiteTestCase):
+
+    def test_write_tsv_escapes_special_characters(self):
+        stream = io.StringIO()
+        count = write_tsv([('щи\tборщ', 1), ('a\\b\nc', None), 'сад'], stream)
+        self.assertEqual(count, 3)
+        self.assertEqual(stream.getvalue(), 'щи\\tборщ\t1\na\\\\b\\nc\t\\N\nсад\n')
+
+    def test_load_data_query(self):
+        query = load_data_query('/tmp/x.tsv', 'gardens', ['name'])
+        self.assertIn("LOAD DATA LOCAL INFILE '/tmp/x.tsv' INTO TABLE gardens CHARACTER SET utf8mb4", query)
+        self.assertTrue(query.endswith('(name)'))
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'именованные каналы недоступны')
+    def test_fifo_writer(self):
+        path = os.path.join(self.tmp.name, 'rows.fifo')
+        os.mkfifo(path)
+        writer = FifoWriter(path, [('полив', 3), ('прополка', 4)])
+        writer.start()
+        with open(path, encoding='utf-8') as stream:
+            content = stream.read()
+        self.assertEqual(writer.join(), 2)
+        self.assertEqual(content, 'полив\t3\nпрополка\t4\n')
+
+    def test_load_mode_falls_back_to_single_transaction_on_sqlite(self):
+        counts = populate_garden_db('garden', 20, mode='load')
+        self.assertEqual(set(counts.values()), {20})
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM employees"), [(20,)])
+
+
+
+class TestColumnBatch(SQLiteTestCase):
+
+    def test_buffers_must_have_equal_length(self):
+        with self.assertRaises(ValueError):
+            ColumnBatch(['name', 'amount'], [['а', 'б'], int_column([1])])
+
+    def test_write_tsv_matches_row_output(self):
+        rows = [('щи\tборщ', 1), ('a\\b\nc', 2), ('сад', 3)]
+        batch = ColumnBatch(['name', 'amount'], [[row[0] for row in rows], int_column(row[1] for row in rows)])
+        by_rows, by_columns = io.StringIO(), io.StringIO()
+        write_tsv(rows, by_rows)
+        self.assertEqual(write_tsv(batch, by_columns), 3)
+        self.assertEqual(by_columns.getvalue(), by_rows.getvalue())
+
+    def test_add_batch_matches_add(self):
+        batch = crop_batch(50)
+        by_rows, by_columns = RecordingCursor(), RecordingCursor()
+        for cursor, fill in ((by_rows, lambda inserter: inserter.extend(batch.rows())),
+                             (by_columns, lambda inserter: inserter.add_batch(batch))):
+            inserter = BulkInserter(cursor, 'crops', batch.columns, max_rows=20, max_bytes=10 ** 6,
+                                    backend=MySQLBackend())
+            fill(inserter)
+            inserter.flush()
+        self.assertEqual(by_columns.statements, by_rows.statements)
+        self.assertEqual(len(by_columns.statements), 3)
+
+    def test_insert_rows_accepts_batches(self):
+        batches = ColumnBatches(fertilizer_batch(7) for _ in range(3))
+        count = insert_rows('garden', 'fertilizers', ['name', 'amount'], batches, chunk_size=10)
+        self.assertEqual(count, 21)
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM fertilizers WHERE amount BETWEEN 0 AND 100"), [(21,)])
+
+    def test_relation_batch_uses_parent_ids(self):
+        batch = bed_batch(100, IdRanges([(1, 3)]), IdRanges([(10, 11), (20, 20)]), [7])
+        self.assertTrue(set(batch.column('garden_id')) <= {1, 2, 3})
+        self.assertTrue(set(batch.column('crop_id')) <= {10, 11, 20})
+        self.assertEqual(set(batch.column('fertilizer_id')), {7})
+
+
+class TestParallelPopulate(SQLiteTestCase):
+
+    def test_split_count(self):
+        self.assertEqual(split_count(10, 3), [4, 3, 3])
+        self.assertEqual(sum(split_count(7, 4)), 7)
+
+    def test_parallel_populate_is_deterministic_with_seed(self):
+        create_garden_db('garden_copy')
+        counts = populate_garden_db('garden', 30, workers=2, seed=42)
+        populate_garden_db('garden_copy', 30, workers=2, seed=42)
+        self.assertEqual(set(counts.values()), {30})
+
+        query = "SELECT name, season, watering_frequency, ripening_period FROM crops"
+        with create_connection('garden_copy') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute(query)
+                copy_rows = cursor.fetchall()
+        self.assertEqual(sorted(execute_query(query)), sorted(copy_rows))
+
+
+
+class TestGenerationContext(SQLiteTestCase):
+
+    def test_same_seed_gives_same_data(self):
+        self.assertEqual(new_random_crops(20, GenerationContext(7)), new_random_crops(20, GenerationContext(7)))
+        self.assertEqual(list(generator_random_employee(5, GenerationContext('a'))),
+                         list(generator_random_employee(5, GenerationContext('a'))))
+        self.assertEqual(new_random_fertilizer(GenerationContext(1)), new_random_fertilizer(GenerationContext(1)))
+
+    def test_spawned_streams_are_independent(self):
+        context = GenerationContext(7)
+        first, second = context.spawn('crops', 0), context.spawn('crops', 1)
+        self.assertNotEqual(new_random_actions(20, first), new_random_actions(20, second))
+        self.assertEqual(context.spawn('crops', 1).seed, second.seed)
+
+    def test_context_does_not_touch_global_state(self):
+        random.seed(3)
+        expected = random.random()
+        random.seed(3)
+        new_random_employee(GenerationContext(1))
+        list(generator_random_crop(3, GenerationContext(1)))
+        self.assertEqual(random.random(), expected)
+
+    def table_contents(self, database):
+        contents = {}
+        with create_connection(database) as conn:
+            cursor = conn.cursor()
+            for table, columns in db_controller.TABLE_COLUMNS.items():
+                cursor.execute(f"SELECT id, {', '.join(columns)} FROM {table} ORDER BY id")
+                contents[table] = cursor.fetchall()
+            # Связи сравниваются и по именам родителей, а не только по идентификаторам
+            cursor.execute("SELECT b.id, g.name, c.name, f.name FROM beds b JOIN gardens g ON g.id = b.garden_id "
+                           "JOIN crops c ON c.id = b.crop_id JOIN fertilizers f ON f.id = b.fertilizer_id ORDER BY b.id")
+            contents['beds_parents'] = cursor.fetchall()
+            cursor.execute("SELECT ge.id, g.name, e.fullname FROM garden_employees ge "
+                           "JOIN gardens g ON g.id = ge.garden_id JOIN employees e ON e.id = ge.employee_id ORDER BY ge.id")
+            contents['garden_employees_parents'] = cursor.fetchall()
+        return contents
+
+    def test_seeded_dataset_does_not_depend_on_worker_count(self):
+        create_garden_db('garden_copy')
+        with patch.object(db_controller, 'GENERATION_BLOCK_ROWS', 7):
+            populate_garden_db('garden', 30, seed='bench')
+            populate_garden_db('garden_copy', 30, workers=3, seed='bench')
+        contents = self.table_contents('garden')
+        self.assertEqual(len(contents['beds_parents']), 30)
+        self.assertEqual([row[0] for row in contents['gardens']], list(range(1, 31)))
+        self.assertEqual(contents, self.table_contents('garden_copy'))
+
+    def test_seeded_ids_continue_after_existing_rows(self):
+        populate_garden_db('garden', 5, seed='bench')
+        populate_garden_db('garden', 5, workers=2, seed='bench')
+        contents = self.table_contents('garden')
+        self.assertEqual([row[0] for row in contents['crops']], list(range(1, 11)))
+        self.assertEqual(contents['crops'][:5], [(row[0] - 5,) + row[1:] for row in contents['crops'][5:]])
+
+
+class TestUniqueNames(SQLiteTestCase):
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        names = [f'имя{i}' for i in range(1000)]
+        for name in names:
+            bloom.add(name)
+        self.assertTrue(all(name in bloom for name in names))
+        false_positives = sum(f'другое{i}' in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_filter_rejects_duplicates_after_spill(self):
+        with UniqueNameFilter(100, exact_limit=10, spill_dir=self.tmp.name) as unique:
+            self.assertEqual(unique.update(f'имя{i}' for i in range(50)), 50)
+            self.assertFalse(unique.add('имя3'))
+            self.assertFalse(unique.add('имя49'))
+            self.assertTrue(unique.add('новое'))
+            self.assertEqual(len(unique), 51)
+            self.assertIn('имя0', unique)
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.startswith('unique_names_')])
+
+    def test_generator_skips_existing_names(self):
+        expected = [name for name, *_ in generator_random_crop(5, GenerationContext(3))]
+        unique = UniqueNameFilter(100)
+        unique.update(expected[:2])
+        names = [name for name, *_ in generator_random_crop(5, GenerationContext(3), unique=unique)]
+        self.assertEqual(len(names), 5)
+        self.assertEqual(names[:3], expected[2:])
+        self.assertFalse(set(names) & set(expected[:2]))
+
+    def test_employee_fullnames_are_unique(self):
+        unique = UniqueNameFilter(100)
+        employees = list(generator_random_employee(20, unique=unique))
+        self.assertEqual(len({fullname for fullname, _ in employees}), 20)
+
+    def test_table_name_filter_is_seeded_from_table(self):
+        insert_into_gardens('garden', ['Сад один', 'Сад два'])
+        unique = table_name_filter('gardens')
+        self.assertEqual(len(unique), 2)
+        self.assertFalse(unique.add('Сад один'))
+        gardens = list(generator_random_garden(10, unique=unique))
+        self.assertEqual(len(set(gardens)), 10)
+        self.assertEqual(len(unique), 12)
+
+
+class TestDistributions(SQLiteTestCase):
+
+    def check_alias_frequencies(self):
+        weights = [5, 1, 0, 4]
+        draws = AliasTable(weights).draw_many(20000, GenerationContext(1))
+        for index, weight in enumerate(weights):
+            self.assertAlmostEqual(draws.count(index) / len(draws), weight / sum(weights), delta=0.02)
+
+    def test_alias_table_frequencies(self):
+        self.check_alias_frequencies()
+
+    def test_alias_table_frequencies_without_numpy(self):
+        with patch.object(distributions, 'np', None):
+            self.check_alias_frequencies()
+
+    def test_zipf_makes_first_parents_hot(self):
+        sampler = parent_sampler(IdRanges([(1, 100)]), 'zipf:1.2')
+        draws = sampler.draw_many(10000, GenerationContext(2))
+        self.assertTrue(set(draws) <= set(range(1, 101)))
+        self.assertGreater(draws.count(1), 10 * draws.count(50))
+
+    def test_fanout_gives_each_parent_fixed_children(self):
+        sampler = parent_sampler([10, 20, 30], 'fanout:2')
+        self.assertEqual(list(sampler.draw_many(7)), [10, 10, 20, 20, 30, 30, 10])
+        self.assertEqual(parent_sampler([10, 20, 30], 'fanout:2', position=3).draw(), 20)
+
+    def test_invalid_spec(self):
+        with self.assertRaises(ValueError):
+            parent_sampler([1, 2], 'pareto')
+        with self.assertRaises(ValueError):
+            parent_sampler([1, 2], 'fanout')
+
+    def test_generator_uses_distribution(self):
+        beds = list(generator_random_bed(6, [1, 2], [3], [4], distributions={'gardens': 'fanout:3'}))
+        self.assertEqual([garden_id for garden_id, _, _ in beds], [1, 1, 1, 2, 2, 2])
+
+    def test_populate_with_skewed_beds(self):
+        populate_garden_db('garden', 200, seed=5, distributions={'gardens': 'zipf:1.5', 'employees': 'fanout:1'})
+        hottest = execute_query("SELECT garden_id, COUNT(*) FROM beds GROUP BY garden_id ORDER BY 2 DESC LIMIT 1")
+        self.assertEqual(hottest[0][0], 1)
+        self.assertGreater(hottest[0][1], 40)
+        self.assertEqual(execute_query("SELECT COUNT(DISTINCT employee_id) FROM garden_employees"), [(200,)])
+
+
+class TestParentKeyCache(SQLiteTestCase):
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = ParentKeyCache(ttl=10, clock=lambda: now[0])
+        loads = []
+        loader = lambda: loads.append(1) or [1, 2, 3]
+        self.assertEqual(list(cache.get('garden', 'gardens', loader)), [1, 2, 3])
+        cache.get('garden', 'gardens', loader)
+        self.assertEqual(len(loads), 1)
+        now[0] = 11
+        cache.get('garden', 'gardens', loader)
+        self.assertEqual(len(loads), 2)
+        self.assertEqual(cache.stats['expired'], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ParentKeyCache(max_ids=5)
+        cache.get('garden', 'gardens', lambda: [1, 2])
+        cache.get('garden', 'crops', lambda: [1, 2])
+        cache.get('garden', 'gardens', lambda: [])
+        cache.get('garden', 'employees', lambda: [1, 2, 3])
+        self.assertEqual(cache.stats['evicted'], 1)
+        self.assertEqual(cache.stats['ids'], 5)
+        self.assertEqual(cache.get('garden', 'crops', lambda: [9]).tolist(), [9])
+
+    def test_ids_are_stored_compactly(self):
+        ids = ParentKeyCache().get('garden', 'gardens', lambda: range(1, 4))
+        self.assertEqual(ids.typecode, 'i')
+        self.assertEqual(ParentKeyCache().get('garden', 'gardens', lambda: [2 ** 40]).typecode, 'q')
+
+    def test_relation_generators_reuse_cached_ids(self):
+        insert_into_gardens('garden', ['Сад один', 'Сад два'])
+        insert_into_crops('garden', [('морковь', 'лето', 3, 40)])
+        insert_into_fertilizers('garden', [('азот', 10)])
+        with patch.object(generators, 'load_ids', wraps=generators.load_ids) as load_ids:
+            for _ in range(3):
+                list(generator_random_bed(5))
+            self.assertEqual(load_ids.call_count, 3)
+            # Вставка сбрасывает запись кэша для своей таблицы
+            insert_into_gardens('garden', ['Сад три'])
+            beds = list(generator_random_bed(50))
+            self.assertEqual(load_ids.call_count, 4)
+        self.assertEqual({garden_id for garden_id, _, _ in beds}, {1, 2, 3})
+
+    def test_failed_load_is_not_cached(self):
+        failed = parent_keys.stats['failed']
+        self.assertEqual(len(fetch_ids('gardens', 'late')), 0)
+        self.assertEqual(parent_keys.stats['entries'], 0)
+        self.assertEqual(parent_keys.stats['failed'], failed + 1)
+        # Таблица появляется без вызова функций записи, которые сбросили бы кэш
+        with create_connection('late') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute("CREATE TABLE gardens (id INTEGER PRIMARY KEY, name TEXT)")
+                cursor.execute("INSERT INTO gardens (name) VALUES ('Сад')")
+        self.assertEqual(fetch_ids('gardens', 'late').tolist(), [1])
+
+    def test_restore_resets_cached_ids(self):
+        populate_garden_db('garden', 50)
+        path = create_backup(database='garden', backup_path=os.path.join(self.tmp.name, 'backups'))
+        create_garden_db('rt')
+        self.assertEqual(len(fetch_ids('gardens', 'rt')), 0)
+        restore_backup(path, target_database='rt')
+        self.assertEqual(len(fetch_ids('gardens', 'rt')), 50)
+
+    def test_incremental_backup_resets_cached_ids(self):
+        populate_garden_db('garden', 20, chunk_size=10)
+        full = create_backup(database='garden', backup_path=os.path.join(self.tmp.name, 'backups'), chunk_rows=10)
+        create_garden_db('rt')
+        restore_backup(full, target_database='rt')
+        self.assertIn(20, fetch_ids('crops', 'rt').tolist())
+        execute_query("DELETE FROM beds WHERE crop_id = 20")
+        execute_query("DELETE FROM crops WHERE id = 20")
+        path = create_backup(database='garden', backup_path=os.path.join(self.tmp.name, 'backups'), base=full)
+        apply_incremental_backup(path, load_backup_manifest(path), 'rt')
+        self.assertNotIn(20, fetch_ids('crops', 'rt').tolist())
+
+
+class TestBulkLoadSession(SQLiteTestCase):
+
+    def index_names(self):
+        return [row[0] for row in execute_query("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")]
+
+    def test_session_commits_valid_data_and_restores_settings(self):
+        with bulk_load_session('garden') as session:
+            insert_into_gardens('garden', ['Сад один'])
+            insert_into_crops('garden', [('лук', 'весна', 1, 20)])
+            insert_into_fertilizers('garden', [('азот', 5)])
+            insert_into_beds('garden', [(1, 1, 1)])
+            self.assertEqual(execute_query("PRAGMA foreign_keys"), [(0,)])
+        self.assertEqual(sum(session.violations.values()), 0)
+        self.assertEqual(execute_query("SELECT garden_id, crop_id, fertilizer_id FROM beds"), [(1, 1, 1)])
+        self.assertEqual(execute_query("PRAGMA foreign_keys"), [(1,)])
+
+    def test_session_rolls_back_on_foreign_key_violation(self):
+        with self.assertRaises(BulkLoadIntegrityError):
+            with bulk_load_session('garden'):
+                insert_into_beds('garden', [(10, 20, 30)])
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM beds"), [(0,)])
+
+    def test_session_rolls_back_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with bulk_load_session('garden'):
+                insert_into_gardens('garden', ['Сад один'])
+                raise RuntimeError('прервано')
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM gardens"), [(0,)])
+
+    def test_session_raises_after_failed_query(self):
+        # execute_query() перехватывает ошибку запроса, но сеанс не должен завершиться молча
+        with self.assertRaises(BulkLoadError):
+            with bulk_load_session('garden') as session:
+                insert_into_gardens('garden', ['Сад один'])
+                execute_query("SELECT * FROM missing_table")
+        self.assertTrue(session.failed)
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM gardens"), [(0,)])
+
+    def test_secondary_indexes_are_dropped_and_recreated(self):
+        execute_query("CREATE INDEX idx_gardens_name ON gardens (name)")
+        with bulk_load_session('garden', drop_indexes=True):
+            self.assertNotIn('idx_gardens_name', self.index_names())
+        self.assertIn('idx_gardens_name', self.index_names())
+
+
+class TestIdRanges(unittest.TestCase):
+
+    def test_adjacent_ranges_are_merged(self):
+        ids = IdRanges()
+        ids.add(1, 10)
+        ids.add(11, 5)
+        ids.add(100, 3)
+        self.assertEqual(ids.ranges, [(1, 15), (100, 102)])
+        self.assertEqual(len(ids), 18)
+        self.assertEqual(list(ids), list(range(1, 16)) + [100, 101, 102])
+
+    def test_indexing_and_choice(self):
+        ids = IdRanges([(5, 7), (20, 21)])
+        self.assertEqual([ids[i] for i in range(len(ids))], [5, 6, 7, 20, 21])
+        self.assertEqual(ids[-1], 21)
+        self.assertIn(random.choice(ids), {5, 6, 7, 20, 21})
+        with self.assertRaises(IndexError):
+            ids[5]
+
+    def test_from_bounds(self):
+        self.assertEqual(len(IdRanges.from_bounds(None, None)), 0)
+        self.assertEqual(IdRanges.from_bounds(3, 6).ranges, [(3, 6)])
+
+
+class TestRelationPopulate(SQLiteTestCase):
+
+    def assert_foreign_keys_valid(self):
+        with create_connection('garden') as conn:
+            self.assertEqual(sum(check_foreign_keys(conn).values()), 0)
+
+    def test_children_use_inserted_id_ranges(self):
+        populate_garden_db('garden', 8)
+        populate_garden_db('garden', 8)
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM beds"), [(16,)])
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM garden_employees"), [(16,)])
+        # Вторая партия грядок ссылается только на сады второй партии
+        self.assertGreaterEqual(execute_query("SELECT MIN(garden_id) FROM beds WHERE id > 8")[0][0], 9)
+        self.assert_foreign_keys_valid()
+
+    def test_load_and_parallel_modes_fall_back_to_min_max(self):
+        populate_garden_db('garden', 10, mode='load')
+        populate_garden_db('garden', 10, workers=2, seed=1)
+        self.assertEqual(execute_query("SELECT COUNT(*) FROM beds"), [(20,)])
+        self.assert_foreign_keys_valid()
+
+
+class TestBackup(SQLiteTestCase):
+
+    def backup_dir(self):
+        return os.path.join(self.tmp.name, 'backups')
+
+    def test_compressed_backup_with_manifest(self):
+        populate_garden_db('garden', 25, chunk_size=10)
+        for codec in BACKUP_CODECS:
+            with self.subTest(codec=codec):
+                path = create_backup(database='garden', backup_path=self.backup_dir(), codec=codec, level=1,
+                                     fetch_size=7)
+                self.assertTrue(path.endswith(BACKUP_CODECS[codec][0]))
+                with open(path[:-len(BACKUP_CODECS[codec][0])] + '.manifest.json', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                self.assertEqual(manifest['codec'], codec)
+                self.assertEqual(manifest['rows'], 25 * len(BACKUP_TABLES))
+                self.assertEqual({table: info['rows'] for table, info in manifest['tables'].items()},
+                                 {table: 25 for table in BACKUP_TABLES})
+                self.assertEqual(manifest['compressed_bytes'], os.path.getsize(path))
+                with open_backup(path) as f:
+                    self.assertEqual(len(f.read().encode('utf-8')), manifest['bytes'])
+                os.remove(path)
+
+    def test_restore_reads_compressed_backup(self):
+        populate_garden_db('garden', 12)
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='lzma')
+        create_garden_db('garden_backup_test')
+        restore_backup(path)
+        with create_connection('garden_backup_test') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute("SELECT * FROM beds ORDER BY id")
+                self.assertEqual(cursor.fetchall(), execute_query("SELECT * FROM beds ORDER BY id"))
+
+    def test_binary_backup_restores_selected_tables_and_id_ranges(self):
+        populate_garden_db('garden', 40, chunk_size=10)
+        execute_query("UPDATE crops SET name = 'it''s', watering_frequency = NULL WHERE id = 2")
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='gzip', fetch_size=10,
+                             backup_format='binary')
+        self.assertTrue(path.endswith(BINARY_BACKUP_EXTENSION))
+        create_garden_db('garden_backup_test')
+        restore_backup(path, tables=['crops', 'gardens', 'fertilizers'])
+        restore_backup(path, tables=['beds'], id_range=(15, 24))
+        with create_connection('garden_backup_test') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                cursor.execute("SELECT * FROM crops ORDER BY id")
+                self.assertEqual(cursor.fetchall(), execute_query("SELECT * FROM crops ORDER BY id"))
+                cursor.execute("SELECT * FROM beds ORDER BY id")
+                self.assertEqual(cursor.fetchall(), execute_query("SELECT * FROM beds WHERE id BETWEEN 15 AND 24"))
+                cursor.execute("SELECT COUNT(*) FROM employees")
+                self.assertEqual(cursor.fetchall(), [(0,)])
+
+        with BackupReader(path) as reader:
+            self.assertEqual(list(reader.tables), BACKUP_TABLES)
+            self.assertEqual(len(list(reader.blocks('beds', (15, 24)))), 2)
+            with patch.object(reader, 'read_block', wraps=reader.read_block) as read_block:
+                list(reader.read_rows('beds', (15, 24)))
+                self.assertEqual(read_block.call_count, 2)
+
+    def test_binary_backup_detects_corrupted_blocks(self):
+        populate_garden_db('garden', 5)
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='none', backup_format='binary')
+        with BackupReader(path) as reader:
+            offset = reader.tables['gardens']['blocks'][0][0]
+        with open(path, 'r+b') as f:
+            f.seek(offset + BLOCK_HEADER.size + 2)
+            f.write(b'X')
+        with BackupReader(path) as reader:
+            self.assertEqual(len(list(reader.read_rows('crops'))), 1)
+            with self.assertRaises(BackupFormatError):
+                list(reader.read_rows('gardens'))
+
+    def test_row_codec_round_trip(self):
+        rows = [(1, 'сад', None, 2.5, b'\x00\xff', decimal.Decimal('1.50'), 2 ** 70, datetime.date(2024, 5, 1))]
+        self.assertEqual(decode_rows(encode_rows(rows), 1, 8),
+                         [(1, 'сад', None, 2.5, b'\x00\xff', decimal.Decimal('1.50'), decimal.Decimal(2 ** 70),
+                           '2024-05-01')])
+
+    def assert_restored(self, tables=BACKUP_TABLES):
+        with create_connection('garden_backup_test') as conn:
+            with MySQLCursorManager(conn) as cursor:
+                for table in tables:
+                    cursor.execute(f"SELECT * FROM {table} ORDER BY id")
+                    self.assertEqual(cursor.fetchall(), execute_query(f"SELECT * FROM {table} ORDER BY id"))
+
+    def test_parallel_snapshot_backup_restores(self):
+        populate_garden_db('garden', 40, chunk_size=10)
+        for backup_format, codec in (('text', 'gzip'), ('text', 'lzma'), ('binary', 'gzip')):
+            with self.subTest(backup_format=backup_format, codec=codec):
+                path = create_backup(database='garden', backup_path=self.backup_dir(), codec=codec, fetch_size=7,
+                                     backup_format=backup_format, workers=3, split_rows=10)
+                with open(path[:-len(BINARY_BACKUP_EXTENSION if backup_format == 'binary' else BACKUP_CODECS[codec][0])]
+                          + '.manifest.json', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                self.assertEqual(manifest['workers'], 3)
+                self.assertEqual({table: info['rows'] for table, info in manifest['tables'].items()},
+                                 {table: 40 for table in BACKUP_TABLES})
+                drop_tables('garden_backup_test')
+                create_garden_db('garden_backup_test')
+                restore_backup(path)
+                self.assert_restored()
+                if backup_format == 'binary':
+                    with BackupReader(path) as reader:
+                        self.assertEqual(list(reader.tables), BACKUP_TABLES)
+                        self.assertEqual(len(reader.tables['beds']['blocks']), 6)
+                os.remove(path)
+
+    def test_backup_reads_one_snapshot(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        backend = get_backend()
+        for workers, method in ((None, 'start_snapshot'), (3, 'unlock_after_snapshot')):
+            with self.subTest(workers=workers):
+                original = getattr(backend, method)
+
+                def write_after_snapshot(cursor):
+                    original(cursor)
+                    execute_query("INSERT INTO fertilizers (name, amount) VALUES ('late', 1)")
+
+                with patch.object(backend, method, side_effect=write_after_snapshot):
+                    path = create_backup(database='garden', backup_path=self.backup_dir(), workers=workers,
+                                         split_rows=10)
+                self.assertEqual(sum(1 for _ in iter_backup_batches(path, 'fertilizers', batch_rows=1)), 30)
+                execute_query("DELETE FROM fertilizers WHERE name = 'late'")
+                self.assertEqual(sorted(os.listdir(self.backup_dir())),
+                                 sorted([os.path.basename(path), os.path.basename(path)[:-len('.sql.gz')]
+                                         + '.manifest.json']))
+                os.remove(path)
+                os.remove(path[:-len('.sql.gz')] + '.manifest.json')
+
+    def test_incremental_backup_chain_restores(self):
+        for backup_format, workers in (('text', None), ('binary', 2)):
+            with self.subTest(backup_format=backup_format, workers=workers):
+                drop_tables('garden')
+                create_garden_db('garden')
+                populate_garden_db('garden', 30, chunk_size=10, seed=1)
+                full = create_backup(database='garden', backup_path=self.backup_dir(), backup_format=backup_format,
+                                     workers=workers, chunk_rows=10)
+                execute_query("UPDATE crops SET name = 'изменено' WHERE id = 3")
+                execute_query("DELETE FROM garden_employees WHERE id = 5")
+                execute_query("INSERT INTO fertilizers (name, amount) VALUES ('новое', 7)")
+                first = create_backup(database='garden', backup_path=self.backup_dir(), backup_format=backup_format,
+                                      workers=workers, base=full)
+                manifest = load_backup_manifest(first)
+                self.assertEqual(manifest['type'], 'incremental')
+                self.assertEqual(manifest['changed']['crops'], [0])
+                self.assertEqual(manifest['changed']['garden_employees'], [0])
+                self.assertEqual(manifest['changed']['fertilizers'], [30])
+                self.assertEqual(manifest['changed']['beds'], [])
+                self.assertEqual(manifest['tables']['crops']['rows'], 9)
+                self.assertEqual(manifest['rows'], 9 + 9 + 1)
+
+                execute_query("DELETE FROM beds WHERE crop_id = 25")
+                execute_query("DELETE FROM crops WHERE id = 25")
+                execute_query("UPDATE beds SET crop_id = 3 WHERE id = 12")
+                second = create_backup(database='garden', backup_path=self.backup_dir(), backup_format=backup_format,
+                                       base=first)
+                self.assertEqual([path for path, _ in backup_chain(second)], [full, first, second])
+                differential = create_backup(database='garden', backup_path=self.backup_dir(),
+                                             backup_format=backup_format, base=full)
+                for path in (second, differential):
+                    drop_tables('garden_backup_test')
+                    create_garden_db('garden_backup_test')
+                    restore_backup(path)
+                    self.assert_restored()
+                with self.assertRaises(ValueError):
+                    create_backup(database='garden', backup_path=self.backup_dir(),
+                                  base=create_backup(database='garden', backup_path=self.backup_dir(), chunk_rows=None))
+
+    def test_verify_backup(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        for backup_format, codec in (('text', 'gzip'), ('text', 'none'), ('binary', 'lzma')):
+            with self.subTest(backup_format=backup_format, codec=codec):
+                path = create_backup(database='garden', backup_path=self.backup_dir(), codec=codec, fetch_size=10,
+                                     backup_format=backup_format, chunk_rows=10)
+                report = verify_backup(path, database='garden', deep=True)
+                self.assertTrue(report['ok'], report['errors'])
+                self.assertEqual(report['rows'], {table: 30 for table in BACKUP_TABLES})
+                self.assertEqual(report['changed_chunks'], {table: [] for table in BACKUP_TABLES})
+
+                execute_query(f"UPDATE crops SET name = '{backup_format} {codec}' WHERE id = 12")
+                self.assertEqual(verify_backup(path, database='garden')['changed_chunks']['crops'], [10])
+                if codec == 'none':
+                    continue
+                # Повреждение сжатых данных находится по контрольной сумме блока или потока
+                with open(path, 'r+b') as f:
+                    f.seek(os.path.getsize(path) // 2)
+                    byte = f.read(1)
+                    f.seek(-1, os.SEEK_CUR)
+                    f.write(bytes([byte[0] ^ 0xFF]))
+                report = verify_backup(path, deep=True)
+                self.assertFalse(report['ok'])
+                os.remove(path)
+
+    def test_verify_backup_detects_truncation(self):
+        populate_garden_db('garden', 20)
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='gzip')
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 20)
+        report = verify_backup(path)
+        self.assertFalse(report['ok'])
+        self.assertTrue(any('EOFError' in error for error in report['errors']), report['errors'])
+
+    def test_verify_backup_reports_row_count_with_size_mismatch(self):
+        populate_garden_db('garden', 20)
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='none')
+        with open(path, encoding='utf-8') as f:
+            lines = f.readlines()
+        # Строка crops удаляется целиком: файл остаётся читаемым, но короче
+        start = lines.index('-- Table: crops\n')
+        del lines[start + 1]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        errors = verify_backup(path)['errors']
+        self.assertTrue(any(error.startswith('File size') for error in errors), errors)
+        self.assertIn("Table crops: 19 rows in the backup, manifest says 20", errors)
+
+    def test_interrupted_restore_resumes_from_checkpoint(self):
+        populate_garden_db('garden', 23)
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='bz2')
+        create_garden_db('garden_backup_test')
+        flush = BulkInserter.flush
+        calls = []
+
+        def failing_flush(inserter):
+            calls.append(1)
+            if len(calls) == 3:
+                raise sqlite3.OperationalError("disk I/O error")
+            return flush(inserter)
+
+        with patch.object(BulkInserter, 'flush', failing_flush):
+            restore_backup(path, batch_rows=5)
+        checkpoint_path = f"{path}.garden_backup_test.checkpoint"
+        state = RestoreCheckpoint(checkpoint_path).load()
+        self.assertEqual(len(state), 1)
+        self.assertEqual(list(state.values())[0], {'batches': 2, 'rows': 10, 'done': False})
+
+        with self.assertRaises(CheckpointMismatchError):
+            restore_backup(path, batch_rows=7)
+        restored = restore_backup(path, batch_rows=5)
+        self.assertEqual(restored, {table: 23 for table in BACKUP_TABLES})
+        self.assertFalse(os.path.exists(checkpoint_path))
+        self.assert_restored()
+
+    def test_parallel_restore_of_binary_backup(self):
+        populate_garden_db('garden', 30, chunk_size=10)
+        path = create_backup(database='garden', backup_path=self.backup_dir(), fetch_size=8, backup_format='binary')
+        create_garden_db('garden_backup_test')
+        restored = restore_backup(path, workers=3, batch_rows=6)
+        self.assertEqual(restored, {table: 30 for table in BACKUP_TABLES})
+        self.assert_restored()
+
+    def test_text_backup_round_trips_names_with_quotes_and_brackets(self):
+        insert_into_gardens('garden', ["Сад \"Весна\"), ('x", "it's", 'back\\slash\nи перевод'])
+        path = create_backup(database='garden', backup_path=self.backup_dir(), codec='none')
+        create_garden_db('garden_backup_test')
+        self.assertEqual(restore_backup(path, tables=['gardens'])['gardens'], 3)
+        self.assert_restored(['gardens'])
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            create_backup(database='garden', backup_path=self.backup_dir(), codec='zip')
+
+
+class TestRowCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        rows = [(1, 'сад', None, 2.5, b"\x00\xff'\"", decimal.Decimal('1.50'), 2 ** 70, True),
+                ("it's \"x\"), (\n\t\\",), (), (-3, -1.5e-10, float('inf')),
+                (datetime.datetime(2024, 1, 2, 3, 4, 5, 6), datetime.date(2024, 5, 1),
+                 datetime.timedelta(days=1, seconds=5), datetime.time(10, 0))]
+        for row in rows:
+            with self.subTest(row=row):
+                line = encode_row(row)
+                self.assertEqual(line, repr(row))
+                self.assertEqual(decode_row(line), row)
+
+    def test_rejects_code_and_malformed_rows(self):
+        for line in ["(__import__('os').system('true'),)", "(1, 2", "(1, 'a') + (2,)", "1, 2", "(Decimal(1),)",
+                     "(datetime.date(x),)"]:
+            with self.subTest(line=line):
+                with self.assertRaises(RowCodecError):
+                    decode_row(line)
+
+    def test_unsupported_types_are_not_encoded(self):
+        with self.assertRaises(TypeError):
+            encode_row((object(),))
+
+
 if __name__ == '__main__':
     unittest.main()